@@ -1,10 +1,11 @@
 from django.contrib import admin
 from .models import Ahorros
+from reports.admin import TrackedAdminMixin
 
 # Register your models here.
 
 @admin.register(Ahorros)
-class Ahorros(admin.ModelAdmin):
+class Ahorros(TrackedAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'reason', 'quantity', 'payment', 'loan', 'date_created', 'date_updated', 'date_final', 'period', 'accrued', 'missing')
     search_fields = ('name', 'reason')
     list_filter = ['period']
\ No newline at end of file
@@ -0,0 +1,31 @@
+import django_filters
+from ahorros.models import Ahorros, AhorroMovimiento
+
+
+class AhorrosFilter(django_filters.FilterSet):
+    # ?quantity__gte=1000&period__in=Mensual,Anual&ordering=-quantity
+    ordering = django_filters.OrderingFilter(fields=('id', 'name', 'quantity', 'period'))
+
+    class Meta:
+        model = Ahorros
+        fields = {
+            'name': ['exact', 'in'],
+            'quantity': ['exact', 'gte', 'lte'],
+            'period': ['exact', 'in'],
+        }
+
+
+class AhorroMovimientoFilter(django_filters.FilterSet):
+    # /api/ahorros/{id}/movimientos/?date__gte=2025-01-01&date__lte=2025-03-31&tipo=retiro
+    # Rango de fechas sobre el índice (ahorro, date, id); el signo se evalúa en las filas del rango
+    tipo = django_filters.ChoiceFilter(
+        choices=(('deposito', 'Depósitos'), ('retiro', 'Retiros')), method='filter_tipo')
+
+    class Meta:
+        model = AhorroMovimiento
+        fields = {
+            'date': ['exact', 'gte', 'lte'],
+        }
+
+    def filter_tipo(self, queryset, name, value):
+        return queryset.filter(amount__gt=0) if value == 'deposito' else queryset.filter(amount__lt=0)
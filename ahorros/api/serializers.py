@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from ahorros.models import Ahorros, AhorroMovimiento
 
@@ -5,7 +7,8 @@ class AhorrosSerializer(serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.email')
     class Meta:
         model = Ahorros
-        fields = '__all__'  # Serializa todos los campos del modelo
+        fields = ['id', 'owner', 'name', 'reason', 'quantity', 'payment', 'loan', 'date_created', 'date_updated',
+                  'date_final', 'period', 'accrued', 'missing']
 
 
 class AhorroMovimientoSerializer(serializers.ModelSerializer):
@@ -15,3 +18,10 @@ class AhorroMovimientoSerializer(serializers.ModelSerializer):
     class Meta:
         model = AhorroMovimiento
         fields = ['id', 'owner', 'ahorro', 'amount', 'date', 'note', 'created_at']
+
+
+class DepositoLoteSerializer(serializers.Serializer):
+    # Un elemento de POST /api/ahorros/depositos/ (reparto de un ingreso entre varias metas)
+    ahorro_id = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    note = serializers.CharField(max_length=255, allow_blank=True, required=False, default='')
@@ -3,15 +3,96 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, Value, When
+from django.db.models.functions import Greatest, Round
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from decimal import Decimal, InvalidOperation
+from ahorros import forecast
 from ahorros.models import Ahorros, AhorroMovimiento
-from ahorros.api.serializers import AhorrosSerializer, AhorroMovimientoSerializer
+from ahorros.api.serializers import AhorrosSerializer, AhorroMovimientoSerializer, DepositoLoteSerializer
+from ahorros.api.filters import AhorrosFilter, AhorroMovimientoFilter
+from reports.api.mixins import TrackedWritesMixin
+from reports.api.conditional import ConditionalGetMixin
+from reports.api import fastlist
+from reports.api.mixins import bulk_items, item_errors
+from reports.api.pagination import DateIdCursorPagination
+from reports import cache as report_cache
+from reports import rollups, tracking
+
+
+# Límites del historial de saldo (mismo criterio que /api/reports/balance/)
+HISTORIAL_DEFAULT_POINTS = 1000
+HISTORIAL_MAX_POINTS = 10000
+
+
+def registrar_movimiento(ahorro, owner, amount, date=None, note='', sin_sobregiro=False):
+    """
+    Registra un movimiento (positivo = depósito, negativo = retiro) y ajusta
+    accrued/missing del ahorro con un único UPDATE de expresiones F(): el
+    saldo no se lee en Python, así que dos escrituras simultáneas no se pisan.
+    Con `sin_sobregiro` el propio UPDATE exige `accrued >= -amount`; si no
+    alcanza no se escribe nada y devuelve None.
+    """
+    accrued = Round(F('accrued') + amount, 2)
+    rows = Ahorros.objects.filter(pk=ahorro.pk)
+    if sin_sobregiro:
+        rows = rows.filter(accrued__gte=-amount)
+    with transaction.atomic():
+        # En SQL todo el SET ve los valores previos: missing usa el accrued nuevo explícitamente
+        updated = rows.update(accrued=accrued, missing=Greatest(Value(Decimal(0)), F('quantity') - accrued),
+                              date_updated=timezone.now())
+        if not updated:
+            return None
+        mov = AhorroMovimiento.objects.create(owner=owner, ahorro=ahorro, amount=amount,
+                                              date=date or timezone.localdate(), note=note)
+        # Delta del rollup: `amount` sobre el acumulado (la fila ya tiene el valor real)
+        before = rollups.contributions(ahorro)
+        ahorro.accrued = Decimal(ahorro.accrued) + amount
+        tracking.record_write(ahorro.owner_id, before=before, after=rollups.contributions(ahorro),
+                              changed=[ahorro, mov])
+    return mov
+
+
+def registrar_depositos(ahorros, owner, items):
+    """
+    Depósitos en varios ahorros a la vez (todo o nada). `ahorros`: pk ->
+    instancia del usuario; `items`: dicts validados con ahorro_id, amount y
+    note. Un bulk_create para los movimientos y un solo UPDATE con
+    CASE ahorro -> suma de sus montos para accrued/missing, igual que
+    registrar_movimiento pero para todo el lote.
+    """
+    totals = {}
+    for item in items:
+        totals[item['ahorro_id']] = totals.get(item['ahorro_id'], Decimal(0)) + item['amount']
+    delta = Case(*[When(pk=pk, then=Value(total)) for pk, total in totals.items()],
+                 output_field=DecimalField(max_digits=10, decimal_places=2))
+    accrued = Round(F('accrued') + delta, 2)
+    today = timezone.localdate()
+    movs = [AhorroMovimiento(owner=owner, ahorro=ahorros[item['ahorro_id']], amount=item['amount'],
+                             date=today, note=item['note'])
+            for item in items]
+    before, after = [], []
+    for pk, total in totals.items():
+        ahorro = ahorros[pk]
+        before.extend(rollups.contributions(ahorro))
+        ahorro.accrued = Decimal(ahorro.accrued) + total
+        after.extend(rollups.contributions(ahorro))
+    with transaction.atomic():
+        Ahorros.objects.filter(pk__in=list(totals)).update(
+            accrued=accrued, missing=Greatest(Value(Decimal(0)), F('quantity') - accrued), date_updated=timezone.now())
+        AhorroMovimiento.objects.bulk_create(movs, batch_size=1000)
+        tracking.record_write(owner.pk, before=before, after=after,
+                              changed=[*(ahorros[pk] for pk in totals), *movs])
+    return movs
 
 
 @method_decorator(name='list', decorator=swagger_auto_schema(tags=['Ahorros'], operation_summary='Listar ahorros'))
@@ -33,49 +114,57 @@ from ahorros.api.serializers import AhorrosSerializer, AhorroMovimientoSerialize
 @method_decorator(name='update', decorator=swagger_auto_schema(tags=['Ahorros'], operation_summary='Actualizar ahorro'))
 @method_decorator(name='partial_update', decorator=swagger_auto_schema(tags=['Ahorros'], operation_summary='Actualizar parcialmente ahorro'))
 @method_decorator(name='destroy', decorator=swagger_auto_schema(tags=['Ahorros'], operation_summary='Eliminar ahorro'))
-class AhorrosApiViewSet(ModelViewSet):
+class AhorrosApiViewSet(ConditionalGetMixin, TrackedWritesMixin, ModelViewSet):
     # ViewSet for Ahorros
     serializer_class = AhorrosSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['name', 'quantity', 'period']
+    filterset_class = AhorrosFilter
+
+    def conditional_depends_on_date(self):
+        # El pronóstico se calcula desde hoy: su ETag cambia con la fecha local
+        return self.action == 'pronostico'
 
     def get_queryset(self):
         user = getattr(self.request, 'user', None)
         if not user or not user.is_authenticated:
             return Ahorros.objects.none()
-        return Ahorros.objects.filter(owner=user).order_by('-id')
-
-    def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        return user.ahorros.order_by('-id')
 
-    @swagger_auto_schema(methods=['get'], tags=['Ahorros'], operation_summary="Listar movimientos", responses={200: AhorroMovimientoSerializer(many=True)})
+    @swagger_auto_schema(methods=['get'], tags=['Ahorros'], operation_summary="Listar movimientos", manual_parameters=[
+        openapi.Parameter('date__gte', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+        openapi.Parameter('date__lte', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+        openapi.Parameter('tipo', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['deposito', 'retiro']),
+        openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description='Activa la paginación por cursor (respuesta { next, results })'),
+        openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+    ], responses={200: AhorroMovimientoSerializer(many=True)})
     @swagger_auto_schema(methods=['post'], tags=['Ahorros'], operation_summary="Crear movimiento", request_body=AhorroMovimientoSerializer, responses={201: AhorroMovimientoSerializer})
     @action(detail=True, methods=['get', 'post'])
     def movimientos(self, request, pk=None):
         """Lista o crea movimientos asociados a un ahorro."""
         ahorro = self.get_object()
         if request.method.lower() == 'get':
-            movimientos = ahorro.movimientos.all()
-            ser = AhorroMovimientoSerializer(movimientos, many=True)
-            return Response(ser.data)
+            # Tuplas + codificador precompilado: mismo JSON que AhorroMovimientoSerializer
+            filterset = AhorroMovimientoFilter(request.query_params, queryset=ahorro.movimientos.order_by('-date', '-id'),
+                                               request=request)
+            if not filterset.is_valid():
+                raise translate_validation(filterset.errors)
+            columns, encode = fastlist.compile_encoder(AhorroMovimientoSerializer).bind()
+            # named=True: la paginación por cursor lee `date` e `id` de la fila
+            rows = filterset.qs.values_list(*columns, named=True)
+            # Opt-in como en los listados: ?page_size=N / ?cursor=... sobre el índice (ahorro, date, id)
+            paginator = DateIdCursorPagination()
+            page = paginator.paginate_queryset(rows, request, view=self)
+            if page is not None:
+                return paginator.get_paginated_response([encode(row) for row in page])
+            return Response([encode(row) for row in rows])
 
         # POST crear movimiento gen�rico (pos/neg)
         ser = AhorroMovimientoSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
-        amount = ser.validated_data['amount']
-        # Guardar movimiento
-        mov = AhorroMovimiento.objects.create(
-            owner=request.user,
-            ahorro=ahorro,
-            amount=amount,
-            date=ser.validated_data.get('date'),
-            note=ser.validated_data.get('note', ''),
-        )
-        # Actualizar acumulado y faltante
-        ahorro.accrued = (Decimal(ahorro.accrued) + Decimal(amount))
-        ahorro.missing = max(Decimal(0), Decimal(ahorro.quantity) - Decimal(ahorro.accrued))
-        ahorro.save()
+        mov = registrar_movimiento(ahorro, request.user, ser.validated_data['amount'],
+                                   date=ser.validated_data.get('date'), note=ser.validated_data.get('note', ''))
         return Response(AhorroMovimientoSerializer(mov).data, status=status.HTTP_201_CREATED)
 
     @swagger_auto_schema(
@@ -102,11 +191,7 @@ class AhorrosApiViewSet(ModelViewSet):
             return Response({'detail': 'amount inv�lido'}, status=400)
         if amount <= 0:
             return Response({'detail': 'amount debe ser > 0'}, status=400)
-        note = request.data.get('note', '')
-        mov = AhorroMovimiento.objects.create(owner=request.user, ahorro=ahorro, amount=amount, note=note)
-        ahorro.accrued = Decimal(ahorro.accrued) + amount
-        ahorro.missing = max(Decimal(0), Decimal(ahorro.quantity) - Decimal(ahorro.accrued))
-        ahorro.save()
+        mov = registrar_movimiento(ahorro, request.user, amount, note=request.data.get('note', ''))
         return Response(AhorroMovimientoSerializer(mov).data, status=201)
 
     @swagger_auto_schema(
@@ -133,11 +218,106 @@ class AhorrosApiViewSet(ModelViewSet):
             return Response({'detail': 'amount inv�lido'}, status=400)
         if amount <= 0:
             return Response({'detail': 'amount debe ser > 0'}, status=400)
-        if Decimal(ahorro.accrued) - amount < 0:
+        # Control de sobregiro en el mismo UPDATE (sin leer el saldo antes)
+        mov = registrar_movimiento(ahorro, request.user, -amount, note=request.data.get('note', ''), sin_sobregiro=True)
+        if mov is None:
             return Response({'detail': 'retiro excede el acumulado actual'}, status=400)
-        note = request.data.get('note', '')
-        mov = AhorroMovimiento.objects.create(owner=request.user, ahorro=ahorro, amount=-amount, note=note)
-        ahorro.accrued = Decimal(ahorro.accrued) - amount
-        ahorro.missing = max(Decimal(0), Decimal(ahorro.quantity) - Decimal(ahorro.accrued))
-        ahorro.save()
         return Response(AhorroMovimientoSerializer(mov).data, status=201)
+
+    @swagger_auto_schema(
+        method='post',
+        tags=['Ahorros'],
+        operation_summary='Depositar en varios ahorros',
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                required=['ahorro_id', 'amount'],
+                properties={
+                    'ahorro_id': openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+                    'amount': openapi.Schema(type=openapi.TYPE_STRING, example='200.00'),
+                    'note': openapi.Schema(type=openapi.TYPE_STRING, example='salario'),
+                },
+            ),
+        ),
+        responses={201: AhorroMovimientoSerializer(many=True)}
+    )
+    @action(detail=False, methods=['post'])
+    def depositos(self, request):
+        """Reparte depósitos entre varios ahorros en una sola transacción (todo o nada)."""
+        items, error = bulk_items(request)
+        if error is not None:
+            return error
+        ids = [item.get('ahorro_id') if isinstance(item, dict) else None for item in items]
+        # Propiedad de todos los ahorros con una sola consulta (solo los del usuario)
+        ahorros = self.get_queryset().order_by().in_bulk([pk for pk in ids if isinstance(pk, int)])
+        ser = DepositoLoteSerializer(data=items, many=True)
+        ser.is_valid()
+        errors = list(ser.errors) if ser.errors else [{} for _ in items]
+        for index, pk in enumerate(ids):
+            if pk not in ahorros and 'ahorro_id' not in errors[index]:
+                errors[index] = {**errors[index], 'ahorro_id': ['No encontrado.']}
+        if any(errors):
+            return Response({'errors': item_errors(errors)}, status=400)
+        movs = registrar_depositos(ahorros, request.user, ser.validated_data)
+        return Response(AhorroMovimientoSerializer(movs, many=True).data, status=201)
+
+    @swagger_auto_schema(
+        method='get',
+        tags=['Ahorros'],
+        operation_summary='Historial de saldo del ahorro',
+        manual_parameters=[
+            openapi.Parameter('max_points', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f'Máximo de puntos devueltos (2-{HISTORIAL_MAX_POINTS}, por defecto {HISTORIAL_DEFAULT_POINTS})'),
+        ],
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'points': 2, 'downsampled': False,
+            'series': {'date': ['2025-08-01', '2025-09-01'], 'balance': [200.0, 400.0]},
+        }})}
+    )
+    @action(detail=True, methods=['get'])
+    def historial(self, request, pk=None):
+        """Saldo del ahorro al cierre de cada día con movimientos (suma acumulada)."""
+        try:
+            max_points = int(request.query_params.get('max_points', HISTORIAL_DEFAULT_POINTS))
+        except ValueError:
+            raise ValidationError({'max_points': 'Debe ser un entero.'})
+        if not 2 <= max_points <= HISTORIAL_MAX_POINTS:
+            raise ValidationError({'max_points': f'Debe estar entre 2 y {HISTORIAL_MAX_POINTS}.'})
+        ahorro = self.get_object()
+        # Caché por ahorro: la clave cambia con cada movimiento nuevo (los movimientos no se editan)
+        last = ahorro.movimientos.aggregate(last=Max('id'))['last']
+        data = report_cache.cached_many('ahorros:historial', {ahorro.pk: (last, max_points)},
+                                        lambda ids: {ahorro.pk: forecast.history(ahorro.pk, max_points)})
+        return Response(data[ahorro.pk])
+
+    @swagger_auto_schema(
+        method='get',
+        tags=['Ahorros'],
+        operation_summary='Pronóstico de las metas de ahorro',
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'today': '2025-09-01',
+            'results': [{'id': 1, 'remaining': '1200.00', 'completed': False, 'payments_needed': 6,
+                         'eta': '2026-03-01', 'date_final': '2025-12-31', 'on_track': False,
+                         'required_payment': '300.00'}],
+        }})}
+    )
+    @action(detail=False, methods=['get'])
+    def pronostico(self, request):
+        """
+        Fecha estimada en la que cada meta (con los filtros del listado)
+        alcanza `quantity` aportando `payment` cada `period` desde su último
+        movimiento, y si llega antes de `date_final`.
+        """
+        today = timezone.localdate()
+        goals = {
+            row[0]: row for row in self.filter_queryset(self.get_queryset())
+            .annotate(last_id=Max('movimientos__id'), last_date=Max('movimientos__date'))
+            .values_list('id', 'quantity', 'accrued', 'payment', 'period', 'date_final', 'last_date',
+                         'last_id', 'date_updated')
+        }
+        # Una entrada por meta; cambia con su último movimiento, con cualquier edición de la meta y con el día
+        parts = {pk: (row[7], row[8].timestamp(), today) for pk, row in goals.items()}
+        data = report_cache.cached_many('ahorros:pronostico', parts,
+                                        lambda ids: forecast.forecast([goals[pk][:7] for pk in ids], today))
+        return Response({'today': today.isoformat(), 'results': [data[pk] for pk in goals]})
@@ -0,0 +1,89 @@
+# ahorros/forecast.py
+"""
+Historial de saldo y pronóstico de cada meta de ahorro.
+
+- Historial: la base agrupa los movimientos del ahorro por día y el saldo al
+  cierre de cada día es la suma acumulada (`np.cumsum`) de esos netos.
+- Pronóstico: todas las metas del usuario se cargan como arreglos y se
+  calcula para todas a la vez, sin bucles por meta, cuántos aportes de
+  `payment` faltan para `quantity` y en qué fecha cae el último. Las fechas
+  de los aportes siguen `period` con la misma aritmética que los fijos
+  (`reports.projection.RecurringItems`), ancladas en el último movimiento.
+  Con `date_final` se indica si la meta llega a tiempo y qué aporte haría
+  falta para lograrlo.
+
+Los importes se pasan a centavos enteros antes de dividir: la cantidad de
+aportes (un techo) no sufre errores de redondeo de coma flotante.
+"""
+import numpy as np
+from django.db.models import Sum
+
+from ahorros.models import AhorroMovimiento
+from reports.balance import downsample
+from reports.projection import RecurringItems
+
+_FAR = np.datetime64('9999-12-31', 'D')
+
+
+def history(ahorro_id, max_points):
+    """Saldo al cierre de cada día con movimientos: `{'date': [...], 'balance': [...], 'downsampled'}`."""
+    rows = list(AhorroMovimiento.objects.filter(ahorro_id=ahorro_id).order_by('date')
+                .values('date').annotate(total=Sum('amount')).values_list('date', 'total'))
+    days = np.array([row[0] for row in rows], dtype='datetime64[D]')
+    balance = np.cumsum(np.fromiter((float(row[1] or 0) for row in rows), dtype='float64', count=len(rows)))
+    days, balance = downsample(days, balance, max_points)
+    return {
+        'points': len(days),
+        'downsampled': len(days) < len(rows),
+        'series': {
+            'date': [str(d) for d in days],
+            'balance': [round(float(b), 2) for b in balance],
+        },
+    }
+
+
+def _cents(values):
+    return np.fromiter((round(float(v or 0) * 100) for v in values), dtype='int64', count=len(values))
+
+
+def forecast(goals, today):
+    """
+    Pronóstico de varias metas en una sola pasada. `goals`: filas
+    `(id, quantity, accrued, payment, period, date_final, último movimiento)`.
+    Devuelve {id: dict}.
+    """
+    if not goals:
+        return {}
+    ids, quantity, accrued, payment, periods, finals, lasts = zip(*goals)
+    remaining = np.maximum(_cents(quantity) - _cents(accrued), 0)
+    payment = _cents(payment)
+    # Aportes a partir del último movimiento (o de hoy si no hay) con la cadencia de `period`
+    items = RecurringItems.from_rows((1, period, last or today, None) for period, last in zip(periods, lasts))
+    tomorrow = np.datetime64(today, 'D') + 1
+    first, _ = items.bounds(tomorrow, _FAR)  # Primer aporte desde mañana (los pasados ya no cuentan)
+    first = np.maximum(first, 1)
+
+    reachable = (payment > 0) & (remaining > 0)
+    needed = np.where(reachable, -(-remaining // np.maximum(payment, 1)), 0)
+    eta = items.occurrence(first + np.maximum(needed - 1, 0))
+
+    final = np.array([d or _FAR for d in finals], dtype='datetime64[D]')
+    has_final = final != _FAR
+    # Aportes que caben hasta date_final y el monto de cada uno para completar a tiempo
+    left = np.where(has_final, items.counts(tomorrow, final), 0)
+    required = np.where(left > 0, -(-remaining // np.maximum(left, 1)), 0)
+    on_track = (remaining == 0) | (reachable & (eta <= final))
+
+    out = {}
+    for i, pk in enumerate(ids):
+        out[pk] = {
+            'id': pk,
+            'remaining': f'{remaining[i] / 100:.2f}',
+            'completed': bool(remaining[i] == 0),
+            'payments_needed': int(needed[i]) if reachable[i] else None,
+            'eta': str(eta[i]) if reachable[i] else None,
+            'date_final': str(final[i]) if has_final[i] else None,
+            'on_track': bool(on_track[i]) if has_final[i] else None,
+            'required_payment': f'{required[i] / 100:.2f}' if reachable[i] and left[i] > 0 else None,
+        }
+    return out
@@ -0,0 +1,81 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from ahorros import reconcile
+
+
+def _init_worker():
+    # Con `spawn` el proceso hijo arranca sin Django configurado; con `fork` no hace nada
+    django.setup()
+
+
+def _run_chunk(args):
+    first, last, dry_run, owner_ids = args
+    return reconcile.reconcile_chunk(first, last, dry_run=dry_run, owner_ids=owner_ids)
+
+
+def _run_chunk_in_worker(args):
+    try:
+        return _run_chunk(args)
+    finally:
+        connections.close_all()  # Como al terminar una petición: no dejar conexiones abiertas en el proceso
+
+
+class Command(BaseCommand):
+    help = "Recompute Ahorros.accrued and missing from the sum of their movimientos"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report the differences without writing")
+        parser.add_argument("--email", action="append", default=[], help="Only reconcile this user (repeatable)")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Worker processes (1 = run in this process)")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Users per chunk")
+
+    def handle(self, *args, **options):
+        owner_ids = None
+        if options["email"]:
+            User = get_user_model()
+            owner_ids = list(User.objects.filter(email__in=options["email"]).values_list("id", flat=True))
+            if not owner_ids:
+                raise CommandError("No users found for the given emails")
+        if options["workers"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--workers and --chunk-size must be positive")
+
+        started = time.perf_counter()
+        chunks = [(first, last, options["dry_run"], owner_ids)
+                  for first, last in reconcile.owner_chunks(options["chunk_size"], owner_ids)]
+        workers = min(options["workers"], len(chunks))
+        if connection.vendor == "sqlite" and not options["dry_run"]:
+            # SQLite admite un solo escritor: los procesos solo se bloquearían entre sí
+            workers = 1
+        if workers <= 1:
+            found = self.report(map(_run_chunk, chunks), options["verbosity"])
+        else:
+            # Los hijos abren sus propias conexiones: no heredar las del proceso padre
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                found = self.report(pool.map(_run_chunk_in_worker, chunks), options["verbosity"])
+
+        elapsed = time.perf_counter() - started
+        if options["dry_run"]:
+            self.stdout.write(f"{found} ahorro(s) out of sync ({len(chunks)} chunk(s), {elapsed:.1f} s, dry run)")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Reconciled {found} ahorro(s) ({len(chunks)} chunk(s), {max(workers, 1)} worker(s), {elapsed:.1f} s)"))
+
+    def report(self, results, verbosity):
+        found = 0
+        for diffs in results:
+            found += len(diffs)
+            if verbosity < 1:
+                continue
+            for pk, owner_id, accrued, new_accrued, missing, new_missing in diffs:
+                self.stdout.write(f"ahorro #{pk} (owner {owner_id}): accrued {accrued} -> {new_accrued}, "
+                                  f"missing {missing} -> {new_missing}")
+        return found
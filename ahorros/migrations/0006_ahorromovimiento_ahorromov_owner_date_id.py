@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ahorros', '0005_alter_ahorros_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ahorromovimiento',
+            index=models.Index(fields=['owner', 'date', 'id'], name='ahorromov_owner_date_id'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ahorros', '0006_ahorromovimiento_ahorromov_owner_date_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ahorromovimiento',
+            name='seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ahorromovimiento',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='ahorros',
+            name='seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='ahorromovimiento',
+            index=models.Index(fields=['owner', 'seq'], name='ahorromov_owner_seq'),
+        ),
+        migrations.AddIndex(
+            model_name='ahorros',
+            index=models.Index(fields=['owner', 'seq'], name='ahorros_owner_seq'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ahorros', '0007_ahorromovimiento_seq_ahorromovimiento_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ahorros',
+            index=models.Index(fields=['owner', 'name'], name='ahorros_owner_name'),
+        ),
+        migrations.AddIndex(
+            model_name='ahorros',
+            index=models.Index(fields=['owner', 'quantity'], name='ahorros_owner_quantity'),
+        ),
+        migrations.AddIndex(
+            model_name='ahorros',
+            index=models.Index(fields=['owner', 'period'], name='ahorros_owner_period'),
+        ),
+    ]
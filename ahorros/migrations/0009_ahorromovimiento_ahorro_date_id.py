@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ahorros', '0008_list_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ahorromovimiento',
+            index=models.Index(fields=['ahorro', 'date', 'id'], name='ahorromov_ahorro_date_id'),
+        ),
+    ]
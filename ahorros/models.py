@@ -17,10 +17,20 @@ class Ahorros(models.Model):
     period = models.CharField(max_length=100, default='Mensual')  # Por ejemplo: 'Mensual', 'Anual'
     accrued = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)  # Acumulado
     missing = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)  # Faltante
+    # Secuencia de sincronización: versión de datos del usuario en la última escritura (ver reports/sync.py)
+    seq = models.BigIntegerField(default=0, editable=False)
 
 
     class Meta:
         verbose_name_plural = "Ahorros"
+        indexes = [
+            # Cambios de un usuario desde una versión (/api/sync/)
+            models.Index(fields=['owner', 'seq'], name='ahorros_owner_seq'),
+            # Filtros y orden del listado (ver api/filters.py)
+            models.Index(fields=['owner', 'name'], name='ahorros_owner_name'),
+            models.Index(fields=['owner', 'quantity'], name='ahorros_owner_quantity'),
+            models.Index(fields=['owner', 'period'], name='ahorros_owner_period'),
+        ]
 
     def __str__(self):
         return self.name
@@ -43,6 +53,17 @@ class AhorroMovimiento(models.Model):
     note = models.CharField(max_length=255, blank=True, default='')
     # Marca de tiempo de creación
     created_at = models.DateTimeField(auto_now_add=True)
+    # Secuencia de sincronización: versión de datos del usuario en la última escritura (ver reports/sync.py)
+    seq = models.BigIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)  # Última modificación
 
     class Meta:
         ordering = ['-date', '-id']
+        indexes = [
+            # Movimientos de un usuario por fecha (listados y paginación por cursor)
+            models.Index(fields=['owner', 'date', 'id'], name='ahorromov_owner_date_id'),
+            # Historial de un ahorro por fecha (/api/ahorros/{id}/movimientos/, filtros y cursor)
+            models.Index(fields=['ahorro', 'date', 'id'], name='ahorromov_ahorro_date_id'),
+            # Cambios de un usuario desde una versión (/api/sync/)
+            models.Index(fields=['owner', 'seq'], name='ahorromov_owner_seq'),
+        ]
@@ -0,0 +1,91 @@
+# ahorros/reconcile.py
+"""
+Conciliación de `Ahorros.accrued` / `missing` con sus movimientos
+(`python manage.py reconcile_ahorros`).
+
+`accrued` y `missing` están desnormalizados: el valor correcto de
+`accrued` es la suma de los `amount` de los movimientos del ahorro (0 si
+no tiene) y `missing = max(0, quantity - accrued)`. Todo se calcula en SQL,
+por tramos de usuarios: una consulta con la subconsulta de la suma por
+ahorro (índice (ahorro, date, id)) trae solo las filas que no cuadran y un
+UPDATE con la misma expresión las corrige. Nunca se recorre ahorro por
+ahorro en Python.
+
+Los tramos son independientes (cada uno en su transacción, con las filas
+de sus ahorros bloqueadas), así que se reparten entre procesos (`--workers`).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Round
+
+from ahorros.models import Ahorros, AhorroMovimiento
+from reports import rollups, tracking
+
+_MONEY = DecimalField(max_digits=10, decimal_places=2)
+_CENT = Decimal('0.01')
+
+
+def expected_accrued():
+    """Expresión: suma de los movimientos del ahorro de la fila (0 si no hay)."""
+    total = (AhorroMovimiento.objects.filter(ahorro=OuterRef('pk')).order_by()
+             .values('ahorro').annotate(total=Sum('amount')).values('total'))
+    return Round(Coalesce(Subquery(total, output_field=_MONEY), Value(Decimal(0)), output_field=_MONEY), 2,
+                 output_field=_MONEY)
+
+
+def expected_missing(accrued):
+    return Greatest(Value(Decimal(0)), F('quantity') - accrued, output_field=_MONEY)
+
+
+def owner_chunks(size, owner_ids=None):
+    """Tramos `(primer, último)` de owner_id con a lo sumo `size` usuarios con ahorros cada uno."""
+    owners = Ahorros.objects.order_by('owner_id').values_list('owner_id', flat=True).distinct()
+    if owner_ids is not None:
+        owners = owners.filter(owner_id__in=owner_ids)
+    owners = list(owners)
+    return [(owners[i], owners[min(i + size, len(owners)) - 1]) for i in range(0, len(owners), size)]
+
+
+def reconcile_chunk(first, last, dry_run=False, owner_ids=None):
+    """
+    Concilia los ahorros de los usuarios `first..last`. Devuelve las
+    diferencias encontradas: `(id, owner_id, accrued, accrued esperado,
+    missing, missing esperado)`. Con `dry_run` no escribe nada.
+    """
+    rows = Ahorros.objects.filter(owner_id__gte=first, owner_id__lte=last)
+    if owner_ids is not None:
+        rows = rows.filter(owner_id__in=owner_ids)
+    mismatched = (
+        rows.annotate(expected_accrued=expected_accrued())
+        .annotate(expected_missing=expected_missing(F('expected_accrued')))
+        .filter(~Q(accrued=F('expected_accrued')) | ~Q(missing=F('expected_missing')))
+        .order_by('id')
+        .values_list('id', 'owner_id', 'accrued', 'expected_accrued', 'missing', 'expected_missing')
+    )
+    with transaction.atomic():
+        if not dry_run:
+            # Primero se bloquean las filas: un movimiento en curso (que actualiza su ahorro) termina
+            # antes, y la consulta siguiente ya lo ve. Sin esto el acumulado leído podría no ser el
+            # que queda al escribir y el delta de los rollups saldría descuadrado
+            list(rows.select_for_update().order_by('id').values_list('id', flat=True))
+        # Las anotaciones llegan sin redondear a 2 decimales (según la base): se igualan a los campos
+        diffs = [(pk, owner_id, accrued, new_accrued.quantize(_CENT), missing, new_missing.quantize(_CENT))
+                 for pk, owner_id, accrued, new_accrued, missing, new_missing in mismatched]
+        if dry_run or not diffs:
+            return diffs
+
+        accrued = expected_accrued()
+        Ahorros.objects.filter(pk__in=[diff[0] for diff in diffs]).update(
+            accrued=accrued, missing=expected_missing(accrued))
+        # Rollups (delta del acumulado), versión de datos y /api/sync/: una escritura por usuario
+        by_owner = {}
+        for pk, owner_id, old, new, _, _ in diffs:
+            by_owner.setdefault(owner_id, []).append((pk, old, new))
+        for owner_id, changes in by_owner.items():
+            before = [c for pk, old, _ in changes for c in rollups.contributions(Ahorros(pk=pk, accrued=old))]
+            after = [c for pk, _, new in changes for c in rollups.contributions(Ahorros(pk=pk, accrued=new))]
+            tracking.record_write(owner_id, before=before, after=after,
+                                  changed=[Ahorros.objects.filter(pk__in=[pk for pk, _, _ in changes])])
+    return diffs
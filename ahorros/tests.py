@@ -1,3 +1,408 @@
-from django.test import TestCase
+import threading
+import time
+from io import StringIO
+from unittest import mock
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import User
+from ahorros.models import Ahorros, AhorroMovimiento
+from ahorros.api.filters import AhorroMovimientoFilter
+from ahorros.api.views import AhorrosApiViewSet, registrar_movimiento
+from reports import rollups
+from reports.models import MonthlyRollup
+from reports.testing import ExplainAssertionsMixin, QueryBudgetMixin, RollupAssertionsMixin
+
+PERIODS = ['Diario', 'Semanal', 'Quincenal', 'Mensual', 'Bimestral', 'Trimestral', 'Cuatrimestral', 'Semestral', 'Anual']
+
+
+class ListFilterIndexTests(ExplainAssertionsMixin, TestCase):
+    """Cada filtro del listado se resuelve con su índice (owner, campo) (EXPLAIN)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(email=f'filtros{k}@example.com', password='x') for k in range(5)]
+        cls.user = users[0]
+        for owner in users:
+            Ahorros.objects.bulk_create([
+                Ahorros(owner=owner, name=f'meta {i % 40}', reason='r', quantity=Decimal(i % 500), payment=1,
+                        period=PERIODS[i % len(PERIODS)])
+                for i in range(400)
+            ])
+        cls.analyze()
+
+    def test_filtros(self):
+        cases = [
+            ({'quantity__gte': '480', 'quantity__lte': '490'}, 'ahorros_owner_quantity', 'quantity'),
+            ({'name__in': 'meta 1,meta 2'}, 'ahorros_owner_name', 'name'),
+            ({'period': 'Anual'}, 'ahorros_owner_period', 'period'),
+        ]
+        for params, index, column in cases:
+            self.assertUsesIndex(self.filtered(AhorrosApiViewSet, params), index, column)
+
+    def test_orden(self):
+        self.assertUsesIndex(self.filtered(AhorrosApiViewSet, {'ordering': '-quantity'}), 'ahorros_owner_quantity')
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Listados, detalle y movimientos con un número fijo de consultas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='consultas@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ahorro = Ahorros.objects.create(owner=self.user, name='meta', reason='r', quantity=100, payment=10)
+        self.add_ahorros(2)
+        self.add_movimientos(2)
+
+    def add_ahorros(self, n):
+        Ahorros.objects.bulk_create([
+            Ahorros(owner=self.user, name=f'meta {i}', reason='r', quantity=100, payment=10) for i in range(n)
+        ])
+
+    def add_movimientos(self, n):
+        AhorroMovimiento.objects.bulk_create([
+            AhorroMovimiento(owner=self.user, ahorro=self.ahorro, amount=1) for _ in range(n)
+        ])
+
+    def test_listado_y_detalle(self):
+        self.assertQueriesDoNotGrow(self.get_ok('/api/ahorros/'), self.add_ahorros)
+        self.assertQueriesDoNotGrow(self.get_ok(f'/api/ahorros/{self.ahorro.pk}/'), self.add_movimientos)
+
+    def test_movimientos(self):
+        self.assertQueriesDoNotGrow(self.get_ok(f'/api/ahorros/{self.ahorro.pk}/movimientos/'), self.add_movimientos)
+
+
+class MovimientosHistorialTests(ExplainAssertionsMixin, TestCase):
+    """Historial de movimientos de un ahorro: filtros, cursor y su índice (ahorro, date, id)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='historial@example.com', password='x')
+        ahorros = Ahorros.objects.bulk_create([
+            Ahorros(owner=cls.user, name=f'meta {k}', reason='r', quantity=1000, payment=10) for k in range(20)
+        ])
+        cls.ahorro = ahorros[0]
+        start = date(2022, 1, 3)
+        # Tres años de aportes semanales con un retiro cada diez semanas, en cada ahorro
+        AhorroMovimiento.objects.bulk_create([
+            AhorroMovimiento(owner=cls.user, ahorro=ahorro, date=start + timedelta(weeks=i),
+                             amount=Decimal(-5 if i % 10 == 9 else 10))
+            for ahorro in ahorros for i in range(156)
+        ])
+        cls.analyze()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/ahorros/{self.ahorro.pk}/movimientos/'
+
+    def test_filtros(self):
+        response = self.client.get(self.url, {'date__gte': '2023-01-01', 'date__lte': '2023-12-31', 'tipo': 'retiro'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+        self.assertTrue(all(row['amount'] == '-5.00' and row['date'].startswith('2023-') for row in response.data))
+        self.assertEqual(self.client.get(self.url, {'tipo': 'otro'}).status_code, 400)
+
+    def test_paginas(self):
+        # Sin page_size/cursor la respuesta sigue siendo la lista completa
+        full = self.client.get(self.url, {'tipo': 'deposito'}).data
+        self.assertEqual(len(full), 156 - 15)
+        seen, url, params = [], self.url, {'tipo': 'deposito', 'page_size': 40}
+        while url:
+            data = self.client.get(url, params).data
+            seen += data['results']
+            url, params = data['next'], None
+        self.assertEqual(seen, full)
+
+    def test_indice(self):
+        params = {'date__gte': '2023-01-01', 'date__lte': '2023-03-31', 'tipo': 'deposito'}
+        queryset = AhorroMovimientoFilter(params, queryset=self.ahorro.movimientos.order_by('-date', '-id')).qs
+        self.assertUsesIndex(queryset, 'ahorromov_ahorro_date_id', 'date')
+
+
+class DepositosLoteTests(QueryBudgetMixin, TestCase):
+    """POST /api/ahorros/depositos/: reparto entre varias metas, todo o nada."""
+    url = '/api/ahorros/depositos/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='lote@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ahorros = [
+            Ahorros.objects.create(owner=self.user, name=f'meta {k}', reason='r', quantity=Decimal('500.00'),
+                                   payment=10, accrued=Decimal('100.00'), missing=Decimal('400.00'))
+            for k in range(3)
+        ]
+        other = User.objects.create_user(email='ajeno@example.com', password='x')
+        self.ajeno = Ahorros.objects.create(owner=other, name='ajeno', reason='r', quantity=100, payment=10)
+
+    def saldos(self):
+        return list(Ahorros.objects.filter(owner=self.user).order_by('id').values_list('accrued', 'missing'))
+
+    def test_reparto(self):
+        a, b, c = (ahorro.pk for ahorro in self.ahorros)
+        response = self.client.post(self.url, [
+            {'ahorro_id': a, 'amount': '150.00', 'note': 'salario'},
+            {'ahorro_id': b, 'amount': '450.50'},
+            {'ahorro_id': a, 'amount': '0.25'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([(row['ahorro'], row['amount'], row['note']) for row in response.data],
+                         [(a, '150.00', 'salario'), (b, '450.50', ''), (a, '0.25', '')])
+        self.assertEqual(self.saldos(), [(Decimal('250.25'), Decimal('249.75')), (Decimal('550.50'), Decimal('0.00')),
+                                         (Decimal('100.00'), Decimal('400.00'))])
+        rollup = MonthlyRollup.objects.get(owner=self.user, category='ahorros_acumulado')
+        self.assertEqual(rollup.total, Decimal('600.75'))
+
+    def test_todo_o_nada(self):
+        before = self.saldos()
+        cases = [
+            [{'ahorro_id': self.ahorros[0].pk, 'amount': '10'}, {'ahorro_id': self.ajeno.pk, 'amount': '10'}],
+            [{'ahorro_id': self.ahorros[0].pk, 'amount': '10'}, {'ahorro_id': self.ahorros[1].pk, 'amount': '-1'}],
+            [],
+        ]
+        for body in cases:
+            self.assertEqual(self.client.post(self.url, body, format='json').status_code, 400)
+        response = self.client.post(self.url, cases[0], format='json')
+        self.assertEqual(response.data['errors'], [{'index': 1, 'errors': {'ahorro_id': ['No encontrado.']}}])
+        self.assertEqual(self.saldos(), before)
+        self.assertFalse(AhorroMovimiento.objects.exists())
+
+    @override_settings(BULK_MAX_ITEMS=2)
+    def test_limite_de_elementos(self):
+        # Mismo límite que los /bulk/ (reports.api.mixins.bulk_items)
+        body = [{'ahorro_id': ahorro.pk, 'amount': '1'} for ahorro in self.ahorros] * 3
+        response = self.client.post(self.url, body[:3], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], 'Máximo 2 elementos por petición.')
+        self.assertFalse(AhorroMovimiento.objects.exists())
+
+    def test_consultas(self):
+        def post():
+            body = [{'ahorro_id': ahorro.pk, 'amount': '1'} for ahorro in self.ahorros]
+            self.assertEqual(self.client.post(self.url, body, format='json').status_code, 201)
+
+        def add_ahorros(n):
+            self.ahorros += Ahorros.objects.bulk_create([
+                Ahorros(owner=self.user, name=f'extra {i}', reason='r', quantity=100, payment=10) for i in range(n)
+            ])
+
+        self.assertQueriesDoNotGrow(post, add_ahorros)
+
+
+class ReconcileAhorrosTests(RollupAssertionsMixin, TestCase):
+    """manage.py reconcile_ahorros: accrued = suma de movimientos, missing = max(0, quantity - accrued)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='conciliar@example.com', password='x')
+        self.ok = self.ahorro(accrued='0.30', missing='99.70', movimientos=['0.10', '0.10', '0.10'])
+        self.desfasado = self.ahorro(accrued='75.00', missing='25.00', movimientos=['50.00', '-20.00'])
+        self.sin_movimientos = self.ahorro(accrued='10.00', missing='0.00', movimientos=[])
+
+    def ahorro(self, accrued, missing, movimientos):
+        ahorro = Ahorros.objects.create(owner=self.user, name='meta', reason='r', quantity=Decimal('100.00'),
+                                        payment=1, accrued=Decimal(accrued), missing=Decimal(missing))
+        AhorroMovimiento.objects.bulk_create([
+            AhorroMovimiento(owner=self.user, ahorro=ahorro, amount=Decimal(amount)) for amount in movimientos
+        ])
+        return ahorro
+
+    def reconcile(self, *args):
+        out = StringIO()
+        call_command('reconcile_ahorros', '--workers', '1', *args, stdout=out)
+        return out.getvalue()
+
+    def saldos(self):
+        return list(Ahorros.objects.order_by('id').values_list('accrued', 'missing'))
+
+    def test_dry_run(self):
+        before = self.saldos()
+        output = self.reconcile('--dry-run')
+        self.assertIn(f'ahorro #{self.desfasado.pk} (owner {self.user.pk}): accrued 75.00 -> 30.00, '
+                      f'missing 25.00 -> 70.00', output)
+        self.assertIn(f'ahorro #{self.sin_movimientos.pk} ', output)
+        self.assertNotIn(f'ahorro #{self.ok.pk} ', output)
+        self.assertIn('2 ahorro(s) out of sync', output)
+        self.assertEqual(self.saldos(), before)
+
+    def test_corrige(self):
+        self.reconcile('--chunk-size', '1')
+        self.assertEqual(self.saldos(), [(Decimal('0.30'), Decimal('99.70')), (Decimal('30.00'), Decimal('70.00')),
+                                         (Decimal('0.00'), Decimal('100.00'))])
+        # Delta del acumulado en el rollup y filas marcadas para /api/sync/
+        rollup = MonthlyRollup.objects.get(owner=self.user, category='ahorros_acumulado')
+        self.assertEqual(rollup.total, Decimal('-55.00'))
+        self.assertEqual(list(Ahorros.objects.filter(seq__gt=0).order_by('id').values_list('id', flat=True)),
+                         [self.desfasado.pk, self.sin_movimientos.pk])
+        self.assertIn('0 ahorro(s) out of sync', self.reconcile('--dry-run'))
+
+    def test_movimiento_simultaneo(self):
+        # Un depósito que termina mientras se toman los bloqueos: la diferencia se calcula después
+        # y el rollup queda igual que recalculado desde cero
+        rollups.rebuild([self.user.pk])  # Rollups al día con los acumulados (aún desfasados) de setUp
+        lock = QuerySet.select_for_update
+
+        def deposit_then_lock(queryset, *args, **kwargs):
+            if queryset.model is Ahorros and not AhorroMovimiento.objects.filter(note='en curso').exists():
+                registrar_movimiento(self.desfasado, self.user, Decimal('5.00'), note='en curso')
+            return lock(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'select_for_update', deposit_then_lock):
+            self.reconcile()
+        self.desfasado.refresh_from_db()
+        self.assertEqual((self.desfasado.accrued, self.desfasado.missing), (Decimal('35.00'), Decimal('65.00')))
+        self.assertRollupsMatchRebuild(self.user)
+
+
+class HistorialPronosticoTests(QueryBudgetMixin, TestCase):
+    """Historial de saldo por ahorro y pronóstico de todas las metas (caché por último movimiento)."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='pronostico@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = timezone.localdate()
+        self.viaje = Ahorros.objects.create(owner=self.user, name='viaje', reason='r', quantity=Decimal('1.10'),
+                                            payment=Decimal('0.10'), period='Semanal',
+                                            date_final=self.today + timedelta(days=30))
+        self.sin_aporte = Ahorros.objects.create(owner=self.user, name='sin aporte', reason='r', quantity=50,
+                                                 payment=0, period='Mensual')
+
+    def pronostico(self):
+        response = self.client.get('/api/ahorros/pronostico/')
+        self.assertEqual(response.status_code, 200)
+        return {row['id']: row for row in response.data['results']}
+
+    def test_historial(self):
+        url = f'/api/ahorros/{self.viaje.pk}/historial/'
+        for day, amount in [('2025-01-10', '300.00'), ('2025-01-10', '-50.00'), ('2025-02-01', '25.50')]:
+            self.client.post(f'/api/ahorros/{self.viaje.pk}/movimientos/', {'amount': amount, 'date': day}, format='json')
+        self.assertEqual(self.client.get(url).data['series'], {'date': ['2025-01-10', '2025-02-01'],
+                                                               'balance': [250.0, 275.5]})
+        # Un movimiento nuevo cambia la clave de la caché
+        self.client.post(f'/api/ahorros/{self.viaje.pk}/depositar/', {'amount': '4.50'}, format='json')
+        self.assertEqual(self.client.get(url).data['series']['balance'][-1], 280.0)
+        self.assertEqual(self.client.get(url, {'max_points': 1}).status_code, 400)
+
+    def test_pronostico(self):
+        rows = self.pronostico()
+        # 1.10 / 0.10 = 11 aportes semanales exactos (en coma flotante serían 12), desde hoy
+        self.assertEqual(rows[self.viaje.pk], {
+            'id': self.viaje.pk, 'remaining': '1.10', 'completed': False, 'payments_needed': 11,
+            'eta': str(self.today + timedelta(weeks=11)), 'date_final': str(self.today + timedelta(days=30)),
+            'on_track': False, 'required_payment': '0.28',  # 4 aportes caben antes de date_final
+        })
+        self.assertIsNone(rows[self.sin_aporte.pk]['eta'])
+
+        # El depósito invalida solo la entrada de esa meta
+        self.client.post(f'/api/ahorros/{self.viaje.pk}/depositar/', {'amount': '0.90'}, format='json')
+        row = self.pronostico()[self.viaje.pk]
+        self.assertEqual((row['remaining'], row['payments_needed'], row['on_track']), ('0.20', 2, True))
+        self.client.post(f'/api/ahorros/{self.viaje.pk}/depositar/', {'amount': '0.20'}, format='json')
+        row = self.pronostico()[self.viaje.pk]
+        self.assertEqual((row['completed'], row['eta'], row['on_track'], row['required_payment']),
+                         (True, None, True, None))
+
+    def test_etag_cambia_con_el_dia(self):
+        first = self.client.get('/api/ahorros/pronostico/')
+        etag = first['ETag']
+        self.assertEqual(self.client.get('/api/ahorros/pronostico/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        later = self.today + timedelta(days=40)
+        with mock.patch('django.utils.timezone.localdate', return_value=later):
+            response = self.client.get('/api/ahorros/pronostico/', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['today'], later.isoformat())
+            self.assertNotEqual(response.data['results'], first.data['results'])
+            # Last-Modified tampoco sirve la versión de ayer
+            since = first['Last-Modified']
+            self.assertEqual(self.client.get('/api/ahorros/pronostico/', HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+        # Los demás endpoints no dependen de la fecha
+        listado = self.client.get('/api/ahorros/')
+        with mock.patch('django.utils.timezone.localdate', return_value=later):
+            self.assertEqual(self.client.get('/api/ahorros/', HTTP_IF_NONE_MATCH=listado['ETag']).status_code, 304)
+
+    def test_consultas(self):
+        def add_metas(n):
+            Ahorros.objects.bulk_create([
+                Ahorros(owner=self.user, name=f'meta {i}', reason='r', quantity=100, payment=10, period='Anual')
+                for i in range(n)
+            ])
+        self.assertQueriesDoNotGrow(self.get_ok('/api/ahorros/pronostico/'), add_metas)
+
+
+class ConcurrentMovimientosTests(TransactionTestCase):
+    """Depósitos y retiros simultáneos sobre el mismo ahorro: sin actualizaciones perdidas ni sobregiros."""
+    threads = 8
+    per_thread = 25
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='concurrencia@example.com', password='x')
+        self.ahorro = Ahorros.objects.create(owner=self.user, name='meta', reason='r', quantity=Decimal('1000.00'),
+                                             payment=10, accrued=Decimal('100.00'), missing=Decimal('900.00'))
+
+    def post(self, client, url, body):
+        # SQLite responde "database is locked" si la espera del bloqueo supera su timeout:
+        # se reintenta la petición, como haría el cliente (la transacción fallida no dejó nada)
+        for _ in range(1000):
+            try:
+                return client.post(url, body, format='json').status_code
+            except OperationalError:
+                time.sleep(0.001)
+        raise AssertionError(f'{url}: base de datos bloqueada')
+
+    def run_concurrently(self, action, amount):
+        url = f'/api/ahorros/{self.ahorro.pk}/{action}/'
+        barrier = threading.Barrier(self.threads)
+        codes, errors = [], []
+
+        def worker():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                barrier.wait()
+                for _ in range(self.per_thread):
+                    codes.append(self.post(client, url, {'amount': amount}))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.assertEqual(errors, [])
+        return codes
+
+    def assertSaldo(self, accrued):
+        self.ahorro.refresh_from_db()
+        self.assertEqual(self.ahorro.accrued, accrued)
+        self.assertEqual(self.ahorro.missing, max(Decimal(0), self.ahorro.quantity - accrued))
+        movimientos = AhorroMovimiento.objects.filter(ahorro=self.ahorro)
+        self.assertEqual(sum(m.amount for m in movimientos), accrued - Decimal('100.00'))
+
+    def test_depositos_simultaneos(self):
+        codes = self.run_concurrently('depositar', '1.25')
+        total = self.threads * self.per_thread
+        self.assertEqual(codes.count(201), total)
+        self.assertSaldo(Decimal('100.00') + total * Decimal('1.25'))
+        rollup = MonthlyRollup.objects.get(owner=self.user, category='ahorros_acumulado')
+        self.assertEqual(rollup.total, total * Decimal('1.25'))
+
+    def test_retiros_sin_sobregiro(self):
+        # 200 retiros de 1.00 sobre un acumulado de 100.00: exactamente 100 pasan
+        codes = self.run_concurrently('retirar', '1.00')
+        self.assertEqual(codes.count(201), 100)
+        self.assertEqual(codes.count(400), self.threads * self.per_thread - 100)
+        self.assertSaldo(Decimal('0.00'))
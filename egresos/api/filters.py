@@ -0,0 +1,28 @@
+import django_filters
+from egresos.models import EgresosFijos, EgresosExtra
+
+
+class EgresosFijosFilter(django_filters.FilterSet):
+    # ?quantity__gte=100&period__in=Mensual,Anual&ordering=-quantity
+    ordering = django_filters.OrderingFilter(fields=('id', 'name', 'quantity', 'period'))
+
+    class Meta:
+        model = EgresosFijos
+        fields = {
+            'name': ['exact', 'in'],
+            'quantity': ['exact', 'gte', 'lte'],
+            'period': ['exact', 'in'],
+        }
+
+
+class EgresosExtraFilter(django_filters.FilterSet):
+    # ?date__gte=2025-03-01&date__lte=2025-03-31&quantity__gte=100&ordering=-date
+    ordering = django_filters.OrderingFilter(fields=('id', 'name', 'quantity', 'date'))
+
+    class Meta:
+        model = EgresosExtra
+        fields = {
+            'name': ['exact', 'in'],
+            'quantity': ['exact', 'gte', 'lte'],
+            'date': ['exact', 'gte', 'lte'],
+        }
@@ -5,11 +5,11 @@ class EgresosFijosSerializer(serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.email')
     class Meta:
         model = EgresosFijos
-        fields = '__all__'  # Serializa todos los campos del modelo
+        fields = ['id', 'owner', 'name', 'reason', 'quantity', 'period', 'date_start', 'date_end']
 
 class EgresosExtraSerializer(serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.email')
     class Meta:
         model = EgresosExtra
-        fields = '__all__'  # Serializa todos los campos del modelo
+        fields = ['id', 'owner', 'name', 'reason', 'quantity', 'date']
 
@@ -6,6 +6,10 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from egresos.models import EgresosFijos, EgresosExtra
 from egresos.api.serializers import EgresosFijosSerializer, EgresosExtraSerializer
+from egresos.api.filters import EgresosFijosFilter, EgresosExtraFilter
+from reports.api.mixins import TrackedWritesMixin, BulkWriteMixin, FastListMixin
+from reports.api.conditional import ConditionalGetMixin
+from reports.api.pagination import DateIdCursorPagination
 
 @method_decorator(name='list', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Listar egresos fijos', responses={200: EgresosFijosSerializer(many=True)}))
 @method_decorator(name='create', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Crear egreso fijo', request_body=openapi.Schema(
@@ -15,28 +19,27 @@ from egresos.api.serializers import EgresosFijosSerializer, EgresosExtraSerializ
         'name': openapi.Schema(type=openapi.TYPE_STRING, example='Renta'),
         'reason': openapi.Schema(type=openapi.TYPE_STRING, example='Alquiler'),
         'quantity': openapi.Schema(type=openapi.TYPE_STRING, example='500.00'),
-        'period': openapi.Schema(type=openapi.TYPE_STRING, example='Mensual')
+        'period': openapi.Schema(type=openapi.TYPE_STRING, example='Mensual'),
+        'date_start': openapi.Schema(type=openapi.TYPE_STRING, example='2025-01-15'),
+        'date_end': openapi.Schema(type=openapi.TYPE_STRING, example='2025-12-31')
     }
 )))
 @method_decorator(name='retrieve', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Detalle de egreso fijo'))
 @method_decorator(name='update', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Actualizar egreso fijo'))
 @method_decorator(name='partial_update', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Actualizar parcialmente egreso fijo'))
 @method_decorator(name='destroy', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Eliminar egreso fijo'))
-class EgresosFijosApiViewSet(ModelViewSet):
+class EgresosFijosApiViewSet(ConditionalGetMixin, TrackedWritesMixin, BulkWriteMixin, FastListMixin, ModelViewSet):
     # ViewSet for Egresos Fijos
     serializer_class = EgresosFijosSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['name', 'quantity', 'period']
+    filterset_class = EgresosFijosFilter
 
     def get_queryset(self):
         user = getattr(self.request, 'user', None)
         if not user or not user.is_authenticated:
             return EgresosFijos.objects.none()
-        return EgresosFijos.objects.filter(owner=user).order_by('-id')
-
-    def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        return user.egresos_fijos.order_by('-id')
 
 @method_decorator(name='list', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Listar egresos extra', responses={200: EgresosExtraSerializer(many=True)}))
 @method_decorator(name='create', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Crear egreso extra', request_body=openapi.Schema(
@@ -53,18 +56,16 @@ class EgresosFijosApiViewSet(ModelViewSet):
 @method_decorator(name='update', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Actualizar egreso extra'))
 @method_decorator(name='partial_update', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Actualizar parcialmente egreso extra'))
 @method_decorator(name='destroy', decorator=swagger_auto_schema(tags=['Egresos'], operation_summary='Eliminar egreso extra'))
-class EgresosExtraApiViewSet(ModelViewSet):
+class EgresosExtraApiViewSet(ConditionalGetMixin, TrackedWritesMixin, BulkWriteMixin, FastListMixin, ModelViewSet):
     # ViewSet for Egresos Extra
     serializer_class = EgresosExtraSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['name', 'quantity', 'date']
+    filterset_class = EgresosExtraFilter
+    pagination_class = DateIdCursorPagination  # Opt-in: ?page_size=N / ?cursor=...
 
     def get_queryset(self):
         user = getattr(self.request, 'user', None)
         if not user or not user.is_authenticated:
             return EgresosExtra.objects.none()
-        return EgresosExtra.objects.filter(owner=user).order_by('-date', '-id')
-
-    def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        return user.egresos_extra.order_by('-date', '-id')
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('egresos', '0005_egresosfijos_date_end_egresosfijos_date_start'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='egresosextra',
+            name='import_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='egresosextra',
+            constraint=models.UniqueConstraint(condition=models.Q(('import_hash__isnull', False)), fields=('owner', 'import_hash'), name='egrextra_owner_import_hash'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('egresos', '0006_egresosextra_import_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='egresosextra',
+            name='seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='egresosextra',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='egresosfijos',
+            name='seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='egresosfijos',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='egresosextra',
+            index=models.Index(fields=['owner', 'seq'], name='egrextra_owner_seq'),
+        ),
+        migrations.AddIndex(
+            model_name='egresosfijos',
+            index=models.Index(fields=['owner', 'seq'], name='egrfijos_owner_seq'),
+        ),
+    ]
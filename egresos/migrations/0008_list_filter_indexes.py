@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('egresos', '0007_egresosextra_seq_egresosextra_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='egresosextra',
+            index=models.Index(fields=['owner', 'name'], name='egrextra_owner_name'),
+        ),
+        migrations.AddIndex(
+            model_name='egresosextra',
+            index=models.Index(fields=['owner', 'quantity'], name='egrextra_owner_quantity'),
+        ),
+        migrations.AddIndex(
+            model_name='egresosfijos',
+            index=models.Index(fields=['owner', 'name'], name='egrfijos_owner_name'),
+        ),
+        migrations.AddIndex(
+            model_name='egresosfijos',
+            index=models.Index(fields=['owner', 'quantity'], name='egrfijos_owner_quantity'),
+        ),
+        migrations.AddIndex(
+            model_name='egresosfijos',
+            index=models.Index(fields=['owner', 'period'], name='egrfijos_owner_period'),
+        ),
+    ]
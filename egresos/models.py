@@ -9,9 +9,22 @@ class EgresosFijos(models.Model):
     reason = models.TextField()
     quantity = models.DecimalField(max_digits=10, decimal_places=2)  # Agrega max_digits
     period = models.CharField(max_length=100, default='Mensual')  # Por ejemplo: 'Mensual', 'Anual'
+    date_start = models.DateField(null=True, blank=True)  # Primera ocurrencia; vacío = desde siempre
+    date_end = models.DateField(null=True, blank=True)  # Último día vigente; vacío = sin fin
+    # Secuencia de sincronización: versión de datos del usuario en la última escritura (ver reports/sync.py)
+    seq = models.BigIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)  # Última modificación
        
     class Meta:
         verbose_name_plural = "Egresos Fijos"
+        indexes = [
+            # Cambios de un usuario desde una versión (/api/sync/)
+            models.Index(fields=['owner', 'seq'], name='egrfijos_owner_seq'),
+            # Filtros y orden del listado (ver api/filters.py)
+            models.Index(fields=['owner', 'name'], name='egrfijos_owner_name'),
+            models.Index(fields=['owner', 'quantity'], name='egrfijos_owner_quantity'),
+            models.Index(fields=['owner', 'period'], name='egrfijos_owner_period'),
+        ]
 
     def __str__(self):
         return self.name
@@ -27,9 +40,28 @@ class EgresosExtra(models.Model):
     reason = models.TextField()
     quantity = models.DecimalField(max_digits=10, decimal_places=2)  # Agrega max_digits
     date = models.DateField()
+    # Hash de (fecha, monto, nombre) si vino de un extracto bancario; null = alta manual
+    import_hash = models.CharField(max_length=40, null=True, blank=True, editable=False)
+    # Secuencia de sincronización: versión de datos del usuario en la última escritura (ver reports/sync.py)
+    seq = models.BigIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)  # Última modificación
     
     class Meta:
         verbose_name_plural = "Egresos Extra"
+        indexes = [
+            # Listado por usuario ordenado por fecha y paginación por cursor (date, id)
+            models.Index(fields=['owner', 'date', 'id'], name='egrextra_owner_date_id'),
+            # Cambios de un usuario desde una versión (/api/sync/)
+            models.Index(fields=['owner', 'seq'], name='egrextra_owner_seq'),
+            # Filtros y orden del listado (ver api/filters.py)
+            models.Index(fields=['owner', 'name'], name='egrextra_owner_name'),
+            models.Index(fields=['owner', 'quantity'], name='egrextra_owner_quantity'),
+        ]
+        constraints = [
+            # Re-importar el mismo extracto no duplica movimientos
+            models.UniqueConstraint(fields=['owner', 'import_hash'], condition=models.Q(import_hash__isnull=False),
+                                    name='egrextra_owner_import_hash'),
+        ]
 
     def __str__(self):
         return self.name
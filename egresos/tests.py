@@ -1,3 +1,110 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+from egresos.models import EgresosFijos, EgresosExtra
+from egresos.api.views import EgresosFijosApiViewSet, EgresosExtraApiViewSet
+from reports.testing import ExplainAssertionsMixin, QueryBudgetMixin
+
+PERIODS = ['Diario', 'Semanal', 'Quincenal', 'Mensual', 'Bimestral', 'Trimestral', 'Cuatrimestral', 'Semestral', 'Anual']
+
+
+class ListFilterIndexTests(ExplainAssertionsMixin, TestCase):
+    """Cada filtro del listado se resuelve con su índice (owner, campo) (EXPLAIN)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(email=f'filtros{k}@example.com', password='x') for k in range(5)]
+        cls.user = users[0]
+        start = date(2025, 1, 1)
+        for owner in users:
+            EgresosExtra.objects.bulk_create([
+                EgresosExtra(owner=owner, name=f'comercio {i % 40}', reason='r', quantity=Decimal(i % 500),
+                             date=start + timedelta(days=i % 365))
+                for i in range(800)
+            ])
+            EgresosFijos.objects.bulk_create([
+                EgresosFijos(owner=owner, name=f'servicio {i % 40}', reason='r', quantity=Decimal(i % 500),
+                             period=PERIODS[i % len(PERIODS)])
+                for i in range(400)
+            ])
+        cls.analyze()
+
+    def test_extra_rango_de_fechas(self):
+        qs = self.filtered(EgresosExtraApiViewSet, {'date__gte': '2025-03-01', 'date__lte': '2025-03-31'})
+        self.assertUsesIndex(qs, 'egrextra_owner_date_id', 'date')
+
+    def test_extra_rango_de_montos(self):
+        qs = self.filtered(EgresosExtraApiViewSet, {'quantity__gte': '480', 'quantity__lte': '490'})
+        self.assertUsesIndex(qs, 'egrextra_owner_quantity', 'quantity')
+
+    def test_extra_nombres(self):
+        qs = self.filtered(EgresosExtraApiViewSet, {'name__in': 'comercio 1,comercio 2'})
+        self.assertUsesIndex(qs, 'egrextra_owner_name', 'name')
+
+    def test_extra_orden(self):
+        self.assertUsesIndex(self.filtered(EgresosExtraApiViewSet, {'ordering': '-quantity'}), 'egrextra_owner_quantity')
+        self.assertUsesIndex(self.filtered(EgresosExtraApiViewSet, {'ordering': 'name'}), 'egrextra_owner_name')
+
+    def test_fijos(self):
+        cases = [
+            ({'quantity__gte': '480', 'quantity__lte': '490'}, 'egrfijos_owner_quantity', 'quantity'),
+            ({'name__in': 'servicio 1,servicio 2'}, 'egrfijos_owner_name', 'name'),
+            ({'period': 'Anual'}, 'egrfijos_owner_period', 'period'),
+        ]
+        for params, index, column in cases:
+            self.assertUsesIndex(self.filtered(EgresosFijosApiViewSet, params), index, column)
+
+
+class ListFilterTests(TestCase):
+    """Filtros por rango, por varios valores y orden en los listados."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='listado@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for day, quantity in [('2025-02-28', 500), ('2025-03-01', 50), ('2025-03-15', 150), ('2025-03-31', 120)]:
+            EgresosExtra.objects.create(owner=self.user, name='gasto', reason='r', quantity=quantity, date=day)
+
+    def test_gastos_de_marzo_mayores_a_100(self):
+        response = self.client.get('/api/EgresosExtra/', {
+            'date__gte': '2025-03-01', 'date__lte': '2025-03-31', 'quantity__gte': '100', 'ordering': '-quantity'})
+        self.assertEqual([row['quantity'] for row in response.data], ['150.00', '120.00'])
+
+
+    def test_orden_con_paginacion(self):
+        params = {'ordering': 'quantity', 'page_size': 10}
+        self.assertEqual(self.client.get('/api/EgresosExtra/', params).status_code, 400)
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Listados y detalles con un número fijo de consultas, sin importar las filas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='consultas@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.add_extra(2)
+        self.add_fijos(2)
+
+    def add_extra(self, n):
+        EgresosExtra.objects.bulk_create([
+            EgresosExtra(owner=self.user, name=f'extra {i}', reason='r', quantity=1, date=date(2025, 1, 1 + i % 28))
+            for i in range(n)
+        ])
+
+    def add_fijos(self, n):
+        EgresosFijos.objects.bulk_create([
+            EgresosFijos(owner=self.user, name=f'fijo {i}', reason='r', quantity=1) for i in range(n)
+        ])
+
+    def test_listados(self):
+        self.assertQueriesDoNotGrow(self.get_ok('/api/EgresosExtra/'), self.add_extra)
+        self.assertQueriesDoNotGrow(self.get_ok('/api/EgresosExtra/', {'page_size': 50}), self.add_extra)
+        self.assertQueriesDoNotGrow(self.get_ok('/api/EgresosFijos/'), self.add_fijos)
 
-# Create your tests here.
+    def test_detalle(self):
+        pk = EgresosFijos.objects.filter(owner=self.user).values_list('id', flat=True).first()
+        self.assertQueriesDoNotGrow(self.get_ok(f'/api/EgresosFijos/{pk}/'), self.add_fijos)
@@ -1,16 +1,17 @@
 from django.contrib import admin
 from .models import IngresosFijos, IngresosExtra
+from reports.admin import TrackedAdminMixin
 
 # Register your models here.
 
 @admin.register(IngresosFijos)
-class IngresosFijosAdmin(admin.ModelAdmin):
+class IngresosFijosAdmin(TrackedAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'reason', 'quantity', 'period')
     search_fields = ('name', 'reason')
     list_filter = ('period',)
 
 @admin.register(IngresosExtra)
-class IngresosExtraAdmin(admin.ModelAdmin):
+class IngresosExtraAdmin(TrackedAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'reason', 'quantity', 'date')
     search_fields = ('name', 'reason')
     list_filter = ('date',)
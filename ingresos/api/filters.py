@@ -0,0 +1,28 @@
+import django_filters  # FilterSet / OrderingFilter
+from ingresos.models import IngresosFijos, IngresosExtra
+
+
+class IngresosFijosFilter(django_filters.FilterSet):
+    # ?quantity__gte=100&period__in=Mensual,Anual&ordering=-quantity
+    ordering = django_filters.OrderingFilter(fields=('id', 'name', 'quantity', 'period'))
+
+    class Meta:
+        model = IngresosFijos
+        fields = {
+            'name': ['exact', 'in'],
+            'quantity': ['exact', 'gte', 'lte'],
+            'period': ['exact', 'in'],
+        }
+
+
+class IngresosExtraFilter(django_filters.FilterSet):
+    # ?date__gte=2025-03-01&date__lte=2025-03-31&quantity__gte=100&ordering=-date
+    ordering = django_filters.OrderingFilter(fields=('id', 'name', 'quantity', 'date'))
+
+    class Meta:
+        model = IngresosExtra
+        fields = {
+            'name': ['exact', 'in'],
+            'quantity': ['exact', 'gte', 'lte'],
+            'date': ['exact', 'gte', 'lte'],
+        }
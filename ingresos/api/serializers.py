@@ -5,11 +5,11 @@ class IngresosFijosSerializer(serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.email')
     class Meta:
         model = IngresosFijos
-        fields = '__all__'  # Serializa todos los campos del modelo
+        fields = ['id', 'owner', 'name', 'reason', 'quantity', 'period', 'date_start', 'date_end']
 
 class IngresosExtraSerializer(serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.email')
     class Meta:
         model = IngresosExtra
-        fields = '__all__'  # Serializa todos los campos del modelo
+        fields = ['id', 'owner', 'name', 'reason', 'quantity', 'date']
 
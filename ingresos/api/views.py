@@ -6,6 +6,10 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from ingresos.models import IngresosFijos, IngresosExtra  # ORM models
 from ingresos.api.serializers import IngresosFijosSerializer, IngresosExtraSerializer  # Serializers
+from ingresos.api.filters import IngresosFijosFilter, IngresosExtraFilter  # Range / multi-value filters
+from reports.api.mixins import TrackedWritesMixin, BulkWriteMixin, FastListMixin  # Owner + report rollups on write
+from reports.api.conditional import ConditionalGetMixin
+from reports.api.pagination import DateIdCursorPagination
 
 
 @method_decorator(name='list', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Listar ingresos fijos', responses={200: IngresosFijosSerializer(many=True)}))
@@ -16,30 +20,28 @@ from ingresos.api.serializers import IngresosFijosSerializer, IngresosExtraSeria
         'name': openapi.Schema(type=openapi.TYPE_STRING, example='Salario'),
         'reason': openapi.Schema(type=openapi.TYPE_STRING, example='Pago mensual'),
         'quantity': openapi.Schema(type=openapi.TYPE_STRING, example='1000.00'),
-        'period': openapi.Schema(type=openapi.TYPE_STRING, example='Mensual')
+        'period': openapi.Schema(type=openapi.TYPE_STRING, example='Mensual'),
+        'date_start': openapi.Schema(type=openapi.TYPE_STRING, example='2025-01-15'),
+        'date_end': openapi.Schema(type=openapi.TYPE_STRING, example='2025-12-31')
     }
 )))
 @method_decorator(name='retrieve', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Detalle de ingreso fijo'))
 @method_decorator(name='update', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Actualizar ingreso fijo'))
 @method_decorator(name='partial_update', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Actualizar parcialmente ingreso fijo'))
 @method_decorator(name='destroy', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Eliminar ingreso fijo'))
-class IngresosFijosApiViewSet(ModelViewSet):
+class IngresosFijosApiViewSet(ConditionalGetMixin, TrackedWritesMixin, BulkWriteMixin, FastListMixin, ModelViewSet):
    # Fixed incomes endpoints
    serializer_class = IngresosFijosSerializer
    permission_classes = [IsAuthenticated]
    filter_backends = [DjangoFilterBackend]
-   filterset_fields = ['name', 'quantity', 'period']
+   filterset_class = IngresosFijosFilter
 
    def get_queryset(self):
        # Only records belonging to the current user
        user = getattr(self.request, 'user', None)
        if not user or not user.is_authenticated:
            return IngresosFijos.objects.none()
-       return IngresosFijos.objects.filter(owner=user).order_by('-id')
-
-   def perform_create(self, serializer):
-       # Set logged-in user as owner on create
-       serializer.save(owner=self.request.user)
+       return user.ingresos_fijos.order_by('-id')
 
 @method_decorator(name='list', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Listar ingresos extra', responses={200: IngresosExtraSerializer(many=True)}))
 @method_decorator(name='create', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Crear ingreso extra', request_body=openapi.Schema(
@@ -56,20 +58,17 @@ class IngresosFijosApiViewSet(ModelViewSet):
 @method_decorator(name='update', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Actualizar ingreso extra'))
 @method_decorator(name='partial_update', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Actualizar parcialmente ingreso extra'))
 @method_decorator(name='destroy', decorator=swagger_auto_schema(tags=['Ingresos'], operation_summary='Eliminar ingreso extra'))
-class IngresosExtraApiViewSet(ModelViewSet):
+class IngresosExtraApiViewSet(ConditionalGetMixin, TrackedWritesMixin, BulkWriteMixin, FastListMixin, ModelViewSet):
    # Extra incomes endpoints
    serializer_class = IngresosExtraSerializer
    permission_classes = [IsAuthenticated]
    filter_backends = [DjangoFilterBackend]
-   filterset_fields = ['name', 'quantity', 'date']
+   filterset_class = IngresosExtraFilter
+   pagination_class = DateIdCursorPagination  # Opt-in: ?page_size=N / ?cursor=...
 
    def get_queryset(self):
        # Only records belonging to the current user
        user = getattr(self.request, 'user', None)
        if not user or not user.is_authenticated:
            return IngresosExtra.objects.none()
-       return IngresosExtra.objects.filter(owner=user).order_by('-date', '-id')
-
-   def perform_create(self, serializer):
-       # Set logged-in user as owner on create
-       serializer.save(owner=self.request.user)
+       return user.ingresos_extra.order_by('-date', '-id')
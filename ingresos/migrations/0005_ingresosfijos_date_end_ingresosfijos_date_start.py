@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingresos', '0004_ingresosextra_ingextra_owner_date_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingresosfijos',
+            name='date_end',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingresosfijos',
+            name='date_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
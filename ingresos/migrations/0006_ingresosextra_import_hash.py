@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingresos', '0005_ingresosfijos_date_end_ingresosfijos_date_start'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingresosextra',
+            name='import_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='ingresosextra',
+            constraint=models.UniqueConstraint(condition=models.Q(('import_hash__isnull', False)), fields=('owner', 'import_hash'), name='ingextra_owner_import_hash'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingresos', '0006_ingresosextra_import_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingresosextra',
+            name='seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ingresosextra',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='ingresosfijos',
+            name='seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ingresosfijos',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='ingresosextra',
+            index=models.Index(fields=['owner', 'seq'], name='ingextra_owner_seq'),
+        ),
+        migrations.AddIndex(
+            model_name='ingresosfijos',
+            index=models.Index(fields=['owner', 'seq'], name='ingfijos_owner_seq'),
+        ),
+    ]
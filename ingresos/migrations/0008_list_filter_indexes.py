@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingresos', '0007_ingresosextra_seq_ingresosextra_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingresosextra',
+            index=models.Index(fields=['owner', 'name'], name='ingextra_owner_name'),
+        ),
+        migrations.AddIndex(
+            model_name='ingresosextra',
+            index=models.Index(fields=['owner', 'quantity'], name='ingextra_owner_quantity'),
+        ),
+        migrations.AddIndex(
+            model_name='ingresosfijos',
+            index=models.Index(fields=['owner', 'name'], name='ingfijos_owner_name'),
+        ),
+        migrations.AddIndex(
+            model_name='ingresosfijos',
+            index=models.Index(fields=['owner', 'quantity'], name='ingfijos_owner_quantity'),
+        ),
+        migrations.AddIndex(
+            model_name='ingresosfijos',
+            index=models.Index(fields=['owner', 'period'], name='ingfijos_owner_period'),
+        ),
+    ]
@@ -11,9 +11,25 @@ class IngresosFijos(models.Model):
     quantity = models.DecimalField(max_digits=10, decimal_places=2)
     # Period label (e.g., 'Mensual', 'Anual')
     period = models.CharField(max_length=100, default='Mensual')
+    # First occurrence (anchors the recurrence); empty = recurring since always
+    date_start = models.DateField(null=True, blank=True)
+    # Last day the item is active; empty = no end
+    date_end = models.DateField(null=True, blank=True)
+    # Sync sequence: owner's data version at the last write (see reports/sync.py)
+    seq = models.BigIntegerField(default=0, editable=False)
+    # Last modification time
+    updated_at = models.DateTimeField(auto_now=True)
        
     class Meta:
         verbose_name_plural = "Ingresos Fijos"
+        indexes = [
+            # A user's changes since a version (/api/sync/)
+            models.Index(fields=['owner', 'seq'], name='ingfijos_owner_seq'),
+            # Filters and ordering of the list endpoint (see api/filters.py)
+            models.Index(fields=['owner', 'name'], name='ingfijos_owner_name'),
+            models.Index(fields=['owner', 'quantity'], name='ingfijos_owner_quantity'),
+            models.Index(fields=['owner', 'period'], name='ingfijos_owner_period'),
+        ]
 
     def __str__(self):
         # Human-readable representation
@@ -35,9 +51,29 @@ class IngresosExtra(models.Model):
     quantity = models.DecimalField(max_digits=10, decimal_places=2)
     # Effective date of the income
     date = models.DateField()
+    # Content hash of (date, quantity, name) for rows imported from a bank statement; null = manual entry
+    import_hash = models.CharField(max_length=40, null=True, blank=True, editable=False)
+    # Sync sequence: owner's data version at the last write (see reports/sync.py)
+    seq = models.BigIntegerField(default=0, editable=False)
+    # Last modification time
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name_plural = "Ingresos Extra"
+        indexes = [
+            # Per-user list ordered by date and cursor pagination on (date, id)
+            models.Index(fields=['owner', 'date', 'id'], name='ingextra_owner_date_id'),
+            # A user's changes since a version (/api/sync/)
+            models.Index(fields=['owner', 'seq'], name='ingextra_owner_seq'),
+            # Filters and ordering of the list endpoint (see api/filters.py)
+            models.Index(fields=['owner', 'name'], name='ingextra_owner_name'),
+            models.Index(fields=['owner', 'quantity'], name='ingextra_owner_quantity'),
+        ]
+        constraints = [
+            # Re-importing the same statement does not duplicate rows
+            models.UniqueConstraint(fields=['owner', 'import_hash'], condition=models.Q(import_hash__isnull=False),
+                                    name='ingextra_owner_import_hash'),
+        ]
 
     def __str__(self):
         # Human-readable representation
@@ -1,3 +1,196 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+from ingresos.models import IngresosFijos, IngresosExtra
+from ingresos.api.views import IngresosFijosApiViewSet, IngresosExtraApiViewSet
+from reports.testing import ExplainAssertionsMixin, QueryBudgetMixin, RollupAssertionsMixin
+
+PERIODS = ['Diario', 'Semanal', 'Quincenal', 'Mensual', 'Bimestral', 'Trimestral', 'Cuatrimestral', 'Semestral', 'Anual']
+
+
+class ListFilterIndexTests(ExplainAssertionsMixin, TestCase):
+    """Every list filter is resolved with its (owner, field) index (EXPLAIN)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(email=f'filters{k}@example.com', password='x') for k in range(5)]
+        cls.user = users[0]
+        start = date(2025, 1, 1)
+        for owner in users:
+            IngresosExtra.objects.bulk_create([
+                IngresosExtra(owner=owner, name=f'cliente {i % 40}', reason='r', quantity=Decimal(i % 500),
+                              date=start + timedelta(days=i % 365))
+                for i in range(800)
+            ])
+            IngresosFijos.objects.bulk_create([
+                IngresosFijos(owner=owner, name=f'fuente {i % 40}', reason='r', quantity=Decimal(i % 500),
+                              period=PERIODS[i % len(PERIODS)])
+                for i in range(400)
+            ])
+        cls.analyze()
+
+    def test_extra_date_range(self):
+        qs = self.filtered(IngresosExtraApiViewSet, {'date__gte': '2025-03-01', 'date__lte': '2025-03-31'})
+        self.assertUsesIndex(qs, 'ingextra_owner_date_id', 'date')
+
+    def test_extra_quantity_range(self):
+        qs = self.filtered(IngresosExtraApiViewSet, {'quantity__gte': '480', 'quantity__lte': '490'})
+        self.assertUsesIndex(qs, 'ingextra_owner_quantity', 'quantity')
+
+    def test_extra_name_in(self):
+        qs = self.filtered(IngresosExtraApiViewSet, {'name__in': 'cliente 1,cliente 2'})
+        self.assertUsesIndex(qs, 'ingextra_owner_name', 'name')
+
+    def test_extra_ordering(self):
+        self.assertUsesIndex(self.filtered(IngresosExtraApiViewSet, {'ordering': '-quantity'}), 'ingextra_owner_quantity')
+        self.assertUsesIndex(self.filtered(IngresosExtraApiViewSet, {'ordering': 'name'}), 'ingextra_owner_name')
+
+    def test_fijos_period(self):
+        # Few distinct periods: with several values the planner may rightly prefer
+        # reading the owner's rows in id order; a single value must use the index
+        for params in ({'period': 'Anual'}, {'period__in': 'Anual'}):
+            self.assertUsesIndex(self.filtered(IngresosFijosApiViewSet, params), 'ingfijos_owner_period', 'period')
+
+    def test_fijos_quantity_range_and_name(self):
+        qs = self.filtered(IngresosFijosApiViewSet, {'quantity__gte': '480', 'quantity__lte': '490'})
+        self.assertUsesIndex(qs, 'ingfijos_owner_quantity', 'quantity')
+        qs = self.filtered(IngresosFijosApiViewSet, {'name__in': 'fuente 1,fuente 2'})
+        self.assertUsesIndex(qs, 'ingfijos_owner_name', 'name')
+
+
+class ListFilterTests(TestCase):
+    """Range / multi-value filters and ordering on the list endpoints."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='list@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for day, quantity, name in [('2025-02-28', 500, 'a'), ('2025-03-01', 50, 'b'), ('2025-03-15', 150, 'c'),
+                                    ('2025-03-31', 120, 'a'), ('2025-04-01', 300, 'b')]:
+            IngresosExtra.objects.create(owner=self.user, name=name, reason='r', quantity=quantity, date=day)
+
+    def test_date_and_quantity_range(self):
+        response = self.client.get('/api/IngresosExtra/', {
+            'date__gte': '2025-03-01', 'date__lte': '2025-03-31', 'quantity__gte': '100'})
+        self.assertEqual([row['date'] for row in response.data], ['2025-03-31', '2025-03-15'])
+
+    def test_name_in_and_ordering(self):
+        response = self.client.get('/api/IngresosExtra/', {'name__in': 'a,b', 'ordering': 'quantity'})
+        self.assertEqual([row['quantity'] for row in response.data], ['50.00', '120.00', '300.00', '500.00'])
+
+    def test_ordering_with_cursor_pagination(self):
+        # The cursor only walks (-date, -id): any other ordering is rejected instead of ignored
+        response = self.client.get('/api/IngresosExtra/', {'ordering': 'quantity', 'page_size': 10})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+        response = self.client.get('/api/IngresosExtra/', {'ordering': '-date', 'page_size': 2})
+        self.assertEqual([row['date'] for row in response.data['results']], ['2025-04-01', '2025-03-31'])
+
+    def test_ordering_whitelist(self):
+        response = self.client.get('/api/IngresosExtra/', {'ordering': 'reason'})
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """List and detail endpoints run a fixed number of queries, whatever the row count."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='budget@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.add_extra(2)
+        self.add_fijos(2)
+
+    def add_extra(self, n):
+        IngresosExtra.objects.bulk_create([
+            IngresosExtra(owner=self.user, name=f'extra {i}', reason='r', quantity=1, date=date(2025, 1, 1 + i % 28))
+            for i in range(n)
+        ])
+
+    def add_fijos(self, n):
+        IngresosFijos.objects.bulk_create([
+            IngresosFijos(owner=self.user, name=f'fijo {i}', reason='r', quantity=1) for i in range(n)
+        ])
+
+    def test_lists(self):
+        self.assertQueriesDoNotGrow(self.get_ok('/api/IngresosExtra/'), self.add_extra)
+        self.assertQueriesDoNotGrow(self.get_ok('/api/IngresosExtra/', {'page_size': 50}), self.add_extra)
+        self.assertQueriesDoNotGrow(self.get_ok('/api/IngresosFijos/'), self.add_fijos)
+
+    def test_detail(self):
+        pk = IngresosExtra.objects.filter(owner=self.user).values_list('id', flat=True).first()
+        self.assertQueriesDoNotGrow(self.get_ok(f'/api/IngresosExtra/{pk}/'), self.add_extra)
+
+    def test_bulk_responses(self):
+        def bulk_create():
+            items = [{'name': 'b', 'reason': 'r', 'quantity': '1', 'date': '2025-01-01'}] * len(self.batch)
+            self.assertEqual(self.client.post('/api/IngresosExtra/bulk/', items, format='json').status_code, 201)
+
+        def bulk_update():
+            # A different amount each call, so the rollup delta is never zero
+            self.amount += 1
+            items = [{'id': pk, 'quantity': str(self.amount)} for pk in self.batch]
+            self.assertEqual(self.client.patch('/api/IngresosExtra/bulk/', items, format='json').status_code, 200)
+
+        def grow(n):
+            self.add_extra(n)
+            self.batch = list(IngresosExtra.objects.filter(owner=self.user).values_list('id', flat=True))
+
+        self.amount = 1
+        grow(0)
+        self.assertQueriesDoNotGrow(bulk_create, grow)
+        grow(0)
+        self.assertQueriesDoNotGrow(bulk_update, grow)
+
+
+class BulkWriteTests(RollupAssertionsMixin, TestCase):
+    """/bulk/ writes are all-or-nothing and keep rollups in line with a rebuild."""
+
+    url = '/api/IngresosExtra/bulk/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='bulk@example.com', password='x')
+        self.other = User.objects.create_user(email='bulk-other@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create(self, n):
+        items = [{'name': f'b{i}', 'reason': 'r', 'quantity': f'{i + 1}.50', 'date': f'2025-0{1 + i % 3}-10'}
+                 for i in range(n)]
+        response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, 201)
+        return [row['id'] for row in response.data]
+
+    def test_create_update_delete(self):
+        ids = self.create(6)
+        self.assertRollupsMatchRebuild(self.user)
+        items = [{'id': pk, 'quantity': '9.99', 'date': '2025-04-01'} for pk in ids[:3]]
+        self.assertEqual(self.client.patch(self.url, items, format='json').status_code, 200)
+        self.assertRollupsMatchRebuild(self.user)
+        self.assertEqual(self.client.delete(self.url, ids[2:], format='json').status_code, 204)
+        self.assertEqual(list(IngresosExtra.objects.filter(owner=self.user).order_by('id').values_list('id', flat=True)),
+                         ids[:2])
+        self.assertRollupsMatchRebuild(self.user)
+
+    def test_invalid_item_rejects_the_batch(self):
+        items = [{'name': 'ok', 'reason': 'r', 'quantity': '1', 'date': '2025-01-01'},
+                 {'name': 'bad', 'reason': 'r', 'quantity': 'x', 'date': '2025-01-01'}]
+        response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1])
+        self.assertFalse(IngresosExtra.objects.exists())
 
-# Create your tests here.
+    def test_other_users_rows_are_not_found(self):
+        mine = self.create(1)[0]
+        theirs = IngresosExtra.objects.create(owner=self.other, name='t', reason='r', quantity=1, date=date(2025, 1, 1))
+        response = self.client.patch(self.url, [{'id': mine, 'quantity': '2'}, {'id': theirs.pk, 'quantity': '2'}],
+                                     format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'], [{'index': 1, 'errors': {'id': ['No encontrado.']}, 'id': theirs.pk}])
+        self.assertEqual(self.client.delete(self.url, [theirs.pk], format='json').status_code, 400)
+        self.assertEqual(IngresosExtra.objects.get(pk=mine).quantity, Decimal('1.50'))
+        self.assertTrue(IngresosExtra.objects.filter(pk=theirs.pk).exists())
@@ -3,8 +3,9 @@ from django.contrib import admin
 # Register your models here.
 from django.contrib import admin
 from prestamos.models import Prestamos
+from reports.admin import TrackedAdminMixin
 
 @admin.register(Prestamos)
-class PrestamosAdmin(admin.ModelAdmin):
+class PrestamosAdmin(TrackedAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'reason', 'quantity', 'payment', 'date_created', 'period', 'status', 'answer')
     
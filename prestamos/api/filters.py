@@ -0,0 +1,16 @@
+import django_filters
+from prestamos.models import Prestamos
+
+
+class PrestamosFilter(django_filters.FilterSet):
+    # ?status__in=Pendiente,Aprobado&quantity__gte=1000&ordering=-quantity
+    ordering = django_filters.OrderingFilter(fields=('id', 'name', 'quantity', 'period', 'status'))
+
+    class Meta:
+        model = Prestamos
+        fields = {
+            'name': ['exact', 'in'],
+            'quantity': ['exact', 'gte', 'lte'],
+            'period': ['exact', 'in'],
+            'status': ['exact', 'in'],
+        }
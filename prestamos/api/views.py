@@ -1,10 +1,14 @@
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
+from django_filters.rest_framework import DjangoFilterBackend
 from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from prestamos.models import Prestamos
 from prestamos.api.serializers import PrestamosSerializer
+from prestamos.api.filters import PrestamosFilter
+from reports.api.mixins import TrackedWritesMixin
+from reports.api.conditional import ConditionalGetMixin
 
 @method_decorator(name='list', decorator=swagger_auto_schema(tags=['Prestamos'], operation_summary='Listar préstamos'))
 @method_decorator(name='create', decorator=swagger_auto_schema(tags=['Prestamos'], operation_summary='Crear préstamo', request_body=openapi.Schema(
@@ -24,16 +28,15 @@ from prestamos.api.serializers import PrestamosSerializer
 @method_decorator(name='update', decorator=swagger_auto_schema(tags=['Prestamos'], operation_summary='Actualizar préstamo'))
 @method_decorator(name='partial_update', decorator=swagger_auto_schema(tags=['Prestamos'], operation_summary='Actualizar parcialmente préstamo'))
 @method_decorator(name='destroy', decorator=swagger_auto_schema(tags=['Prestamos'], operation_summary='Eliminar préstamo'))
-class PrestamosApiViewSet(ModelViewSet):
+class PrestamosApiViewSet(ConditionalGetMixin, TrackedWritesMixin, ModelViewSet):
    # API endpoint that allows prestamos to be viewed or edited.
    serializer_class = PrestamosSerializer
    permission_classes = [IsAuthenticated]
+   filter_backends = [DjangoFilterBackend]
+   filterset_class = PrestamosFilter
 
    def get_queryset(self):
        user = getattr(self.request, 'user', None)
        if not user or not user.is_authenticated:
            return Prestamos.objects.none()
-       return Prestamos.objects.filter(owner=user).order_by('-id')
-
-   def perform_create(self, serializer):
-       serializer.save(owner=self.request.user)
+       return user.prestamos.order_by('-id')
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prestamos', '0003_alter_prestamos_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prestamos',
+            name='seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='prestamos',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='prestamos',
+            index=models.Index(fields=['owner', 'seq'], name='prestamos_owner_seq'),
+        ),
+    ]
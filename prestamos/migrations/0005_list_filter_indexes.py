@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prestamos', '0004_prestamos_seq_prestamos_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prestamos',
+            index=models.Index(fields=['owner', 'name'], name='prestamos_owner_name'),
+        ),
+        migrations.AddIndex(
+            model_name='prestamos',
+            index=models.Index(fields=['owner', 'quantity'], name='prestamos_owner_quantity'),
+        ),
+        migrations.AddIndex(
+            model_name='prestamos',
+            index=models.Index(fields=['owner', 'period'], name='prestamos_owner_period'),
+        ),
+        migrations.AddIndex(
+            model_name='prestamos',
+            index=models.Index(fields=['owner', 'status'], name='prestamos_owner_status'),
+        ),
+    ]
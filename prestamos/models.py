@@ -13,9 +13,21 @@ class Prestamos(models.Model):
     period = models.CharField(max_length=100, default='Mensual')  # Por ejemplo: 'Mensual', 'Anual'
     status = models.CharField(max_length=50, default='Pendiente')  # Por ejemplo: 'Pendiente', 'Aprobado', 'Rechazado'
     answer = models.CharField(max_length=50, default='Favorable')  # Por ejemplo: 'Pendiente', 'Aprobado', 'Rechazado'
+    # Secuencia de sincronización: versión de datos del usuario en la última escritura (ver reports/sync.py)
+    seq = models.BigIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)  # Última modificación
  
     class Meta:
         verbose_name_plural = "Prestamos"
+        indexes = [
+            # Cambios de un usuario desde una versión (/api/sync/)
+            models.Index(fields=['owner', 'seq'], name='prestamos_owner_seq'),
+            # Filtros y orden del listado (ver api/filters.py)
+            models.Index(fields=['owner', 'name'], name='prestamos_owner_name'),
+            models.Index(fields=['owner', 'quantity'], name='prestamos_owner_quantity'),
+            models.Index(fields=['owner', 'period'], name='prestamos_owner_period'),
+            models.Index(fields=['owner', 'status'], name='prestamos_owner_status'),
+        ]
 
     def __str__(self):
         return self.name
@@ -1,3 +1,61 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+from prestamos.models import Prestamos
+from prestamos.api.views import PrestamosApiViewSet
+from reports.testing import ExplainAssertionsMixin, QueryBudgetMixin
+
+PERIODS = ['Diario', 'Semanal', 'Quincenal', 'Mensual', 'Bimestral', 'Trimestral', 'Cuatrimestral', 'Semestral', 'Anual']
+STATUSES = ['Pendiente', 'Aprobado', 'Rechazado', 'Pagado', 'Vencido', 'Cancelado', 'Refinanciado', 'En mora']
+
+
+class ListFilterIndexTests(ExplainAssertionsMixin, TestCase):
+    """Cada filtro del listado se resuelve con su índice (owner, campo) (EXPLAIN)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(email=f'filtros{k}@example.com', password='x') for k in range(5)]
+        cls.user = users[0]
+        for owner in users:
+            Prestamos.objects.bulk_create([
+                Prestamos(owner=owner, name=f'prestamo {i % 40}', reason='r', quantity=Decimal(i % 500), payment=1,
+                          period=PERIODS[i % len(PERIODS)], status=STATUSES[i % len(STATUSES)])
+                for i in range(400)
+            ])
+        cls.analyze()
+
+    def test_filtros(self):
+        cases = [
+            ({'quantity__gte': '480', 'quantity__lte': '490'}, 'prestamos_owner_quantity', 'quantity'),
+            ({'name__in': 'prestamo 1,prestamo 2'}, 'prestamos_owner_name', 'name'),
+            ({'period': 'Anual'}, 'prestamos_owner_period', 'period'),
+            ({'status__in': 'Vencido'}, 'prestamos_owner_status', 'status'),
+        ]
+        for params, index, column in cases:
+            self.assertUsesIndex(self.filtered(PrestamosApiViewSet, params), index, column)
+
+    def test_orden(self):
+        self.assertUsesIndex(self.filtered(PrestamosApiViewSet, {'ordering': 'name'}), 'prestamos_owner_name')
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Listado y detalle con un número fijo de consultas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='consultas@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.add_prestamos(2)
+
+    def add_prestamos(self, n):
+        Prestamos.objects.bulk_create([
+            Prestamos(owner=self.user, name=f'prestamo {i}', reason='r', quantity=100, payment=10) for i in range(n)
+        ])
 
-# Create your tests here.
+    def test_listado_y_detalle(self):
+        self.assertQueriesDoNotGrow(self.get_ok('/api/prestamos/'), self.add_prestamos)
+        pk = Prestamos.objects.filter(owner=self.user).values_list('id', flat=True).first()
+        self.assertQueriesDoNotGrow(self.get_ok(f'/api/prestamos/{pk}/'), self.add_prestamos)
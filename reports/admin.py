@@ -0,0 +1,59 @@
+from django.contrib import admin
+from django.db import transaction
+
+from reports import rollups, sync, tracking
+from .models import MonthlyRollup, ReportJob
+
+# Register your models here.
+
+
+class TrackedAdminMixin:
+    """
+    ModelAdmin de ingresos, egresos, ahorros y préstamos: cada alta, edición
+    o borrado pasa por `tracking.record_write`, igual que en la API
+    (rollups, versión de datos del usuario y /api/sync/).
+    """
+
+    def save_model(self, request, obj, form, change):
+        model = type(obj)
+        with transaction.atomic():
+            old = model.objects.select_for_update().filter(pk=obj.pk).first() if change else None
+            super().save_model(request, obj, form, change)
+            before = rollups.contributions(old) if old is not None else []
+            if old is not None and old.owner_id != obj.owner_id:
+                # Cambio de dueño: sale de los datos del anterior y entra como nuevo en los del otro
+                tracking.record_write(old.owner_id, before=before, deleted=[(model, obj.pk)])
+                before = []
+            tracking.record_write(obj.owner_id, before=before, after=rollups.contributions(obj), changed=[obj])
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            owner_id, before = obj.owner_id, rollups.contributions(obj)
+            deleted = sync.deleted_rows([obj])  # Incluye cascadas (movimientos de un ahorro)
+            super().delete_model(request, obj)
+            tracking.record_write(owner_id, before=before, deleted=deleted)
+
+    def delete_queryset(self, request, queryset):
+        # Acción "eliminar seleccionados": una escritura por usuario afectado
+        with transaction.atomic():
+            by_owner = {}
+            for obj in queryset:
+                by_owner.setdefault(obj.owner_id, []).append(obj)
+            writes = [(owner_id, [c for obj in objs for c in rollups.contributions(obj)], sync.deleted_rows(objs))
+                      for owner_id, objs in by_owner.items()]
+            super().delete_queryset(request, queryset)
+            for owner_id, before, deleted in writes:
+                tracking.record_write(owner_id, before=before, deleted=deleted)
+
+@admin.register(MonthlyRollup)
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ('owner', 'category', 'month', 'total', 'count')
+    list_filter = ('category',)
+    search_fields = ('owner__email',)
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'kind', 'status', 'priority', 'attempts', 'progress', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('owner__email',)
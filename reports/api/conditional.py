@@ -0,0 +1,84 @@
+# reports/api/conditional.py
+import hashlib
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from reports import tracking
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = ''
+
+
+def _is_not_modified(request, etag, last_modified):
+    # If-None-Match manda; If-Modified-Since solo se mira si no viene ETag (RFC 9110)
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # Comparación débil: la compresión (reports/middleware.py) envía W/"..."
+        etags = [e.removeprefix('W/') for e in parse_etags(if_none_match)]
+        return '*' in etags or etag in etags
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+class ConditionalGetMixin:
+    """
+    GET condicional (ETag / Last-Modified) para vistas con datos por usuario.
+
+    El ETag sale de la versión de datos del usuario (`reports.DataVersion`)
+    más la URL y el Accept, no del cuerpo: si el cliente ya tiene la versión
+    vigente se responde 304 antes de ejecutar el queryset o el serializer.
+    """
+    _conditional = None
+
+    def conditional_depends_on_date(self):
+        """True si la respuesta cambia con la fecha local (p. ej. pronósticos desde hoy)."""
+        return False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)  # Autenticación y permisos primero
+        if request.method not in ('GET', 'HEAD') or not request.user.is_authenticated:
+            return
+
+        user = request.user
+        version, updated_at = tracking.get_marker(user.pk)
+        request.data_version = version  # Reutilizado por la caché de reportes
+        key = '%s:%s:%s:%s' % (user.pk, version, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''))
+        last_modified = updated_at or user.date_joined
+        if self.conditional_depends_on_date():
+            # Sin escrituras nuevas la respuesta igual cambia al pasar el día
+            today = timezone.localdate()
+            key += ':%s' % today.isoformat()
+            midnight = timezone.make_aware(datetime.combine(today, time.min))
+            last_modified = max(last_modified, midnight)
+        etag = quote_etag(hashlib.sha1(key.encode()).hexdigest())
+        self._conditional = (etag, last_modified)
+
+        if _is_not_modified(request, etag, last_modified):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._conditional and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            etag, last_modified = self._conditional
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+            # Respuesta distinta por usuario: que los proxies no la compartan
+            patch_vary_headers(response, ('Authorization',))
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,159 @@
+# reports/api/fastlist.py
+"""
+Modo rápido para listados de solo lectura.
+
+El listado normal de DRF crea una instancia de modelo por fila y llama a
+`to_representation` campo por campo. Aquí el queryset se lee con
+`values_list()` (tuplas) y cada fila pasa por un codificador que se arma una
+sola vez por serializer: para cada campo se resuelve de antemano la columna
+y la conversión que haría el campo de DRF (Decimal -> texto con sus
+decimales, fecha -> ISO 8601, ...). El resultado es el mismo `dict` por fila
+que da el serializer, así que el JSON sale idéntico byte a byte.
+
+Si algún campo no se puede leer como columna (métodos, `source='*'`,
+relaciones many-to-many, ...) `compile_encoder` devuelve None y la vista
+usa el serializer de siempre.
+"""
+import decimal
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import fields, relations
+from rest_framework.settings import api_settings
+
+_ENCODERS = {}
+
+
+def _is_stock(field, cls):
+    # Solo campos de DRF tal cual: si una subclase cambia to_representation se usa la suya
+    return type(field) is cls and type(field).to_representation is cls.to_representation
+
+
+def _decimal(field):
+    coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce or field.localize or field.normalize_output or field.decimal_places is None:
+        return None
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    rounding, prec = field.rounding, field.max_digits
+
+    def convert(value):
+        # Igual que DecimalField.quantize (el contexto se copia en cada llamada, como en DRF)
+        context = decimal.getcontext().copy()
+        if prec is not None:
+            context.prec = prec
+        return f'{value.quantize(exponent, rounding=rounding, context=context):f}'
+    return convert
+
+
+def _date(field):
+    if getattr(field, 'format', api_settings.DATE_FORMAT).lower() != fields.ISO_8601:
+        return None
+    return lambda value: value.isoformat()
+
+
+def _datetime(field, tz):
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT).lower() != fields.ISO_8601 or tz is None:
+        return None
+
+    def convert(value):
+        if not timezone.is_aware(value):
+            return field.to_representation(value)
+        text = value.astimezone(tz).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return convert
+
+
+def _converter(field, tz):
+    """Conversión de un valor no nulo; None = el valor de la base sale tal cual."""
+    if any(_is_stock(field, cls) for cls in (fields.ReadOnlyField, fields.CharField,
+                                              fields.IntegerField, fields.BooleanField)):
+        return None
+    if _is_stock(field, fields.DecimalField):
+        return _decimal(field) or field.to_representation
+    if _is_stock(field, fields.DateField):
+        return _date(field) or field.to_representation
+    if _is_stock(field, fields.DateTimeField):
+        return _datetime(field, tz) or field.to_representation
+    return field.to_representation
+
+
+class RowEncoder:
+    """
+    Codificador de filas de un serializer. `bind(known)` devuelve las
+    columnas para `values_list()` y la función fila -> dict. `known` da
+    objetos ya cargados (p. ej. `{'owner': request.user}`) para que
+    `owner.email` salga de ahí y no de una columna con JOIN.
+    """
+
+    def __init__(self, items):
+        self.items = items  # (nombre, columna, relación, getter, conversión)
+
+    def bind(self, known=None):
+        known = known or {}
+        columns, plan = [], []
+        for name, column, relation, getter, convert in self.items:
+            if relation in known:
+                value = getter(known[relation])
+                if value is not None and convert is not None:
+                    value = convert(value)
+                plan.append((name, None, None, value))
+            else:
+                plan.append((name, len(columns), convert, None))
+                columns.append(column)
+
+        def encode(row):
+            item = {}
+            for name, index, convert, constant in plan:
+                if index is None:
+                    item[name] = constant
+                else:
+                    value = row[index]
+                    item[name] = value if convert is None or value is None else convert(value)
+            return item
+        return columns, encode
+
+
+def compile_encoder(serializer_class):
+    """Codificador de `serializer_class` (cacheado por zona horaria), o None si no aplica."""
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    key = (serializer_class, str(tz))
+    if key not in _ENCODERS:
+        _ENCODERS[key] = _build(serializer_class, tz)
+    return _ENCODERS[key]
+
+
+def _build(serializer_class, tz):
+    serializer = serializer_class()
+    model = serializer.Meta.model
+    items = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        source = field.source
+        if source == '*' or isinstance(field, (relations.ManyRelatedField, fields.SerializerMethodField)):
+            return None
+        relation = getter = None
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                return None
+            source, convert = source + '_id', None
+        elif '.' in source:
+            # Atributo de una relación: `owner.email` -> columna owner__email (o el objeto conocido)
+            relation, _, path = source.partition('.')
+            getter = attrgetter(path)
+            convert = _converter(field, tz)
+            items.append((name, source.replace('.', '__'), relation, getter, convert))
+            continue
+        else:
+            convert = _converter(field, tz)
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # `<fk>_id` no es un nombre de campo: se busca por attname
+            model_field = next((f for f in model._meta.concrete_fields if f.attname == source), None)
+        if model_field is None or not model_field.concrete or model_field.many_to_many:
+            return None
+        items.append((name, model_field.attname, relation, getter, convert))
+    return RowEncoder(items)
@@ -0,0 +1,183 @@
+# reports/api/mixins.py
+from django.conf import settings
+from django.db import transaction
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from reports import rollups, sync, tracking
+from reports.api import fastlist
+
+
+class TrackedWritesMixin:
+    """
+    Mixin para los ModelViewSet de ingresos, egresos, ahorros y préstamos.
+    Asigna el owner y, en la misma transacción que la escritura, mantiene los
+    rollups de reportes e invalida los reportes cacheados del usuario.
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            instance = serializer.save(owner=self.request.user)
+            tracking.record_write(instance.owner_id, after=rollups.contributions(instance), changed=[instance])
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            before = rollups.contributions(serializer.instance)  # Valores antes de guardar
+            instance = serializer.save()
+            tracking.record_write(instance.owner_id, before=before, after=rollups.contributions(instance),
+                                  changed=[instance])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            owner_id = instance.owner_id
+            before = rollups.contributions(instance)
+            deleted = sync.deleted_rows([instance])  # Incluye cascadas (movimientos de un ahorro)
+            instance.delete()
+            tracking.record_write(owner_id, before=before, deleted=deleted)
+
+
+class FastListMixin:
+    """
+    `list` sin instancias de modelo ni serializer por fila: el queryset
+    filtrado se lee con values_list() y cada tupla se codifica con el
+    codificador precompilado del serializer (ver reports/api/fastlist.py).
+    Mismo JSON, mismos filtros, orden y paginación por cursor.
+
+    `get_queryset` debe partir del manager inverso del usuario: `owner` sale
+    de `request.user` sin JOIN. Si el serializer tiene campos que no son
+    columnas se usa el listado normal de DRF.
+    """
+    fast_list = True
+
+    def list(self, request, *args, **kwargs):
+        encoder = fastlist.compile_encoder(self.get_serializer_class()) if self.fast_list else None
+        if encoder is None:
+            return super().list(request, *args, **kwargs)
+        columns, encode = encoder.bind({'owner': request.user})
+        # named=True: la paginación por cursor lee `date` e `id` de la fila
+        rows = self.filter_queryset(self.get_queryset()).values_list(*columns, named=True)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([encode(row) for row in page])
+        return Response([encode(row) for row in rows])
+
+
+def bulk_items(request):
+    """
+    `(elementos, None)` si el cuerpo es una lista no vacía de a lo sumo
+    BULK_MAX_ITEMS elementos; si no, `(None, respuesta 400)`.
+    """
+    items = request.data
+    limit = getattr(settings, 'BULK_MAX_ITEMS', 10000)
+    if not isinstance(items, list) or not items:
+        return None, Response({'detail': 'Se espera una lista no vacía.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > limit:
+        return None, Response({'detail': f'Máximo {limit} elementos por petición.'}, status=status.HTTP_400_BAD_REQUEST)
+    return items, None
+
+
+def item_errors(errors, items=None):
+    # [{}, {'quantity': [...]}, ...] -> [{'index': 1, 'errors': {...}}] (solo los que fallan)
+    out = []
+    for index, error in enumerate(errors):
+        if error:
+            entry = {'index': index, 'errors': error}
+            if items is not None and isinstance(items[index], dict) and 'id' in items[index]:
+                entry['id'] = items[index]['id']
+            out.append(entry)
+    return out
+
+
+_BULK_ITEMS = openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT))
+_BULK_IDS = openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER))
+
+
+class BulkWriteMixin:
+    """
+    Endpoint `{prefix}/bulk/` para escribir muchos registros en una petición:
+
+    - POST   [ {...}, ... ]            -> alta (bulk_create)
+    - PATCH  [ {"id": 1, ...}, ... ]   -> edición parcial (bulk_update)
+    - DELETE [ 1, 2, ... ]             -> borrado
+
+    Todo el lote se valida antes de escribir; si algún elemento falla se
+    responde 400 con los errores por índice y no se escribe nada. La escritura
+    va en una sola transacción junto con el delta de los rollups de reportes.
+    Usar junto con TrackedWritesMixin (mismo owner y mismas reglas).
+    """
+    bulk_batch_size = 1000  # Filas por INSERT/UPDATE
+
+    def _bulk_instances(self, ids):
+        # Solo registros del usuario (get_queryset parte de su manager inverso)
+        return self.get_queryset().order_by().in_bulk(ids)
+
+    @swagger_auto_schema(method='post', operation_summary='Alta masiva', request_body=_BULK_ITEMS)
+    @swagger_auto_schema(method='patch', operation_summary='Edición masiva (cada elemento con su id)', request_body=_BULK_ITEMS)
+    @swagger_auto_schema(method='delete', operation_summary='Borrado masivo (lista de ids en el cuerpo)')
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        items, error = bulk_items(request)
+        if error is not None:
+            return error
+        if request.method == 'POST':
+            return self.bulk_create(items)
+        if request.method == 'PATCH':
+            return self.bulk_update(items)
+        return self.bulk_destroy(items)
+
+    def bulk_create(self, items):
+        serializer = self.get_serializer(data=items, many=True)
+        if not serializer.is_valid():
+            return Response({'errors': item_errors(serializer.errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        owner = self.request.user
+        objs = [model(owner=owner, **attrs) for attrs in serializer.validated_data]
+        with transaction.atomic():
+            model.objects.bulk_create(objs, batch_size=self.bulk_batch_size)
+            tracking.record_write(owner.pk, after=[c for obj in objs for c in rollups.contributions(obj)], changed=objs)
+        return Response(self.get_serializer(objs, many=True).data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, items):
+        ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+        instances = self._bulk_instances([pk for pk in ids if isinstance(pk, int)])
+        serializer = self.get_serializer(data=items, many=True, partial=True)
+        serializer.is_valid()
+        errors = list(serializer.errors) if serializer.errors else [{} for _ in items]
+        for index, pk in enumerate(ids):
+            if pk not in instances:
+                errors[index] = {**errors[index], 'id': ['No encontrado.']}
+        if any(errors):
+            return Response({'errors': item_errors(errors, items)}, status=status.HTTP_400_BAD_REQUEST)
+
+        before, after, fields, objs = [], [], set(), []
+        for pk, attrs in zip(ids, serializer.validated_data):
+            instance = instances[pk]
+            before.extend(rollups.contributions(instance))
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            after.extend(rollups.contributions(instance))
+            fields.update(attrs)
+            objs.append(instance)
+        with transaction.atomic():
+            if fields:
+                self.get_queryset().model.objects.bulk_update(objs, sorted(fields), batch_size=self.bulk_batch_size)
+            tracking.record_write(self.request.user.pk, before=before, after=after, changed=objs)
+        return Response(self.get_serializer(objs, many=True).data)
+
+    def bulk_destroy(self, items):
+        instances = self._bulk_instances([pk for pk in items if isinstance(pk, int)])
+        errors = [{} if pk in instances else {'id': ['No encontrado.']} for pk in items]
+        if any(errors):
+            return Response({'errors': item_errors(errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        before = [c for instance in instances.values() for c in rollups.contributions(instance)]
+        with transaction.atomic():
+            queryset = self.get_queryset().filter(pk__in=list(instances))
+            deleted = sync.deleted_rows(queryset)
+            queryset.delete()
+            tracking.record_write(self.request.user.pk, before=before, deleted=deleted)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,141 @@
+# reports/api/pagination.py
+import base64
+import json
+from collections import OrderedDict
+from datetime import date
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(position) -> str:
+    """Cursor opaco (base64 url-safe) a partir de una posición `(fecha, id)`."""
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in position], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def cursor_values(cursor: str) -> list:
+    """Valores de un cursor de `encode_cursor` (fechas como texto ISO)."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError):
+        raise NotFound('Cursor inválido.')
+    if not isinstance(values, list):
+        raise NotFound('Cursor inválido.')
+    return values
+
+
+def decode_cursor(cursor: str):
+    try:
+        day, pk = cursor_values(cursor)
+        day = parse_date(day)
+        if day is None:
+            raise ValueError(cursor)
+        return day, int(pk)
+    except (TypeError, ValueError):
+        raise NotFound('Cursor inválido.')
+
+
+def keyset_before(date_field, day, pk) -> Q:
+    """
+    `(date, id) < (day, pk)`. El `date <= day` redundante acota el rango del
+    índice (owner, date, id); sin él el OR obliga a recorrer todo el prefijo.
+    """
+    return Q(**{f'{date_field}__lte': day}) & (Q(**{f'{date_field}__lt': day}) | Q(id__lt=pk))
+
+
+class DateIdCursorPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre `(date, id)` descendente.
+
+    Es opcional: solo pagina si llega `page_size` o `cursor`; sin ellos el
+    listado sigue devolviendo la lista completa como antes. Cada página es un
+    `WHERE (date, id) < cursor ORDER BY date DESC, id DESC LIMIT n` que usa
+    el índice (owner, date, id), así que la página N cuesta lo mismo que la 1.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+    date_field = 'date'
+    ordering_query_param = 'ordering'
+
+    def check_ordering(self, request):
+        # El cursor solo sabe seguir `date` e `id` descendentes: otro orden (OrderingFilter) no se pagina
+        ordering = request.query_params.get(self.ordering_query_param)
+        allowed = (f'-{self.date_field}', f'-{self.date_field},-id')
+        if ordering and ordering.replace(' ', '') not in allowed:
+            raise ValidationError({self.ordering_query_param: [
+                f'Con page_size/cursor el orden es -{self.date_field}; quite ordering o no pagine.']})
+
+    def is_requested(self, request):
+        return self.cursor_query_param in request.query_params or self.page_size_query_param in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        self.check_ordering(request)
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            day, pk = decode_cursor(cursor)
+            queryset = queryset.filter(keyset_before(self.date_field, day, pk))
+        queryset = queryset.order_by(f'-{self.date_field}', '-id')
+
+        rows = list(queryset[:self.page_size_value + 1])
+        self.has_next = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        self.next_position = None
+        if self.has_next and rows:
+            self.next_position = self.get_position(rows[-1])
+        return rows
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return row[self.date_field], row['id']
+        return getattr(row, self.date_field), row.id
+
+    def get_next_link(self):
+        if not self.next_position:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size_value)
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Cursor de la página siguiente (campo `next`).', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': 'Activa la paginación y fija el tamaño de página (máx. %d).' % self.max_page_size,
+             'schema': {'type': 'integer'}},
+        ]
@@ -0,0 +1,65 @@
+# reports/api/renderers.py
+"""
+Renderer y parser JSON por defecto de la API (ver REST_FRAMEWORK en
+web/settings.py).
+
+Con `orjson` instalado se serializa y parsea con orjson (en C, directo a
+bytes); sin él se usan los de DRF (stdlib `json`). La salida es la misma
+que la de `rest_framework.renderers.JSONRenderer`: compacta, UTF-8 sin
+escapar, fechas ISO 8601 con `Z` en UTC y U+2028/U+2029 escapados. Lo que
+orjson no conoce (Decimal, timedelta, textos traducibles, ...) pasa por el
+mismo `JSONEncoder.default` de DRF, y lo que orjson no puede serializar
+(enteros de más de 64 bits) o las respuestas con sangría (`indent`, API
+navegable) se delegan al renderer de DRF.
+
+Diferencias conocidas: los floats con exponente salen como `1e20` (DRF:
+`1e+20`, el mismo número) y NaN/Infinity como `null`, donde DRF lanza
+ValueError.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: sin ella, el JSON de DRF
+    orjson = None
+
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer de DRF con orjson cuando está disponible."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=(
+                orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Igual que DRF: JSON que también es JavaScript válido
+        for raw, escaped in _LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser de DRF con orjson cuando está disponible (cuerpos UTF-8)."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson rechaza NaN/Infinity, como el modo estricto de DRF
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
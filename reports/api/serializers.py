@@ -0,0 +1,55 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from reports.models import ReportJob
+
+JOB_KINDS = ['summary', 'cashflow_monthly', 'cashflow', 'rebuild_rollups']
+GRANULARITIES = ['day', 'week', 'month', 'quarter', 'year']
+
+
+class ReportJobParamsSerializer(serializers.Serializer):
+    # Mismos parámetros que los GET síncronos de /api/reports/
+    start = serializers.DateField(required=False, allow_null=True)
+    end = serializers.DateField(required=False, allow_null=True)
+    granularity = serializers.ChoiceField(choices=GRANULARITIES, required=False)
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({'end': 'Debe ser posterior a start.'})
+        return attrs
+
+
+class ReportJobCreateSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=JOB_KINDS)
+    params = ReportJobParamsSerializer(required=False, default=dict)
+    priority = serializers.IntegerField(required=False, default=0, min_value=-10, max_value=10)
+
+
+class StatementImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=['csv', 'ofx'], required=False)  # Por defecto, según la extensión
+    date_format = serializers.CharField(required=False, max_length=20)  # Ej. '%d/%m/%Y'
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    owner = serializers.ReadOnlyField(source='owner.email')
+    url = serializers.SerializerMethodField()
+    error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = ['id', 'url', 'owner', 'kind', 'params', 'status', 'priority', 'progress', 'attempts',
+                  'max_attempts', 'result', 'error', 'created_at', 'started_at', 'finished_at']
+
+    def get_url(self, obj):
+        return reverse('reports-job-detail', args=[obj.pk], request=self.context.get('request'))
+
+    def get_error(self, obj):
+        # Solo la última línea: el traceback completo queda en el admin
+        return obj.error.strip().splitlines()[-1] if obj.error else ''
+
+
+class ReportJobListSerializer(ReportJobSerializer):
+    # Listado: sin `result` (puede ser grande; se consulta en el detalle)
+    class Meta(ReportJobSerializer.Meta):
+        fields = [f for f in ReportJobSerializer.Meta.fields if f != 'result']
@@ -1,19 +1,237 @@
 from datetime import date  # Standard date type
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse  # Chunked export bodies
+from django.shortcuts import get_object_or_404
 from django.utils.dateparse import parse_date  # Safe parse from 'YYYY-MM-DD'
-from django.db import models  # Aggregations (Sum)
 from rest_framework.views import APIView  # Base API view
 from rest_framework.response import Response  # JSON responses
-from rest_framework.permissions import IsAuthenticated  # Require auth
+from rest_framework.permissions import IsAuthenticated, IsAdminUser  # Require auth
+from rest_framework.exceptions import NotFound, ValidationError  # 404 bad cursor / 400 on bad params
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.utils.urls import replace_query_param
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+import numpy as np
 
-from ingresos.models import IngresosFijos, IngresosExtra  # Income models
-from egresos.models import EgresosFijos, EgresosExtra  # Expense models
-from ahorros.models import Ahorros  # Savings model
-from prestamos.models import Prestamos  # Loans model
+from ingresos.models import IngresosFijos
+from egresos.models import EgresosFijos
 
+from reports.engine import ReportQuery  # Single-query aggregation over rollups/tables
+from reports import series as report_series  # Dense (gap-filled) series with NumPy
+from reports import cache as report_cache  # Versioned per-user report cache
+from reports.projection import RecurringItems  # Fijos -> dated occurrences (NumPy)
+from reports import balance as report_balance  # Running balance (SQL window functions)
+from reports import export as report_export  # Streaming CSV/XLSX writers
+from reports import jobs as report_jobs  # DB-backed background job queue
+from reports import imports as report_imports  # Bank statement import (CSV / OFX)
+from reports import sync as report_sync  # Delta sync for offline clients
+from reports import search as report_search  # Full-text search (FTS5 / tsvector)
+from reports import ledger as report_ledger  # Merged date-ordered movements
+from reports import tracking
+from reports.models import ImportChunk, ReportJob
+from reports.api.conditional import ConditionalGetMixin  # ETag / Last-Modified
+from reports.api.pagination import cursor_values, encode_cursor
+from reports.api.serializers import (
+    ReportJobCreateSerializer, ReportJobListSerializer, ReportJobSerializer, StatementImportSerializer,
+)
+from ingresos.api.serializers import IngresosFijosSerializer, IngresosExtraSerializer
+from egresos.api.serializers import EgresosFijosSerializer, EgresosExtraSerializer
+from ahorros.api.serializers import AhorrosSerializer, AhorroMovimientoSerializer
+from prestamos.api.serializers import PrestamosSerializer
 
-class SummaryView(APIView):
+# Same representation as each resource's own endpoint (sync, search)
+RESOURCE_SERIALIZERS = {
+    'ingresos_fijos': IngresosFijosSerializer,
+    'ingresos_extra': IngresosExtraSerializer,
+    'egresos_fijos': EgresosFijosSerializer,
+    'egresos_extra': EgresosExtraSerializer,
+    'ahorros': AhorrosSerializer,
+    'ahorro_movimientos': AhorroMovimientoSerializer,
+    'prestamos': PrestamosSerializer,
+}
+
+
+def _parse_range(request):
+    # Parse optional range params (apply to records with date)
+    start_param = request.query_params.get('start')
+    end_param = request.query_params.get('end')
+    start = parse_date(start_param) if start_param else None
+    end = parse_date(end_param) if end_param else None
+    return start, end
+
+
+def _cached_response(request, endpoint, start, end, compute, extra=()):
+    # Serve from the per-user versioned cache; X-Report-Cache shows HIT/MISS
+    version = getattr(request, 'data_version', None)  # Set by ConditionalGetMixin
+    data, hit = report_cache.cached_report(request.user, endpoint, (start, end, *extra), compute, version=version)
+    response = Response(data)
+    response['X-Report-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+def _job_accepted(request, job):
+    # 202 + Location: el cliente consulta /api/reports/jobs/{id}/ hasta que termine
+    data = ReportJobSerializer(job, context={'request': request}).data
+    return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': data['url']})
+
+
+def _async_param(request):
+    return request.query_params.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def _wants_async(request, start, end):
+    # ?async=true, o un rango más largo que REPORTS_ASYNC_THRESHOLD_DAYS
+    if _async_param(request):
+        return True
+    threshold = getattr(settings, 'REPORTS_ASYNC_THRESHOLD_DAYS', None)
+    return bool(threshold and start and end and (end - start).days > threshold)
+
+
+def _report_response(request, endpoint, kind, start, end, compute):
+    # Síncrono como siempre, salvo rangos amplios: si no está en caché se
+    # encola un ReportJob y se responde 202 con su id
+    if not _wants_async(request, start, end):
+        return _cached_response(request, endpoint, start, end, compute)
+    data = report_cache.peek(request.user, endpoint, (start, end), getattr(request, 'data_version', None))
+    if data is not None:
+        response = Response(data)
+        response['X-Report-Cache'] = 'HIT'
+        return response
+    params = {'start': start.isoformat() if start else None, 'end': end.isoformat() if end else None}
+    return _job_accepted(request, report_jobs.enqueue(request.user, kind, params, reuse=True))
+
+
+# Métricas que declara cada reporte (ver reports/metrics.py)
+SUMMARY_QUERY = ReportQuery([
+    'ingresos_fijos', 'ingresos_extra', 'egresos_fijos', 'egresos_extra',
+    'ahorros_objetivo', 'ahorros_acumulado', 'prestamos',
+])
+CASHFLOW_MONTHLY_QUERY = ReportQuery(['ingresos_extra', 'egresos_extra'], granularity='month')
+CASHFLOW_METRICS = ['ingresos_extra', 'egresos_extra']
+CASHFLOW_GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+BALANCE_DEFAULT_POINTS = 1000
+BALANCE_MAX_POINTS = 10000
+
+
+def _decimal(value):
+    return Decimal(str(round(value, 2)))
+
+
+def summary_payload(user, start=None, end=None) -> dict:
+    """Cuerpo de /api/reports/summary/ para `user` en [start, end]."""
+    # Todas las categorías en una sola consulta (UNION ALL sobre rollups y bordes)
+    totals = SUMMARY_QUERY.totals(user, start, end)
+    ingresos_fijos_total = totals['ingresos_fijos']
+    ingresos_extra_total = totals['ingresos_extra']
+    egresos_fijos_total = totals['egresos_fijos']
+    egresos_extra_total = totals['egresos_extra']
+    ahorros_total_objetivo = totals['ahorros_objetivo']
+    ahorros_total_acumulado = totals['ahorros_acumulado']
+    prestamos_total = totals['prestamos']
+
+    # Con rango completo los Fijos se proyectan a sus ocurrencias dentro del
+    # rango; sin rango se mantiene el total histórico (quantity completo)
+    if start and end:
+        ingresos_fijos_total = _decimal(RecurringItems.for_owner(IngresosFijos, user).total(start, end))
+        egresos_fijos_total = _decimal(RecurringItems.for_owner(EgresosFijos, user).total(start, end))
+
+    neto = (ingresos_fijos_total + ingresos_extra_total) - (egresos_fijos_total + egresos_extra_total)
+
+    # Serialize floats for JSON
+    return {
+        'period': {'start': start, 'end': end},
+        'ingresos': {
+            'fijos': float(ingresos_fijos_total),
+            'extra': float(ingresos_extra_total),
+            'total': float(ingresos_fijos_total + ingresos_extra_total),
+        },
+        'egresos': {
+            'fijos': float(egresos_fijos_total),
+            'extra': float(egresos_extra_total),
+            'total': float(egresos_fijos_total + egresos_extra_total),
+        },
+        'balanza_neta': float(neto),
+        'ahorros': {
+            'objetivo_total': float(ahorros_total_objetivo),
+            'acumulado_total': float(ahorros_total_acumulado),
+        },
+        'prestamos': {
+            'monto_total': float(prestamos_total),
+        },
+    }
+
+
+def cashflow_monthly_payload(user, start=None, end=None) -> dict:
+    """Cuerpo de /api/reports/cashflow/monthly/ para `user` en [start, end]."""
+    # Meses completos desde el rollup; los bordes del rango desde las tablas
+    months = CASHFLOW_MONTHLY_QUERY.run(user, start, end)
+
+    # Normalizamos a { 'YYYY-MM-01': { ingresos_extra, egresos_extra } }
+    out = {}
+    for month, row in months.items():
+        out[month.strftime('%Y-%m-01')] = {
+            'ingresos_extra': float(row.get('ingresos_extra', 0)),
+            'egresos_extra': float(row.get('egresos_extra', 0)),
+        }
+
+    # A lista ordenada
+    result = [
+        {'month': k, **v, 'neto_extra': round(v['ingresos_extra'] - v['egresos_extra'], 2)}
+        for k, v in sorted(out.items())
+    ]
+    return {'range': {'start': start, 'end': end}, 'months': result}
+
+
+def cashflow_payload(user, start=None, end=None, granularity='month') -> dict:
+    """Cuerpo de /api/reports/cashflow/: serie densa por periodo (columnas)."""
+    buckets = ReportQuery(CASHFLOW_METRICS, granularity=granularity).run(user, start, end)
+    periods, columns = report_series.dense(buckets, CASHFLOW_METRICS, granularity, start, end)
+    ingresos, egresos = columns['ingresos_extra'], columns['egresos_extra']
+
+    # Fijos proyectados sobre los mismos periodos (el último termina en `end`
+    # o al cierre de su bucket)
+    if len(periods):
+        window_end = end or report_series.bucket_end(periods[-1], granularity)
+        fijos_in = RecurringItems.for_owner(IngresosFijos, user).bucket_totals(periods, window_end, start)
+        fijos_out = RecurringItems.for_owner(EgresosFijos, user).bucket_totals(periods, window_end, start)
+    else:
+        fijos_in = fijos_out = np.zeros(0)
+    return {
+        'range': {'start': start, 'end': end},
+        'granularity': granularity,
+        'series': {
+            'period': periods.astype(str).tolist(),
+            'ingresos_extra': ingresos.round(2).tolist(),
+            'egresos_extra': egresos.round(2).tolist(),
+            'neto_extra': (ingresos - egresos).round(2).tolist(),
+            'ingresos_fijos': fijos_in.round(2).tolist(),
+            'egresos_fijos': fijos_out.round(2).tolist(),
+            'neto': (ingresos + fijos_in - egresos - fijos_out).round(2).tolist(),
+        },
+    }
+
+
+def balance_payload(user, start=None, end=None, max_points=BALANCE_DEFAULT_POINTS) -> dict:
+    """Cuerpo de /api/reports/balance/: saldo acumulado (extra) por fecha."""
+    days, values, opening = report_balance.running_balance(user, start, end)
+    total_points = len(days)
+    days, values = report_balance.downsample(days, values, max_points)
+    return {
+        'range': {'start': start, 'end': end},
+        'opening_balance': round(opening, 2),
+        'points': total_points,
+        'downsampled': len(days) < total_points,
+        'series': {
+            'date': days.astype(str).tolist(),
+            'balance': values.round(2).tolist(),
+        },
+    }
+
+
+class SummaryView(ConditionalGetMixin, APIView):
     # Returns numeric totals and net balance for the user
     permission_classes = [IsAuthenticated]
 
@@ -23,6 +241,7 @@ class SummaryView(APIView):
         manual_parameters=[
             openapi.Parameter('start', openapi.IN_QUERY, description='YYYY-MM-DD', type=openapi.TYPE_STRING),
             openapi.Parameter('end', openapi.IN_QUERY, description='YYYY-MM-DD', type=openapi.TYPE_STRING),
+            openapi.Parameter('async', openapi.IN_QUERY, description='true = calcular en segundo plano (202 + trabajo)', type=openapi.TYPE_BOOLEAN),
         ],
         responses={200: openapi.Response('OK', examples={'application/json': {
             'period': {'start': None, 'end': None},
@@ -36,74 +255,18 @@ class SummaryView(APIView):
     def get(self, request):
         """
         Devuelve sumas por categoría y balance neto.
-        Query params opcionales: start=YYYY-MM-DD, end=YYYY-MM-DD
-        Nota: los registros Fijos no tienen fecha; se cuentan completos.
-        """
-        # Parse optional range params (apply to records with date)
-        start_param = request.query_params.get('start')
-        end_param = request.query_params.get('end')
-        start = parse_date(start_param) if start_param else None
-        end = parse_date(end_param) if end_param else None
-
-        user = request.user
-
-        # Incomes
-        q_if = IngresosFijos.objects.filter(owner=user)
-        q_ie = IngresosExtra.objects.filter(owner=user)
-        if start:
-            q_ie = q_ie.filter(date__gte=start)
-        if end:
-            q_ie = q_ie.filter(date__lte=end)
-
-        ingresos_fijos_total = q_if.aggregate(total=models.Sum('quantity'))['total'] or 0
-        ingresos_extra_total = q_ie.aggregate(total=models.Sum('quantity'))['total'] or 0
-
-        # Expenses
-        q_ef = EgresosFijos.objects.filter(owner=user)
-        q_ee = EgresosExtra.objects.filter(owner=user)
-        if start:
-            q_ee = q_ee.filter(date__gte=start)
-        if end:
-            q_ee = q_ee.filter(date__lte=end)
-
-        egresos_fijos_total = q_ef.aggregate(total=models.Sum('quantity'))['total'] or 0
-        egresos_extra_total = q_ee.aggregate(total=models.Sum('quantity'))['total'] or 0
-
-        # Savings and loans (simple totals)
-        ahorros_total_objetivo = Ahorros.objects.filter(owner=user).aggregate(total=models.Sum('quantity'))['total'] or 0
-        ahorros_total_acumulado = Ahorros.objects.filter(owner=user).aggregate(total=models.Sum('accrued'))['total'] or 0
-        prestamos_total = Prestamos.objects.filter(owner=user).aggregate(total=models.Sum('quantity'))['total'] or 0
-
-        neto = (ingresos_fijos_total + ingresos_extra_total) - (egresos_fijos_total + egresos_extra_total)
-
-        # Serialize floats for JSON
-        return Response({
-            'period': {'start': start, 'end': end},
-            'ingresos': {
-                'fijos': float(ingresos_fijos_total),
-                'extra': float(ingresos_extra_total),
-                'total': float(ingresos_fijos_total + ingresos_extra_total),
-            },
-            'egresos': {
-                'fijos': float(egresos_fijos_total),
-                'extra': float(egresos_extra_total),
-                'total': float(egresos_fijos_total + egresos_extra_total),
-            },
-            'balanza_neta': float(neto),
-            'ahorros': {
-                'objetivo_total': float(ahorros_total_objetivo),
-                'acumulado_total': float(ahorros_total_acumulado),
-            },
-            'prestamos': {
-                'monto_total': float(prestamos_total),
-            },
-        })
-
-
-from django.db.models.functions import TruncMonth  # Group by month
-
-
-class CashflowMonthlyView(APIView):
+        Query params opcionales: start=YYYY-MM-DD, end=YYYY-MM-DD, async=true
+        Con async=true (o un rango mayor a REPORTS_ASYNC_THRESHOLD_DAYS) y sin
+        caché vigente responde 202 con un trabajo en /api/reports/jobs/{id}/.
+        Con start y end los registros Fijos se proyectan según su `period`
+        (y date_start/date_end); sin rango completo se cuentan completos.
+        """
+        start, end = _parse_range(request)
+        return _report_response(request, 'summary', 'summary', start, end,
+                                 lambda: summary_payload(request.user, start, end))
+
+
+class CashflowMonthlyView(ConditionalGetMixin, APIView):
     # Monthly sums for extra incomes/expenses
     permission_classes = [IsAuthenticated]
 
@@ -113,6 +276,7 @@ class CashflowMonthlyView(APIView):
         manual_parameters=[
             openapi.Parameter('start', openapi.IN_QUERY, description='YYYY-MM-DD', type=openapi.TYPE_STRING),
             openapi.Parameter('end', openapi.IN_QUERY, description='YYYY-MM-DD', type=openapi.TYPE_STRING),
+            openapi.Parameter('async', openapi.IN_QUERY, description='true = calcular en segundo plano (202 + trabajo)', type=openapi.TYPE_BOOLEAN),
         ],
         responses={200: openapi.Response('OK', examples={'application/json': {
             'range': {'start': None, 'end': None},
@@ -124,50 +288,404 @@ class CashflowMonthlyView(APIView):
     def get(self, request):
         """
         Devuelve sumas mensuales de ingresos/egresos EXTRA (por fecha).
-        Params opcionales: start=YYYY-MM-DD, end=YYYY-MM-DD
-        """
-        start_param = request.query_params.get('start')
-        end_param = request.query_params.get('end')
-        start = parse_date(start_param) if start_param else None
-        end = parse_date(end_param) if end_param else None
-
-        user = request.user
-
-        q_ie = IngresosExtra.objects.filter(owner=user)
-        q_ee = EgresosExtra.objects.filter(owner=user)
-        if start:
-            q_ie = q_ie.filter(date__gte=start)
-            q_ee = q_ee.filter(date__gte=start)
-        if end:
-            q_ie = q_ie.filter(date__lte=end)
-            q_ee = q_ee.filter(date__lte=end)
-
-        ie = (
-            q_ie.annotate(month=TruncMonth('date'))
-               .values('month')
-               .annotate(total=models.Sum('quantity'))
-               .order_by('month')
-        )
-        ee = (
-            q_ee.annotate(month=TruncMonth('date'))
-               .values('month')
-               .annotate(total=models.Sum('quantity'))
-               .order_by('month')
-        )
-
-        # Normalizamos a { 'YYYY-MM-01': { ingresos_extra, egresos_extra } }
-        from collections import defaultdict  # Accumulate monthly data
-        out = defaultdict(lambda: {'ingresos_extra': 0.0, 'egresos_extra': 0.0})
-        for row in ie:
-            key = row['month'].strftime('%Y-%m-01')
-            out[key]['ingresos_extra'] = float(row['total'] or 0)
-        for row in ee:
-            key = row['month'].strftime('%Y-%m-01')
-            out[key]['egresos_extra'] = float(row['total'] or 0)
-
-        # A lista ordenada
-        result = [
-            {'month': k, **v, 'neto_extra': round(v['ingresos_extra'] - v['egresos_extra'], 2)}
-            for k, v in sorted(out.items())
-        ]
-        return Response({'range': {'start': start, 'end': end}, 'months': result})
+        Params opcionales: start=YYYY-MM-DD, end=YYYY-MM-DD, async=true (202 + trabajo,
+        igual que el resumen)
+        """
+        start, end = _parse_range(request)
+        return _report_response(request, 'cashflow-monthly', 'cashflow_monthly', start, end,
+                                lambda: cashflow_monthly_payload(request.user, start, end))
+
+
+class CashflowView(ConditionalGetMixin, APIView):
+    # Dense cash-flow series with configurable bucket size
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Flujo de caja (extra) por periodo',
+        tags=['Reportes'],
+        manual_parameters=[
+            openapi.Parameter('start', openapi.IN_QUERY, description='YYYY-MM-DD', type=openapi.TYPE_STRING),
+            openapi.Parameter('end', openapi.IN_QUERY, description='YYYY-MM-DD', type=openapi.TYPE_STRING),
+            openapi.Parameter('granularity', openapi.IN_QUERY, description='day|week|month|quarter|year (por defecto month)',
+                              type=openapi.TYPE_STRING, enum=list(CASHFLOW_GRANULARITIES)),
+        ],
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'range': {'start': '2025-07-01', 'end': '2025-09-30'},
+            'granularity': 'month',
+            'series': {
+                'period': ['2025-07-01', '2025-08-01', '2025-09-01'],
+                'ingresos_extra': [0.0, 501.0, 120.0],
+                'egresos_extra': [0.0, 240.0, 0.0],
+                'neto_extra': [0.0, 261.0, 120.0],
+                'ingresos_fijos': [2000.0, 2000.0, 2000.0],
+                'egresos_fijos': [1000.0, 1000.0, 1000.0],
+                'neto': [1000.0, 1261.0, 1120.0],
+            }
+        }})}
+    )
+    def get(self, request):
+        """
+        Serie densa de ingresos/egresos EXTRA: un valor por periodo del rango,
+        con 0 en los periodos sin movimientos (lista para graficar). Incluye
+        los Fijos proyectados por periodo y el neto total.
+        Params opcionales: start, end (YYYY-MM-DD), granularity.
+        Sin start/end el rango va del primer al último periodo con datos.
+        """
+        start, end = _parse_range(request)
+        granularity = request.query_params.get('granularity', 'month')
+        if granularity not in CASHFLOW_GRANULARITIES:
+            raise ValidationError({'granularity': f'Debe ser uno de: {", ".join(CASHFLOW_GRANULARITIES)}.'})
+        if start and end and start > end:
+            raise ValidationError({'end': 'Debe ser posterior a start.'})
+
+        def compute():
+            try:
+                return cashflow_payload(request.user, start, end, granularity)
+            except ValueError as exc:  # Rango con demasiados periodos
+                raise ValidationError({'granularity': str(exc)})
+
+        return _cached_response(request, f'cashflow-{granularity}', start, end, compute)
+
+
+class BalanceView(ConditionalGetMixin, APIView):
+    # Cumulative net balance (extra incomes - extra expenses) over time
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Saldo acumulado (extra)',
+        tags=['Reportes'],
+        manual_parameters=[
+            openapi.Parameter('start', openapi.IN_QUERY, description='YYYY-MM-DD', type=openapi.TYPE_STRING),
+            openapi.Parameter('end', openapi.IN_QUERY, description='YYYY-MM-DD', type=openapi.TYPE_STRING),
+            openapi.Parameter('max_points', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f'Máximo de puntos devueltos (2-{BALANCE_MAX_POINTS}, por defecto {BALANCE_DEFAULT_POINTS})'),
+        ],
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'range': {'start': '2025-08-01', 'end': None},
+            'opening_balance': 150.0,
+            'points': 2,
+            'downsampled': False,
+            'series': {
+                'date': ['2025-08-05', '2025-08-20'],
+                'balance': [651.0, 411.0],
+            }
+        }})}
+    )
+    def get(self, request):
+        """
+        Saldo acumulado de ingresos menos egresos EXTRA: un punto por día con
+        movimientos (saldo al cierre del día, incluido lo anterior a start).
+        Con más de max_points días se conserva el último punto de cada tramo.
+        """
+        start, end = _parse_range(request)
+        try:
+            max_points = int(request.query_params.get('max_points', BALANCE_DEFAULT_POINTS))
+        except ValueError:
+            raise ValidationError({'max_points': 'Debe ser un entero.'})
+        if not 2 <= max_points <= BALANCE_MAX_POINTS:
+            raise ValidationError({'max_points': f'Debe estar entre 2 y {BALANCE_MAX_POINTS}.'})
+        if start and end and start > end:
+            raise ValidationError({'end': 'Debe ser posterior a start.'})
+        return _cached_response(request, 'balance', start, end,
+                                lambda: balance_payload(request.user, start, end, max_points),
+                                extra=(max_points,))
+
+
+class ExportTransactionsView(ConditionalGetMixin, APIView):
+    # Streams every movement of the user as CSV or XLSX (constant memory)
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Exportar movimientos (CSV / XLSX)',
+        tags=['Reportes'],
+        responses={200: 'Archivo con columnas: ' + ', '.join(report_export.COLUMNS)}
+    )
+    def get(self, request, fmt):
+        """
+        Descarga ingresos/egresos extra y fijos, movimientos de ahorro y
+        préstamos en un solo archivo. Se genera mientras se envía: no se
+        cargan todas las filas en memoria ni pasan por serializers.
+        """
+        content_type, chunks = report_export.FORMATS[fmt]
+        response = StreamingHttpResponse(chunks(request.user), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="movimientos.{fmt}"'
+        return response
+
+
+class ReportJobsView(APIView):
+    # Enqueue background report jobs / list the latest ones of the user
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Encolar trabajo de reporte',
+        tags=['Reportes'],
+        request_body=ReportJobCreateSerializer,
+        responses={202: ReportJobSerializer}
+    )
+    def post(self, request):
+        """
+        Crea un trabajo en segundo plano (summary, cashflow_monthly, cashflow o
+        rebuild_rollups) y responde 202 con su id. Lo ejecuta `manage.py runworker`.
+        """
+        serializer = ReportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = {k: (v.isoformat() if hasattr(v, 'isoformat') else v)
+                  for k, v in serializer.validated_data['params'].items()}
+        job = report_jobs.enqueue(request.user, serializer.validated_data['kind'], params,
+                                  priority=serializer.validated_data['priority'])
+        return _job_accepted(request, job)
+
+    @swagger_auto_schema(
+        operation_summary='Últimos trabajos de reporte',
+        tags=['Reportes'],
+        responses={200: ReportJobListSerializer(many=True)}
+    )
+    def get(self, request):
+        """Los 50 trabajos más recientes del usuario (sin el resultado)."""
+        jobs = request.user.report_jobs.defer('result').order_by('-id')[:50]
+        return Response(ReportJobListSerializer(jobs, many=True, context={'request': request}).data)
+
+
+class ReportJobDetailView(APIView):
+    # Status, progress and result of one background job
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Estado de trabajo de reporte',
+        tags=['Reportes'],
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'id': 12, 'url': 'http://localhost:8000/api/reports/jobs/12/', 'owner': 'you@mail.com',
+            'kind': 'summary', 'params': {'start': '2015-01-01', 'end': '2025-12-31'},
+            'status': 'done', 'priority': 0, 'progress': 100, 'attempts': 1, 'max_attempts': 3,
+            'result': {'balanza_neta': 1261.0}, 'error': '',
+            'created_at': '2025-08-28T10:00:00Z', 'started_at': '2025-08-28T10:00:01Z',
+            'finished_at': '2025-08-28T10:00:02Z'
+        }})}
+    )
+    def get(self, request, pk):
+        """status: pending | running | done | failed. `result` se llena al terminar."""
+        job = get_object_or_404(ReportJob.objects.select_related('owner'), pk=pk, owner=request.user)
+        return Response(ReportJobSerializer(job, context={'request': request}).data)
+
+
+IMPORT_CHUNK_BYTES = 256 * 1024  # Tamaño de cada ImportChunk
+
+
+class StatementImportView(APIView):
+    # Bank statement upload -> IngresosExtra / EgresosExtra (deduplicated)
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @swagger_auto_schema(
+        operation_summary='Importar extracto bancario (CSV / OFX)',
+        tags=['Reportes'],
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True,
+                              description='Extracto .csv u .ofx'),
+            openapi.Parameter('format', openapi.IN_FORM, type=openapi.TYPE_STRING, enum=['csv', 'ofx'],
+                              description='Por defecto según la extensión'),
+            openapi.Parameter('date_format', openapi.IN_FORM, type=openapi.TYPE_STRING,
+                              description="Formato de fecha del CSV, p. ej. %d/%m/%Y (por defecto se detecta)"),
+            openapi.Parameter('async', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                              description='true = importar en segundo plano (202 + trabajo)'),
+        ],
+        responses={201: openapi.Response('OK', examples={'application/json': {
+            'ingresos': 12, 'egresos': 87, 'duplicados': 3, 'omitidos': 0, 'lineas': 102,
+            'errores': [], 'total_errores': 0
+        }})}
+    )
+    def post(self, request):
+        """
+        Crea ingresos (montos positivos) y egresos (negativos) extra a partir
+        del extracto. Los movimientos ya importados se omiten (`duplicados`).
+        Con ?async=true, o si el archivo supera STATEMENT_IMPORT_ASYNC_BYTES,
+        responde 202 y la importación corre en segundo plano con progreso.
+        """
+        serializer = StatementImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        fmt = report_imports.guess_format(upload.name, serializer.validated_data.get('format'))
+        date_format = serializer.validated_data.get('date_format')
+
+        threshold = getattr(settings, 'STATEMENT_IMPORT_ASYNC_BYTES', None)
+        if _async_param(request) or (threshold and upload.size > threshold):
+            params = {'format': fmt, 'date_format': date_format, 'size': upload.size, 'filename': upload.name}
+            # Trabajo y trozos en la misma transacción: el worker no ve el
+            # trabajo hasta que el archivo está completo
+            with transaction.atomic():
+                job = report_jobs.enqueue(request.user, 'import_statement', params, max_attempts=2)
+                for seq, chunk in enumerate(upload.chunks(IMPORT_CHUNK_BYTES)):
+                    ImportChunk.objects.create(job=job, seq=seq, data=chunk)
+            return _job_accepted(request, job)
+
+        try:
+            summary = report_imports.import_statement(request.user, upload.chunks(IMPORT_CHUNK_BYTES), fmt, date_format)
+        except report_imports.StatementError as exc:
+            raise ValidationError({'file': str(exc)})
+        return Response(summary, status=status.HTTP_201_CREATED)
+
+
+class ReportCacheStatsView(APIView):
+    # Hit/miss counters of the report cache (admins only)
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary='Estadísticas de caché de reportes',
+        tags=['Reportes'],
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'hits': 120, 'misses': 30, 'hit_ratio': 0.8
+        }})}
+    )
+    def get(self, request):
+        """Contadores de aciertos/fallos de la caché de reportes."""
+        return Response(report_cache.stats())
+
+
+class SyncView(ConditionalGetMixin, APIView):
+    # Changes since a sync token (offline clients); 304 if nothing changed
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Sincronización incremental',
+        tags=['Sync'],
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Token de la sincronización anterior (0 o vacío = todo)'),
+        ],
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'token': 42,
+            'since': 40,
+            'reset': False,
+            'changes': {'ingresos_extra': [{'id': 7, 'name': 'Freelance', 'quantity': '200.00'}],
+                        'egresos_extra': []},
+            'deleted': {'ingresos_extra': [], 'egresos_extra': [3]},
+        }})}
+    )
+    def get(self, request):
+        """
+        Devuelve solo lo creado o modificado (`changes`) y los ids borrados
+        (`deleted`) desde `since`, por recurso, más el `token` para la
+        próxima llamada. Un token desconocido (mayor que el actual) devuelve
+        todo con `reset: true`: el cliente debe reemplazar sus datos.
+        """
+        try:
+            since = int(request.query_params.get('since') or 0)
+        except ValueError:
+            raise ValidationError({'since': 'Debe ser un entero.'})
+        if since < 0:
+            raise ValidationError({'since': 'Debe ser >= 0.'})
+        # La versión se lee antes que los cambios: lo que se escriba mientras
+        # tanto llega ahora y otra vez en la próxima llamada, nunca se pierde
+        token = getattr(request, 'data_version', None)  # Set by ConditionalGetMixin
+        if token is None:
+            token = tracking.get_version(request.user.pk)
+        reset = since > token
+        if reset:
+            since = 0
+        changes, deleted = report_sync.changes(request.user, since, serializers=RESOURCE_SERIALIZERS)
+        return Response({'token': token, 'since': since, 'reset': reset, 'changes': changes, 'deleted': deleted})
+
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+
+class SearchView(ConditionalGetMixin, APIView):
+    # Ranked full-text search over name/reason of the user's records
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Buscar movimientos',
+        tags=['Búsqueda'],
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description='Palabras a buscar en nombre y motivo (prefijos, sin distinguir acentos)'),
+            openapi.Parameter('types', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='Separados por coma: ' + ', '.join(report_search.MODELS)),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f'Máximo de resultados (1-{SEARCH_MAX_LIMIT}, por defecto {SEARCH_DEFAULT_LIMIT})'),
+        ],
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'q': 'cafe',
+            'results': [{'type': 'egresos_extra', 'id': 12, 'score': 3.1,
+                         'record': {'id': 12, 'name': 'Café', 'reason': 'Desayuno', 'quantity': '3.50'}}],
+        }})}
+    )
+    def get(self, request):
+        """
+        Registros (ingresos, egresos, ahorros y préstamos) cuyo nombre o
+        motivo contiene todas las palabras de q, del más al menos relevante.
+        """
+        q = request.query_params.get('q', '').strip()
+        if not report_search.terms(q):
+            raise ValidationError({'q': 'Indica al menos una palabra.'})
+        types = [t.strip() for t in request.query_params.get('types', '').split(',') if t.strip()]
+        unknown = set(types) - set(report_search.MODELS)
+        if unknown:
+            raise ValidationError({'types': f'Tipos desconocidos: {", ".join(sorted(unknown))}.'})
+        try:
+            limit = int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Debe ser un entero.'})
+        if not 1 <= limit <= SEARCH_MAX_LIMIT:
+            raise ValidationError({'limit': f'Debe estar entre 1 y {SEARCH_MAX_LIMIT}.'})
+        hits = report_search.search(request.user, q, types=types or None, limit=limit)
+        return Response({'q': q, 'results': report_search.records(hits, RESOURCE_SERIALIZERS)})
+
+
+LEDGER_DEFAULT_SIZE = 50
+LEDGER_MAX_SIZE = 500
+
+
+class LedgerView(ConditionalGetMixin, APIView):
+    # Ingresos extra, egresos extra and ahorro movements in one date-ordered, cursor-paginated list
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Libro de movimientos',
+        tags=['Reportes'],
+        manual_parameters=[
+            openapi.Parameter('types', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='Separados por coma: ' + ', '.join(report_ledger.MODELS)),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f'Movimientos por página (1-{LEDGER_MAX_SIZE}, por defecto {LEDGER_DEFAULT_SIZE})'),
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='Cursor de la página siguiente (campo `next`)'),
+        ],
+        responses={200: openapi.Response('OK', examples={'application/json': {
+            'next': 'http://localhost:8000/api/ledger/?page_size=50&cursor=WyIyMDI1LTA4LTAxIiwxLDQyXQ',
+            'results': [{'type': 'egresos_extra', 'id': 42, 'date': '2025-08-01',
+                         'record': {'id': 42, 'name': 'Supermercado', 'reason': 'Compra', 'quantity': '35.20'}}],
+        }})}
+    )
+    def get(self, request):
+        """
+        Ingresos extra, egresos extra y movimientos de ahorros del usuario,
+        del más reciente al más antiguo, en páginas con cursor.
+        """
+        types = [t.strip() for t in request.query_params.get('types', '').split(',') if t.strip()]
+        unknown = set(types) - set(report_ledger.MODELS)
+        if unknown:
+            raise ValidationError({'types': f'Tipos desconocidos: {", ".join(sorted(unknown))}.'})
+        try:
+            size = int(request.query_params.get('page_size', LEDGER_DEFAULT_SIZE))
+        except ValueError:
+            raise ValidationError({'page_size': 'Debe ser un entero.'})
+        if not 1 <= size <= LEDGER_MAX_SIZE:
+            raise ValidationError({'page_size': f'Debe estar entre 1 y {LEDGER_MAX_SIZE}.'})
+        position = None
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                position = report_ledger.parse_position(cursor_values(cursor))
+            except (NotFound, TypeError, ValueError):
+                # 400 y no 404: el recurso existe, lo que no vale es el parámetro
+                raise ValidationError({'cursor': 'Cursor inválido.'})
+
+        items, following = report_ledger.page(request.user, RESOURCE_SERIALIZERS, position, size, types or None)
+        next_url = None
+        if following is not None:
+            next_url = replace_query_param(request.build_absolute_uri(), 'page_size', size)
+            next_url = replace_query_param(next_url, 'cursor', encode_cursor(following))
+        return Response({'next': next_url, 'results': items})
+
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _ensure_search_index(sender, using='default', **kwargs):
+    from reports import search
+    search.ensure_index(using)
+
+
+class ReportsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reports'
+
+    def ready(self):
+        # Triggers del índice de búsqueda (SQLite) tras cualquier migración
+        post_migrate.connect(_ensure_search_index, sender=self)
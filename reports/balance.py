@@ -0,0 +1,88 @@
+# reports/balance.py
+"""
+Saldo acumulado (ingresos extra - egresos extra) a lo largo del tiempo.
+
+La base de datos agrupa el neto por día y calcula la suma acumulada con una
+función de ventana (`SUM(...) OVER (ORDER BY day)`), así que solo viaja una
+fila por día con movimientos. Si el motor no soporta ventanas (SQLite < 3.25)
+se pide el neto diario y la suma acumulada se hace en Python.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import connection
+
+from ingresos.models import IngresosExtra
+from egresos.models import EgresosExtra
+from reports.engine import ReportQuery
+
+# (modelo, signo) de cada fuente del saldo
+SOURCES = ((IngresosExtra, 1), (EgresosExtra, -1))
+
+OPENING_QUERY = ReportQuery(['ingresos_extra', 'egresos_extra'])
+
+
+def _daily_net_sql(owner_id, start, end, window):
+    qn = connection.ops.quote_name
+    parts, params = [], []
+    for model, sign in SOURCES:
+        date_col = qn(model._meta.get_field('date').column)
+        amount_col = qn(model._meta.get_field('quantity').column)
+        owner_col = qn(model._meta.get_field('owner').column)
+        where = [f'{owner_col} = %s']
+        params.append(owner_id)
+        if start:
+            where.append(f'{date_col} >= %s')
+            params.append(start)
+        if end:
+            where.append(f'{date_col} <= %s')
+            params.append(end)
+        amount = amount_col if sign > 0 else f'-{amount_col}'
+        parts.append(
+            f'SELECT {date_col} AS day, {amount} AS amount '
+            f'FROM {qn(model._meta.db_table)} WHERE {" AND ".join(where)}'
+        )
+    value = 'SUM(SUM(amount)) OVER (ORDER BY day ROWS UNBOUNDED PRECEDING)' if window else 'SUM(amount)'
+    sql = f'SELECT day, {value} FROM ({" UNION ALL ".join(parts)}) movements GROUP BY day ORDER BY day'
+    return sql, params
+
+
+def opening_balance(owner, start) -> float:
+    """Saldo acumulado hasta el día anterior a `start` (desde los rollups)."""
+    if not start:
+        return 0.0
+    totals = OPENING_QUERY.totals(owner, None, start - timedelta(days=1))
+    return float(totals['ingresos_extra'] - totals['egresos_extra'])
+
+
+def running_balance(owner, start=None, end=None, window=None):
+    """
+    `(días, saldo, saldo_inicial)`: arreglos NumPy con un punto por día con
+    movimientos y el saldo al cierre de ese día (incluye el saldo previo a
+    `start`, que se devuelve aparte).
+    `window=None` decide según el motor; True/False fuerza una variante.
+    """
+    if window is None:
+        window = connection.features.supports_over_clause
+    sql, params = _daily_net_sql(owner.pk, start, end, window)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    days = np.array([row[0] for row in rows], dtype='datetime64[D]')
+    values = np.fromiter((float(row[1] or 0) for row in rows), dtype='float64', count=len(rows))
+    if not window:
+        values = np.cumsum(values)
+    opening = opening_balance(owner, start)
+    return days, values + opening, opening
+
+
+def downsample(days, values, max_points):
+    """
+    Reduce la serie a `max_points` puntos: se parte en tramos contiguos y se
+    conserva el último punto de cada uno (el saldo real al cierre del tramo).
+    """
+    if len(days) <= max_points:
+        return days, values
+    idx = np.ceil(np.linspace(0, len(days), max_points + 1)[1:]).astype('int64') - 1
+    return days[idx], values[idx]
@@ -0,0 +1,497 @@
+# reports/benchmarks.py
+"""
+Escenarios de `python manage.py benchmark <escenario>`.
+
+Cada escenario recibe (stdout, rows, repeat), genera sus datos sintéticos en
+la base de pruebas que crea el comando e imprime una tabla de resultados.
+"""
+import io
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from users.models import User
+from ingresos.models import IngresosFijos, IngresosExtra
+from ingresos.api.views import IngresosFijosApiViewSet, IngresosExtraApiViewSet
+from ingresos.api.serializers import IngresosExtraSerializer
+from ahorros.api.serializers import AhorroMovimientoSerializer
+from ahorros.models import Ahorros, AhorroMovimiento
+from ahorros import forecast as ahorros_forecast
+from ahorros import reconcile as ahorros_reconcile
+from egresos.models import EgresosExtra
+from reports.api import fastlist
+from reports.api.views import RESOURCE_SERIALIZERS
+from reports.api.pagination import encode_cursor, keyset_before
+from reports.api.renderers import FastJSONParser, FastJSONRenderer
+from reports import export as report_export
+from reports import ledger as report_ledger
+from reports import middleware as compression
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+def make_user(email='bench@example.com'):
+    return User.objects.create_user(email=email, password='bench-pass')
+
+
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def seed_dated(model, user, n, per_day=3, batch=5000):
+    """Inserta `n` filas con fecha (varias por día, hacia atrás desde hoy)."""
+    today = date.today()
+    objs = []
+    for i in range(n):
+        objs.append(model(
+            owner=user, name=f'row {i}', reason='benchmark',
+            quantity=Decimal(i % 997) + Decimal('0.50'),
+            date=today - timedelta(days=i // per_day),
+        ))
+        if len(objs) >= batch:
+            model.objects.bulk_create(objs)
+            objs = []
+    model.objects.bulk_create(objs)
+
+
+def timed(fn, repeat):
+    """Mediana en milisegundos de `repeat` ejecuciones de `fn`."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+@scenario('pagination')
+def bench_pagination(out, rows, repeat):
+    """Latencia de la página N: cursor (date, id) frente a OFFSET."""
+    rows = rows or 200_000
+    page_size = 50
+    user = make_user()
+    seed_dated(IngresosExtra, user, rows)
+    client = api_client(user)
+    ordered = IngresosExtra.objects.filter(owner=user).order_by('-date', '-id')
+
+    out.write(f'IngresosExtra: {rows} rows, page_size={page_size}, median of {repeat} (ms)')
+    out.write(f'{"page":>8} {"api cursor":>11} {"sql keyset":>11} {"sql offset":>11}')
+    last_page = rows // page_size - 1
+    for page in sorted({0, 10, 100, 1000, last_page // 2, last_page}):
+        if page > last_page:
+            continue
+        offset = page * page_size
+        url = f'/api/IngresosExtra/?page_size={page_size}'
+        keyset = ordered
+        if offset:
+            day, pk = ordered.values_list('date', 'id')[offset - 1]
+            url += '&cursor=' + encode_cursor((day, pk))
+            keyset = ordered.filter(keyset_before('date', day, pk))
+
+        def fetch_api():
+            response = client.get(url)
+            assert response.status_code == 200 and len(response.data['results']) == page_size
+
+        def fetch_keyset():
+            assert len(list(keyset[:page_size])) == page_size
+
+        def fetch_offset():
+            assert len(list(ordered[offset:offset + page_size])) == page_size
+
+        out.write(f'{page:>8} {timed(fetch_api, repeat):>11.2f} {timed(fetch_keyset, repeat):>11.2f} {timed(fetch_offset, repeat):>11.2f}')
+
+
+@scenario('export')
+def bench_export(out, rows, repeat):
+    """Memoria pico de /api/export/transactions.{csv,xlsx} según el número de filas."""
+    rows = rows or 1_000_000
+    user = make_user()
+    client = api_client(user)
+    out.write(f'Export: peak traced memory while streaming the whole response (tracemalloc)')
+    out.write(f'{"rows":>10} {"format":>6} {"MB out":>8} {"seconds":>8} {"peak MB":>8}')
+    seeded = 0
+    for target in sorted({rows // 100, rows // 10, rows}):
+        # Mitad ingresos, mitad egresos extra
+        missing = target - seeded
+        seed_dated(IngresosExtra, user, missing // 2)
+        seed_dated(EgresosExtra, user, missing - missing // 2)
+        seeded = target
+        for fmt in ('csv', 'xlsx'):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            response = client.get(f'/api/export/transactions.{fmt}')
+            size = sum(len(chunk) for chunk in response.streaming_content)
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            out.write(f'{target:>10} {fmt:>6} {size / 2**20:>8.1f} {elapsed:>8.2f} {peak / 2**20:>8.2f}')
+
+
+@scenario('bulk')
+def bench_bulk(out, rows, repeat):
+    """Alta/edición/borrado de `rows` ingresos extra: /bulk/ frente a una petición por fila."""
+    rows = rows or 10_000
+    today = date.today()
+    items = [
+        {'name': f'row {i}', 'reason': 'benchmark', 'quantity': f'{i % 997}.50',
+         'date': (today - timedelta(days=i // 3)).isoformat()}
+        for i in range(rows)
+    ]
+    out.write(f'IngresosExtra: {rows} rows (seconds, rows/s)')
+    out.write(f'{"operation":>10} {"one-by-one":>18} {"bulk":>18}')
+
+    def run(user, fn):
+        t0 = time.perf_counter()
+        fn(api_client(user))
+        elapsed = time.perf_counter() - t0
+        return f'{elapsed:>8.2f} {rows / elapsed:>9.0f}'
+
+    single, bulk = make_user('single@example.com'), make_user('bulk@example.com')
+    url = '/api/IngresosExtra/'
+
+    def create_single(client):
+        for item in items:
+            assert client.post(url, item, format='json').status_code == 201
+
+    def create_bulk(client):
+        assert client.post(url + 'bulk/', items, format='json').status_code == 201
+
+    out.write(f'{"create":>10} {run(single, create_single):>18} {run(bulk, create_bulk):>18}')
+
+    def ids(user):
+        return list(IngresosExtra.objects.filter(owner=user).values_list('id', flat=True))
+
+    def update_single(client):
+        for pk in ids(single):
+            assert client.patch(f'{url}{pk}/', {'quantity': '1.00'}, format='json').status_code == 200
+
+    def update_bulk(client):
+        body = [{'id': pk, 'quantity': '1.00'} for pk in ids(bulk)]
+        assert client.patch(url + 'bulk/', body, format='json').status_code == 200
+
+    out.write(f'{"update":>10} {run(single, update_single):>18} {run(bulk, update_bulk):>18}')
+
+    def delete_single(client):
+        for pk in ids(single):
+            assert client.delete(f'{url}{pk}/').status_code == 204
+
+    def delete_bulk(client):
+        assert client.delete(url + 'bulk/', ids(bulk), format='json').status_code == 204
+
+    out.write(f'{"delete":>10} {run(single, delete_single):>18} {run(bulk, delete_bulk):>18}')
+
+
+SEARCH_WORDS = (
+    'supermercado', 'farmacia', 'gasolina', 'restaurante', 'café', 'alquiler', 'luz', 'agua', 'internet',
+    'teléfono', 'cine', 'libros', 'ropa', 'regalo', 'taxi', 'bus', 'gimnasio', 'médico', 'colegio', 'seguro',
+    'panadería', 'mercado', 'viaje', 'hotel', 'vuelo', 'mascota', 'veterinario', 'reparación', 'muebles', 'música',
+)
+
+
+@scenario('search')
+def bench_search(out, rows, repeat):
+    """Latencia de /api/search/ (índice FTS) frente a icontains sobre un usuario con `rows` egresos."""
+    rows = rows or 1_000_000
+    user = make_user()
+    make_user('other@example.com')
+    today = date.today()
+    words = len(SEARCH_WORDS)
+    objs = []
+    for i in range(rows):
+        # Nombre con dos palabras del vocabulario; una de cada ~50k filas lleva una palabra rara
+        name = f'{SEARCH_WORDS[i % words]} {SEARCH_WORDS[(i * 7 + 3) % words]}'
+        reason = f'pago {i}' if i % 50_000 else f'pago {i} aniversario'
+        objs.append(EgresosExtra(owner=user, name=name, reason=reason, quantity=Decimal('1.00'),
+                                 date=today - timedelta(days=i % 3650)))
+        if len(objs) >= 5000:
+            EgresosExtra.objects.bulk_create(objs)
+            objs = []
+    EgresosExtra.objects.bulk_create(objs)
+    client = api_client(user)
+    records = EgresosExtra.objects.filter(owner=user)
+
+    out.write(f'EgresosExtra: {rows} rows, limit=20, median of {repeat} (ms)')
+    out.write(f'{"query":>22} {"hits<=100":>9} {"api search":>11} {"icontains":>11}')
+    for query in ('aniversario', 'farmacia', 'cafe gimnasio', 'farm'):
+        def fetch_api():
+            assert client.get('/api/search/', {'q': query}).status_code == 200
+
+        def fetch_scan():
+            scan = records
+            for word in query.split():
+                scan = scan.filter(Q(name__icontains=word) | Q(reason__icontains=word))
+            list(scan[:20])
+
+        count = len(client.get('/api/search/', {'q': query, 'limit': 100}).data['results'])
+        out.write(f'{query:>22} {count:>9} {timed(fetch_api, repeat):>11.2f} {timed(fetch_scan, repeat):>11.2f}')
+
+
+@scenario('list')
+def bench_list(out, rows, repeat):
+    """Filas/s de los listados completos: serializer de DRF frente al modo rápido (values_list + codificador)."""
+    rows = rows or 100_000
+    user = make_user()
+    seed_dated(IngresosExtra, user, rows)
+    IngresosFijos.objects.bulk_create([
+        IngresosFijos(owner=user, name=f'row {i}', reason='benchmark', quantity=Decimal(i % 997) + Decimal('0.50'))
+        for i in range(rows)
+    ], batch_size=5000)
+    ahorro = Ahorros.objects.create(owner=user, name='meta', reason='benchmark', quantity=Decimal('1000000'),
+                                    payment=Decimal('10'))
+    today = date.today()
+    AhorroMovimiento.objects.bulk_create([
+        AhorroMovimiento(owner=user, ahorro=ahorro, amount=Decimal('10.00'), date=today - timedelta(days=i // 3))
+        for i in range(rows)
+    ], batch_size=5000)
+    client = api_client(user)
+    viewsets = (IngresosExtraApiViewSet, IngresosFijosApiViewSet)
+
+    def fetch(url):
+        def run():
+            response = client.get(url)
+            assert response.status_code == 200
+            return response.content
+        return run
+
+    out.write(f'{rows} rows per list, median of {repeat} (seconds, rows/s); whole request incl. JSON rendering')
+    out.write(f'{"endpoint":>30} {"serializer":>18} {"fast":>18} {"same bytes":>10}')
+    for url in ('/api/IngresosExtra/', '/api/IngresosFijos/'):
+        for viewset in viewsets:
+            viewset.fast_list = False
+        slow_body = fetch(url)()
+        slow = timed(fetch(url), repeat) / 1000
+        for viewset in viewsets:
+            viewset.fast_list = True
+        same = fetch(url)() == slow_body
+        fast = timed(fetch(url), repeat) / 1000
+        out.write(f'{url:>30} {slow:>8.2f} {rows / slow:>9.0f} {fast:>8.2f} {rows / fast:>9.0f} {str(same):>10}')
+
+    # Movimientos: el endpoint ya usa el modo rápido; se compara contra el serializer directo
+    movimientos = ahorro.movimientos.all()
+    columns, encode = fastlist.compile_encoder(AhorroMovimientoSerializer).bind()
+    slow = timed(lambda: AhorroMovimientoSerializer(movimientos.select_related('owner'), many=True).data, repeat) / 1000
+    fast = timed(lambda: [encode(row) for row in movimientos.values_list(*columns)], repeat) / 1000
+    out.write(f'{"movimientos (no rendering)":>30} {slow:>8.2f} {rows / slow:>9.0f} {fast:>8.2f} {rows / fast:>9.0f} {"-":>10}')
+
+    # Solo la codificación, con las filas ya leídas de la base
+    instances = list(IngresosExtra.objects.filter(owner=user).select_related('owner'))
+    columns, encode = fastlist.compile_encoder(IngresosExtraSerializer).bind({'owner': user})
+    tuples = list(IngresosExtra.objects.filter(owner=user).values_list(*columns))
+    slow = timed(lambda: IngresosExtraSerializer(instances, many=True).data, repeat) / 1000
+    fast = timed(lambda: [encode(row) for row in tuples], repeat) / 1000
+    out.write(f'{"encode only (IngresosExtra)":>30} {slow:>8.2f} {rows / slow:>9.0f} {fast:>8.2f} {rows / fast:>9.0f} {"-":>10}')
+
+
+@scenario('json')
+def bench_json(out, rows, repeat):
+    """Render/parse de los payloads más grandes: JSONRenderer de DRF (stdlib) frente a FastJSONRenderer (orjson)."""
+    rows = rows or 100_000
+    user = make_user()
+    seed_dated(IngresosExtra, user, rows // 2)
+    seed_dated(EgresosExtra, user, rows - rows // 2)
+    client = api_client(user)
+    payloads = {
+        '/api/IngresosExtra/': client.get('/api/IngresosExtra/').data,
+        '/api/EgresosExtra/?page_size=500': client.get('/api/EgresosExtra/', {'page_size': 500}).data,
+        '/api/sync/': client.get('/api/sync/').data,
+    }
+    stdlib, fast = JSONRenderer(), FastJSONRenderer()
+
+    out.write(f'Render only, median of {repeat} (ms)')
+    out.write(f'{"payload":>34} {"MB":>6} {"stdlib":>9} {"orjson":>9} {"speedup":>8} {"same bytes":>10}')
+    for name, data in payloads.items():
+        body = stdlib.render(data)
+        same = fast.render(data) == body
+        slow_ms = timed(lambda: stdlib.render(data), repeat)
+        fast_ms = timed(lambda: fast.render(data), repeat)
+        out.write(f'{name:>34} {len(body) / 2**20:>6.1f} {slow_ms:>9.1f} {fast_ms:>9.1f} '
+                  f'{slow_ms / fast_ms:>7.1f}x {str(same):>10}')
+
+    # Cuerpo de un alta masiva con 10k elementos
+    body = stdlib.render([{'name': f'row {i}', 'reason': 'benchmark', 'quantity': f'{i % 997}.50',
+                           'date': '2025-01-01'} for i in range(10_000)])
+    slow_ms = timed(lambda: JSONParser().parse(io.BytesIO(body)), repeat)
+    fast_ms = timed(lambda: FastJSONParser().parse(io.BytesIO(body)), repeat)
+    same = JSONParser().parse(io.BytesIO(body)) == FastJSONParser().parse(io.BytesIO(body))
+    out.write(f'{"parse bulk body (10k items)":>34} {len(body) / 2**20:>6.1f} {slow_ms:>9.1f} {fast_ms:>9.1f} '
+              f'{slow_ms / fast_ms:>7.1f}x {str(same):>10}')
+
+
+@scenario('compression')
+def bench_compression(out, rows, repeat):
+    """Bytes ahorrados y CPU de CompressionMiddleware según el tamaño de la respuesta."""
+    rows = rows or 50_000
+    user = make_user()
+    seed_dated(IngresosExtra, user, rows)
+    client = api_client(user)
+    middleware = compression.CompressionMiddleware(lambda request: None)
+    encodings = ['gzip'] + (['br'] if compression.brotli is not None else [])
+    listed = client.get('/api/IngresosExtra/').data
+    bodies = [(f'list {n} rows', FastJSONRenderer().render(listed[:n])) for n in sorted({1, 10, 50, 500, 5000, rows})]
+    bodies.append(('/schema/ (OpenAPI)', client.get('/schema/').content))
+
+    out.write(f'Per response, median of {repeat} (brotli {"on" if "br" in encodings else "not installed"})')
+    out.write(f'{"response":>22} {"encoding":>8} {"bytes":>10} {"compressed":>10} {"saved":>6} {"ms":>8} {"MB/s":>7}')
+    for name, body in bodies:
+        for encoding in encodings:
+            request = RequestFactory().get('/api/IngresosExtra/', HTTP_ACCEPT_ENCODING=encoding)
+
+            def run():
+                return middleware.process_response(request, HttpResponse(body, content_type='application/json'))
+            size = len(run().content)
+            ms = timed(run, repeat)
+            saved = 1 - size / len(body)
+            out.write(f'{name:>22} {encoding:>8} {len(body):>10} {size:>10} {saved:>6.0%} {ms:>8.2f} '
+                      f'{len(body) / 2**20 / (ms / 1000):>7.0f}')
+
+    out.write(f'Streaming /api/export/transactions.csv ({rows} rows), seconds for the whole body')
+    for encoding in [None] + encodings:
+        request = RequestFactory().get('/api/export/transactions.csv', HTTP_ACCEPT_ENCODING=encoding or 'identity')
+        t0 = time.perf_counter()
+        response = middleware.process_response(request, StreamingHttpResponse(
+            report_export.csv_chunks(user), content_type='text/csv; charset=utf-8'))
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        out.write(f'{encoding or "identity":>22} {size:>10} bytes {time.perf_counter() - t0:>8.2f} s')
+
+
+@scenario('ledger')
+def bench_ledger(out, rows, repeat):
+    """Latencia de la página N de /api/ledger/ (merge de cursores) frente a leer y ordenar las tres fuentes."""
+    rows = rows or 1_000_000
+    page_size = 50
+    user = make_user()
+    per_source = rows // 3
+    seed_dated(IngresosExtra, user, per_source)
+    seed_dated(EgresosExtra, user, per_source, per_day=2)
+    ahorro = Ahorros.objects.create(owner=user, name='meta', reason='benchmark', quantity=Decimal('1000000'),
+                                    payment=Decimal('10'))
+    today = date.today()
+    AhorroMovimiento.objects.bulk_create([
+        AhorroMovimiento(owner=user, ahorro=ahorro, amount=Decimal('10.00'), date=today - timedelta(days=i // 4))
+        for i in range(rows - 2 * per_source)
+    ], batch_size=5000)
+    client = api_client(user)
+
+    # Posición del comienzo de cada página, recorriendo el libro completo una vez
+    positions, position, page = {}, None, 0
+    last_page = rows // page_size - 1
+    wanted = {0, 10, 100, 1000, last_page // 2, last_page}
+    while True:
+        if page in wanted:
+            positions[page] = position
+        items, position = report_ledger.page(user, RESOURCE_SERIALIZERS, position, page_size)
+        page += 1
+        if position is None or page > max(wanted):
+            break
+
+    def merge_all():
+        # Lo que hacía el cliente: pedir las tres listas completas y ordenarlas
+        merged = []
+        for url in ('/api/IngresosExtra/', '/api/EgresosExtra/', f'/api/ahorros/{ahorro.pk}/movimientos/'):
+            merged.extend(client.get(url).data)
+        merged.sort(key=lambda item: (item['date'], item['id']), reverse=True)
+
+    out.write(f'{rows} rows in 3 sources, page_size={page_size}, median of {repeat} (ms)')
+    out.write(f'{"page":>8} {"api ledger":>11}')
+    for page, position in sorted(positions.items()):
+        params = {'page_size': page_size}
+        if position is not None:
+            params['cursor'] = encode_cursor(position)
+
+        def fetch():
+            response = client.get('/api/ledger/', params)
+            assert response.status_code == 200 and len(response.data['results']) == page_size
+
+        out.write(f'{page:>8} {timed(fetch, repeat):>11.2f}')
+    out.write(f'{"client-side merge of full lists":>31} {timed(merge_all, 1):>11.2f}')
+
+
+@scenario('reconcile')
+def bench_reconcile(out, rows, repeat):
+    """reconcile_ahorros: consultas agrupadas por tramo de usuarios frente a un bucle por ahorro."""
+    rows = rows or 1_000_000
+    users, goals = 200, 10
+    per_goal = max(1, rows // (users * goals))
+    # Sin create_user: el hash de contraseña de cada usuario dominaría la preparación
+    owners = User.objects.bulk_create([User(email=f'bench{u}@example.com') for u in range(users)])
+    ahorros = Ahorros.objects.bulk_create([
+        Ahorros(owner=owner, name=f'meta {g}', reason='benchmark', quantity=Decimal('100000'), payment=Decimal('10'))
+        for owner in owners for g in range(goals)
+    ], batch_size=5000)
+    batch = []
+    for ahorro in ahorros:
+        batch.extend(AhorroMovimiento(owner_id=ahorro.owner_id, ahorro=ahorro, amount=Decimal('10.25'))
+                     for _ in range(per_goal))
+        if len(batch) >= 50_000:
+            AhorroMovimiento.objects.bulk_create(batch, batch_size=5000)
+            batch = []
+    AhorroMovimiento.objects.bulk_create(batch, batch_size=5000)
+    total = len(ahorros) * per_goal
+
+    def corrupt():
+        # Todos desincronizados; 1 de cada 10 con accrued y missing correctos
+        Ahorros.objects.update(accrued=Decimal('0'), missing=Decimal('0'))
+        Ahorros.objects.filter(id__in=[a.pk for a in ahorros[::10]]).update(
+            accrued=Decimal('10.25') * per_goal, missing=Decimal('100000') - Decimal('10.25') * per_goal)
+
+    def per_object():
+        # Lo que haría un script ingenuo: una suma y un save() por ahorro
+        for ahorro in Ahorros.objects.all():
+            accrued = sum(ahorro.movimientos.values_list('amount', flat=True), Decimal(0))
+            missing = max(Decimal(0), ahorro.quantity - accrued)
+            if (ahorro.accrued, ahorro.missing) != (accrued, missing):
+                ahorro.accrued, ahorro.missing = accrued, missing
+                ahorro.save(update_fields=['accrued', 'missing'])
+
+    def set_based(dry_run):
+        return sum(len(ahorros_reconcile.reconcile_chunk(first, last, dry_run=dry_run))
+                   for first, last in ahorros_reconcile.owner_chunks(50))
+
+    out.write(f'{total} movements, {len(ahorros)} ahorros, {users} users (one process, ms)')
+    out.write(f'{"method":>20} {"ms":>10} {"movements/s":>12}')
+    for label, fn in (('per-object loop', per_object), ('grouped dry run', lambda: set_based(True)),
+                      ('grouped fix', lambda: set_based(False))):
+        corrupt()
+        t0 = time.perf_counter()
+        fn()
+        ms = (time.perf_counter() - t0) * 1000
+        out.write(f'{label:>20} {ms:>10.0f} {total / ms * 1000:>12.0f}')
+    assert set_based(True) == 0
+
+
+@scenario('forecast')
+def bench_forecast(out, rows, repeat):
+    """Pronóstico de metas de ahorro: una pasada vectorizada frente a una llamada por meta."""
+    rows = rows or 100_000
+    today = date.today()
+    periods = ['Semanal', 'Quincenal', 'Mensual', 'Trimestral', 'Anual']
+    goals = [
+        (i, Decimal(1000 + i % 5000), Decimal(i % 700), Decimal(10 + i % 90), periods[i % len(periods)],
+         today + timedelta(days=30 + i % 900) if i % 3 else None, today - timedelta(days=i % 60) if i % 4 else None)
+        for i in range(rows)
+    ]
+    vectorized = timed(lambda: ahorros_forecast.forecast(goals, today), repeat)
+    sample = goals[:max(1, rows // 100)]
+    per_goal = timed(lambda: [ahorros_forecast.forecast([goal], today) for goal in sample], repeat) * rows / len(sample)
+    out.write(f'{rows} goals, median of {repeat} (ms; per-goal extrapolated from {len(sample)})')
+    out.write(f'{"method":>12} {"ms":>10} {"goals/s":>12}')
+    for label, ms in (('vectorized', vectorized), ('per goal', per_goal)):
+        out.write(f'{label:>12} {ms:>10.1f} {rows / ms * 1000:>12.0f}')
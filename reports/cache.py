@@ -0,0 +1,89 @@
+# reports/cache.py
+from django.conf import settings
+from django.core.cache import caches
+
+from reports.tracking import get_version
+
+HITS_KEY = 'reports:stats:hits'
+MISSES_KEY = 'reports:stats:misses'
+
+
+def _cache():
+    return caches[getattr(settings, 'REPORTS_CACHE_ALIAS', 'default')]
+
+
+def _incr(key):
+    cache = _cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La clave expiró/fue desalojada entre add() e incr()
+        cache.set(key, 1, timeout=None)
+
+
+def _key(user, endpoint, params, version):
+    if version is None:
+        version = get_version(user.pk)
+    return 'reports:%s:%s:v%s:%s' % (endpoint, user.pk, version, ':'.join(str(p) for p in params))
+
+
+def peek(user, endpoint: str, params: tuple, version=None):
+    """El reporte cacheado para la versión vigente, o None (no calcula nada)."""
+    data = _cache().get(_key(user, endpoint, params, version))
+    if data is not None:
+        _incr(HITS_KEY)
+    return data
+
+
+def cached_report(user, endpoint: str, params: tuple, compute, version=None):
+    """
+    Devuelve `(data, hit)` para el reporte `endpoint` del usuario.
+    La clave incluye la versión de datos del usuario: cualquier escritura
+    (ver `tracking.record_write`) la sube y las entradas viejas dejan de leerse.
+    `version` evita volver a leerla si la petición ya la conoce.
+    """
+    key = _key(user, endpoint, params, version)
+    cache = _cache()
+    data = cache.get(key)
+    if data is not None:
+        _incr(HITS_KEY)
+        return data, True
+
+    data = compute()
+    cache.set(key, data, timeout=getattr(settings, 'REPORTS_CACHE_TIMEOUT', 300))
+    _incr(MISSES_KEY)
+    return data, False
+
+
+def cached_many(namespace: str, parts: dict, compute) -> dict:
+    """
+    Caché por elemento con clave de estado propia (no la versión del usuario).
+    `parts`: id -> tupla que identifica el estado del elemento (p. ej. su
+    último movimiento). Lee todas las claves de una vez, llama a
+    `compute(ids)` una sola vez con los que faltan (debe devolver
+    {id: datos}) y devuelve {id: datos} para todos.
+    """
+    cache = _cache()
+    keys = {pk: '%s:%s:%s' % (namespace, pk, ':'.join(str(p) for p in part)) for pk, part in parts.items()}
+    found = cache.get_many(list(keys.values()))
+    data = {pk: found[key] for pk, key in keys.items() if key in found}
+    missing = [pk for pk in keys if pk not in data]
+    if data:
+        _incr(HITS_KEY)
+    if missing:
+        computed = compute(missing)
+        cache.set_many({keys[pk]: computed[pk] for pk in missing},
+                       timeout=getattr(settings, 'REPORTS_CACHE_TIMEOUT', 300))
+        data.update(computed)
+        _incr(MISSES_KEY)
+    return data
+
+
+def stats() -> dict:
+    """Contadores de aciertos/fallos del proceso (o del backend compartido)."""
+    cache = _cache()
+    hits = cache.get(HITS_KEY) or 0
+    misses = cache.get(MISSES_KEY) or 0
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / total, 4) if total else None}
@@ -0,0 +1,153 @@
+# reports/engine.py
+"""
+Motor de agregación de los reportes.
+
+Una `ReportQuery` declara qué métricas necesita (ver reports.metrics.METRICS)
+y las calcula todas en UNA sola consulta: cada fuente aporta una rama
+`SELECT metric, bucket, SUM(x) ... GROUP BY ...` y las ramas se unen con
+UNION ALL. Las métricas con rollup leen los meses completos de
+MonthlyRollup y solo van a la tabla original para los bordes del rango.
+"""
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import TruncDay, TruncMonth, TruncQuarter, TruncWeek, TruncYear
+
+from reports.metrics import METRICS
+from reports.models import MonthlyRollup
+from reports.rollups import split_range
+
+NO_BUCKET = Value(None, output_field=models.DateField())
+
+# Funciones de truncado por granularidad (semanas ISO: empiezan en lunes)
+TRUNC = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+    'year': TruncYear,
+}
+# Granularidades que se pueden armar sumando meses del rollup
+ROLLUP_GRANULARITIES = (None, 'month', 'quarter', 'year')
+
+
+def _branch(queryset, metric, bucket, total):
+    # Todas las ramas del UNION tienen la misma forma: (metric, bucket, total)
+    return (
+        queryset.values(metric=metric, bucket=bucket)
+        .annotate(total=models.Sum(total))
+        .order_by()
+    )
+
+
+def _date_filter(field, ranges):
+    # OR de rangos cerrados [a, b]; extremos None = sin límite
+    q = Q(pk__in=[])
+    for a, b in ranges:
+        part = Q()
+        if a:
+            part &= Q(**{f'{field}__gte': a})
+        if b:
+            part &= Q(**{f'{field}__lte': b})
+        q |= part
+    return q
+
+
+class ReportQuery:
+    """
+    Conjunto de métricas que calcula un reporte.
+
+        ReportQuery(['ingresos_extra', 'egresos_extra'], granularity='month')
+            .run(user, start, end) -> {date(2025, 8, 1): {'ingresos_extra': Decimal, ...}, ...}
+
+    Sin `granularity` devuelve un único bucket `None` con los totales del
+    rango. Las métricas sin fecha van siempre en el bucket `None`. Con
+    `day`/`week` el rollup mensual no sirve y las métricas con fecha se
+    agrupan directamente sobre su tabla.
+    """
+    granularities = (None,) + tuple(TRUNC)
+
+    def __init__(self, metrics, granularity=None):
+        unknown = set(metrics) - set(METRICS)
+        if unknown:
+            raise ValueError(f'Métricas desconocidas: {sorted(unknown)}')
+        if granularity not in self.granularities:
+            raise ValueError(f'Granularidad no soportada: {granularity}')
+        self.metrics = list(metrics)
+        self.granularity = granularity
+
+    def bucket_expr(self, field):
+        if self.granularity:
+            return TRUNC[self.granularity](field, output_field=models.DateField())
+        return NO_BUCKET
+
+    def branches(self, owner, start=None, end=None):
+        """Querysets (uno por fuente) que forman el UNION ALL."""
+        lo, hi, edges = split_range(start, end)
+        undated, dated, raw = [], [], []
+        use_rollup = self.granularity in ROLLUP_GRANULARITIES
+        for name in self.metrics:
+            metric = METRICS[name]
+            if not metric.rollup or (metric.date_field and not use_rollup):
+                raw.append(name)
+            elif metric.date_field:
+                dated.append(name)
+            else:
+                undated.append(name)
+
+        branches = []
+
+        # 1) Rollup: métricas sin fecha + meses completos de las métricas con fecha
+        rollup_q = Q(category__in=undated, month__isnull=True)
+        if dated and not (lo and hi and lo > hi):
+            months = Q(category__in=dated, month__isnull=False)
+            if lo:
+                months &= Q(month__gte=lo)
+            if hi:
+                months &= Q(month__lte=hi)
+            rollup_q |= months
+        if undated or dated:
+            bucket = self.bucket_expr('month') if self.granularity else NO_BUCKET
+            rollup = MonthlyRollup.objects.filter(rollup_q, owner=owner, count__gt=0)
+            branches.append(_branch(rollup, F('category'), bucket, 'total'))
+
+        # 2) Bordes del rango (meses incompletos) desde la tabla original
+        for name in dated:
+            if edges:
+                metric = METRICS[name]
+                qs = metric.model.objects.filter(_date_filter(metric.date_field, edges), owner=owner)
+                branches.append(_branch(qs, Value(name), self.bucket_expr(metric.date_field), metric.field))
+
+        # 3) Métricas sin rollup: rango completo desde la tabla original
+        for name in raw:
+            metric = METRICS[name]
+            qs = metric.model.objects.filter(owner=owner)
+            if metric.date_field:
+                if start or end:
+                    qs = qs.filter(_date_filter(metric.date_field, [(start, end)]))
+                bucket = self.bucket_expr(metric.date_field)
+            else:
+                bucket = NO_BUCKET
+            branches.append(_branch(qs, Value(name), bucket, metric.field))
+        return branches
+
+    def run(self, owner, start=None, end=None) -> dict:
+        """`{bucket: {métrica: Decimal}}` en un solo viaje a la base de datos."""
+        branches = self.branches(owner, start, end)
+        out = {}
+        if not branches:
+            return out
+        query = branches[0].union(*branches[1:], all=True) if len(branches) > 1 else branches[0]
+        for row in query:
+            bucket = out.setdefault(row['bucket'], {})
+            bucket[row['metric']] = bucket.get(row['metric'], Decimal(0)) + (row['total'] or 0)
+        return out
+
+    def totals(self, owner, start=None, end=None) -> dict:
+        """Totales del rango por métrica (0 para las que no tienen datos)."""
+        merged = {name: Decimal(0) for name in self.metrics}
+        for values in self.run(owner, start, end).values():
+            for name, total in values.items():
+                merged[name] += total
+        return merged
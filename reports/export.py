@@ -0,0 +1,192 @@
+# reports/export.py
+"""
+Exportación de todos los movimientos de un usuario en CSV o XLSX.
+
+Todo es un generador: cada fuente se lee con `values_list().iterator()`
+(tuplas, sin instancias de modelo ni serializers) y las filas se escriben
+en bloques que van directo a un StreamingHttpResponse, así que la memoria
+no crece con el número de filas. El XLSX se arma a mano (zip de XML con
+cadenas en línea) sobre un zip en modo streaming.
+
+En el CSV, los textos que empiezan como una fórmula (`=`, `+`, `-`, `@`,
+tabulador o retorno) van precedidos de `'` para que la hoja de cálculo no
+los ejecute. En el XLSX son cadenas en línea y nunca se evalúan.
+"""
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from ingresos.models import IngresosFijos, IngresosExtra
+from egresos.models import EgresosFijos, EgresosExtra
+from ahorros.models import AhorroMovimiento
+from prestamos.models import Prestamos
+
+CHUNK_SIZE = 2000  # Filas por viaje a la base de datos
+FLUSH_ROWS = 500   # Filas por bloque enviado al cliente
+
+COLUMNS = ('tipo', 'id', 'fecha', 'nombre', 'motivo', 'monto', 'periodo', 'nota')
+
+# (tipo, modelo, {columna: campo}, orden). Las columnas que falten van vacías.
+SOURCES = (
+    ('ingreso_extra', IngresosExtra, {'fecha': 'date', 'nombre': 'name', 'motivo': 'reason', 'monto': 'quantity'}, ('date', 'id')),
+    ('egreso_extra', EgresosExtra, {'fecha': 'date', 'nombre': 'name', 'motivo': 'reason', 'monto': 'quantity'}, ('date', 'id')),
+    ('ingreso_fijo', IngresosFijos, {'fecha': 'date_start', 'nombre': 'name', 'motivo': 'reason', 'monto': 'quantity', 'periodo': 'period'}, ('id',)),
+    ('egreso_fijo', EgresosFijos, {'fecha': 'date_start', 'nombre': 'name', 'motivo': 'reason', 'monto': 'quantity', 'periodo': 'period'}, ('id',)),
+    ('ahorro_movimiento', AhorroMovimiento, {'fecha': 'date', 'nombre': 'ahorro__name', 'monto': 'amount', 'nota': 'note'}, ('date', 'id')),
+    ('prestamo', Prestamos, {'fecha': 'date_created', 'nombre': 'name', 'motivo': 'reason', 'monto': 'quantity', 'periodo': 'period', 'nota': 'status'}, ('id',)),
+)
+NUMERIC = {'id', 'monto'}
+
+_FORMULA_START = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _format(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def rows(owner):
+    """Genera una tupla por movimiento del usuario, en el orden de COLUMNS."""
+    for kind, model, mapping, ordering in SOURCES:
+        fields = ['id'] + list(mapping.values())
+        # Posición de cada columna en la tupla del queryset (None = vacía)
+        positions = [fields.index(mapping[c]) if c in mapping else (0 if c == 'id' else None) for c in COLUMNS[1:]]
+        queryset = model.objects.filter(owner=owner).order_by(*ordering).values_list(*fields)
+        for values in queryset.iterator(chunk_size=CHUNK_SIZE):
+            yield (kind,) + tuple('' if p is None else _format(values[p]) for p in positions)
+
+
+# ----------------------------------------------------------------- CSV
+
+_TEXT_AT = [i for i, c in enumerate(COLUMNS) if c not in NUMERIC]
+
+
+def csv_safe(row):
+    """`row` con los textos que parecen fórmulas neutralizados (los montos negativos quedan igual)."""
+    if not any(row[i].startswith(_FORMULA_START) for i in _TEXT_AT):
+        return row
+    row = list(row)
+    for i in _TEXT_AT:
+        if row[i].startswith(_FORMULA_START):
+            row[i] = "'" + row[i]
+    return row
+
+
+def csv_chunks(owner):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')  # BOM: Excel abre el UTF-8 con acentos correctos
+    writer.writerow(COLUMNS)
+    for i, row in enumerate(rows(owner), 1):
+        writer.writerow(csv_safe(row))
+        if i % FLUSH_ROWS == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+# ---------------------------------------------------------------- XLSX
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Movimientos" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+# Caracteres de control que XML 1.0 no admite
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_LETTERS = [chr(ord('A') + i) for i in range(len(COLUMNS))]
+_NUMERIC_AT = [c in NUMERIC for c in COLUMNS]
+
+
+class _Sink:
+    # Destino del zip: acumula lo escrito hasta que el generador lo entrega
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _xml_row(number, values, header=False):
+    cells = []
+    for letter, numeric, value in zip(_LETTERS, _NUMERIC_AT, values):
+        ref = f'{letter}{number}'
+        if value == '':
+            continue
+        if numeric and not header:
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(_ILLEGAL_XML.sub('', value))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def xlsx_chunks(owner):
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((_SHEET_HEAD + _xml_row(1, COLUMNS, header=True)).encode())
+            block = []
+            for number, row in enumerate(rows(owner), 2):
+                block.append(_xml_row(number, row))
+                if len(block) == FLUSH_ROWS:
+                    sheet.write(''.join(block).encode())
+                    block = []
+                    data = sink.drain()
+                    if data:  # El compresor puede no haber emitido nada aún
+                        yield data
+            sheet.write((''.join(block) + _SHEET_TAIL).encode())
+    yield sink.drain()
+
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', csv_chunks),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', xlsx_chunks),
+}
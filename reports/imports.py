@@ -0,0 +1,297 @@
+# reports/imports.py
+"""
+Importación de extractos bancarios (CSV u OFX) a IngresosExtra/EgresosExtra.
+
+El archivo llega como un iterable de trozos de bytes (el upload o los
+`ImportChunk` de un trabajo en segundo plano) y se procesa línea a línea:
+nunca se carga completo. Montos positivos -> ingreso, negativos -> egreso.
+Cada fila lleva un `import_hash` de (fecha, monto, nombre) con índice único
+por usuario, así que re-importar el mismo extracto (o uno que se solapa)
+no duplica movimientos. Se inserta con bulk_create por lotes, cada lote en
+su transacción junto con el delta de los rollups.
+"""
+import codecs
+import csv
+import hashlib
+import re
+import unicodedata
+from datetime import datetime
+from decimal import ROUND_DOWN, Decimal, InvalidOperation
+
+from django.db import transaction
+
+from ingresos.models import IngresosExtra
+from egresos.models import EgresosExtra
+from reports import rollups, tracking
+
+BATCH_SIZE = 1000
+MAX_ERRORS = 100  # Errores por línea que se devuelven (el resto solo se cuentan)
+DEFAULT_REASON = 'Importado de extracto bancario'
+
+FORMATS = ('csv', 'ofx')
+
+# Encabezados reconocidos (sin acentos, en minúsculas)
+DATE_HEADERS = {'fecha', 'date', 'fecha operacion', 'fecha valor', 'fecha movimiento', 'posted date', 'transaction date'}
+AMOUNT_HEADERS = {'monto', 'importe', 'cantidad', 'amount', 'valor'}
+CREDIT_HEADERS = {'abono', 'abonos', 'credito', 'ingreso', 'deposito', 'credit', 'deposit'}
+DEBIT_HEADERS = {'cargo', 'cargos', 'debito', 'egreso', 'retiro', 'debit', 'withdrawal'}
+NAME_HEADERS = {'descripcion', 'concepto', 'detalle', 'description', 'name', 'payee'}
+MEMO_HEADERS = {'referencia', 'nota', 'memo', 'notes', 'reference'}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%Y/%m/%d', '%d.%m.%Y')
+
+# Lo que cabe en `quantity` (max_digits=10, decimal_places=2)
+MAX_AMOUNT = Decimal('99999999.99')
+CENT = Decimal('0.01')
+
+
+class StatementError(ValueError):
+    """El archivo no se puede interpretar (formato o encabezados)."""
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode()
+    return ' '.join(text.lower().replace('_', ' ').split())
+
+
+# ------------------------------------------------------- bytes -> líneas
+
+def decode_lines(chunks):
+    """
+    Trozos de bytes -> líneas de texto (con su salto de línea), en streaming.
+    UTF-8 (con o sin BOM); si el primer trozo no es UTF-8 válido se usa
+    cp1252, habitual en los CSV de bancos.
+    """
+    chunks = iter(chunks)
+    first = next(chunks, b'')
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    try:
+        decoder.decode(first, final=False)
+        decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    except UnicodeDecodeError:
+        decoder = codecs.getincrementaldecoder('cp1252')(errors='replace')
+
+    pending = ''
+    for chunk in _chain(first, chunks):
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        # La última puede estar incompleta (o ser un '\r' cuyo '\n' viene después)
+        pending = lines.pop() if lines else ''
+        yield from lines
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+# ---------------------------------------------------------- valores
+
+def parse_amount(text):
+    """'1.234,56' / '1,234.56' / '-50' / '(50.00)' / '$ 12' -> Decimal."""
+    value = (text or '').strip()
+    negative = value.startswith('(') and value.endswith(')')
+    value = re.sub(r'[^\d,.\-]', '', value)
+    if value.endswith('-'):  # '50.00-' (algunos bancos)
+        value, negative = value[:-1], True
+    if ',' in value and '.' in value:
+        # El separador que aparece último es el decimal
+        if value.rfind(',') > value.rfind('.'):
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            value = value.replace(',', '')
+    elif ',' in value:
+        head, _, tail = value.rpartition(',')
+        value = f'{head.replace(",", "")}.{tail}' if len(tail) in (1, 2) else value.replace(',', '')
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'Monto inválido: {text!r}')
+    return check_amount(-amount if negative else amount, text)
+
+
+def check_amount(amount, text=None):
+    """Rechaza lo que no cabe en `quantity`: más de 2 decimales o más de 8 cifras enteras."""
+    shown = text if text is not None else str(amount)
+    if amount != amount.quantize(CENT, rounding=ROUND_DOWN):
+        raise ValueError(f'Monto con más de 2 decimales: {shown!r}')
+    if abs(amount) > MAX_AMOUNT:
+        raise ValueError(f'Monto fuera de rango: {shown!r}')
+    return amount
+
+
+def parse_day(text, date_format=None):
+    text = (text or '').strip()
+    for fmt in ((date_format,) if date_format else DATE_FORMATS):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Fecha inválida: {text!r}')
+
+
+# ------------------------------------------------------------ lectores
+
+def read_csv(lines, date_format=None):
+    """Genera `(línea, fecha, monto, nombre, nota)`; errores como `(línea, ValueError)`."""
+    lines = iter(lines)
+    first = next(lines, '')
+    try:
+        dialect = csv.Sniffer().sniff(first, delimiters=',;\t|')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(_chain(first, lines), dialect)
+    header = [_normalize(h) for h in next(reader, [])]
+
+    def column(names):
+        return next((i for i, h in enumerate(header) if h in names), None)
+
+    date_col, amount_col = column(DATE_HEADERS), column(AMOUNT_HEADERS)
+    credit_col, debit_col = column(CREDIT_HEADERS), column(DEBIT_HEADERS)
+    name_col, memo_col = column(NAME_HEADERS), column(MEMO_HEADERS)
+    if date_col is None or (amount_col is None and credit_col is None and debit_col is None):
+        raise StatementError('El CSV necesita columnas de fecha y de monto (o cargo/abono).')
+
+    def cell(row, i):
+        return row[i].strip() if i is not None and i < len(row) else ''
+
+    for row in reader:
+        line = reader.line_num
+        if not any(value.strip() for value in row):
+            continue
+        try:
+            day = parse_day(cell(row, date_col), date_format)
+            if amount_col is not None:
+                amount = parse_amount(cell(row, amount_col))
+            else:
+                credit, debit = cell(row, credit_col), cell(row, debit_col)
+                amount = check_amount((parse_amount(credit) if credit else Decimal(0))
+                                      - (abs(parse_amount(debit)) if debit else Decimal(0)))
+            yield line, day, amount, cell(row, name_col), cell(row, memo_col)
+        except ValueError as exc:
+            yield line, exc
+
+
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+
+
+def read_ofx(lines, date_format=None):
+    """OFX 1.x (SGML) y 2.x (XML): un movimiento por bloque <STMTTRN>."""
+    current, start_line = None, 0
+    for number, text in enumerate(lines, 1):
+        for closing, tag, value in _OFX_TAG.findall(text):
+            tag = tag.upper()
+            if tag == 'STMTTRN' and not closing:
+                current, start_line = {}, number
+            elif tag == 'STMTTRN' and closing and current is not None:
+                try:
+                    day = datetime.strptime(current.get('DTPOSTED', '')[:8], '%Y%m%d').date()
+                    amount = parse_amount(current.get('TRNAMT', ''))
+                    memo = current.get('MEMO', '')
+                    name = current.get('NAME') or current.get('PAYEE') or memo
+                    yield start_line, day, amount, name, memo if memo != name else ''
+                except ValueError as exc:
+                    yield start_line, ValueError(f'Movimiento OFX inválido: {exc}')
+                current = None
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+
+READERS = {'csv': read_csv, 'ofx': read_ofx}
+
+
+# ------------------------------------------------------------- importar
+
+def import_hash(day, amount, name, occurrence=0):
+    # La ocurrencia distingue movimientos idénticos dentro del mismo extracto
+    # (dos cafés iguales el mismo día) sin romper la deduplicación al re-importar
+    key = f'{day.isoformat()}|{abs(amount):.2f}|{_normalize(name)}|{occurrence}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _insert(owner, model, objs):
+    # Descarta lo ya importado antes (o repetido en el lote) y guarda el resto
+    hashes = {obj.import_hash for obj in objs}
+    with transaction.atomic():
+        # Una importación a la vez por usuario: lo que aparezca con estos hashes tras
+        # el bulk_create y no estaba antes es exactamente lo que insertó este lote
+        type(owner).objects.select_for_update().filter(pk=owner.pk).exists()
+        existing = set(model.objects.filter(owner=owner, import_hash__in=hashes).values_list('import_hash', flat=True))
+        fresh = [obj for obj in objs if obj.import_hash not in existing]
+        if not fresh:
+            return 0
+        # ignore_conflicts queda como red: un conflicto se omite en vez de abortar el lote
+        model.objects.bulk_create(fresh, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        # Con ignore_conflicts no vuelven los pk: las filas nuevas se vuelven a leer por hash,
+        # y el delta de los rollups sale de esas filas (no de los objetos que se intentaron)
+        inserted = list(model.objects.filter(owner=owner, import_hash__in=[obj.import_hash for obj in fresh]))
+        if inserted:
+            tracking.record_write(owner.pk, after=[c for obj in inserted for c in rollups.contributions(obj)],
+                                  changed=inserted)
+    return len(inserted)
+
+
+def import_statement(owner, chunks, fmt, date_format=None, total_bytes=None, progress=None) -> dict:
+    """
+    Importa el extracto `chunks` (iterable de bytes) del usuario.
+    `progress(porcentaje)` se llama tras cada lote si se conoce `total_bytes`.
+    Devuelve el resumen: ingresos/egresos creados, duplicados y errores.
+    """
+    if fmt not in READERS:
+        raise StatementError(f'Formato no soportado: {fmt}')
+    consumed = [0]
+
+    def counted(source):
+        for chunk in source:
+            consumed[0] += len(chunk)
+            yield bytes(chunk)
+
+    summary = {'ingresos': 0, 'egresos': 0, 'duplicados': 0, 'omitidos': 0, 'lineas': 0, 'errores': [], 'total_errores': 0}
+    batches = {IngresosExtra: [], EgresosExtra: []}
+    seen = {}
+
+    def flush(model):
+        objs = batches[model]
+        created = _insert(owner, model, objs)
+        summary['ingresos' if model is IngresosExtra else 'egresos'] += created
+        summary['duplicados'] += len(objs) - created
+        batches[model] = []
+        if progress and total_bytes:
+            progress(min(99, consumed[0] * 100 // total_bytes))
+
+    for item in READERS[fmt](decode_lines(counted(chunks)), date_format):
+        summary['lineas'] += 1
+        if isinstance(item[1], ValueError):
+            summary['total_errores'] += 1
+            if len(summary['errores']) < MAX_ERRORS:
+                summary['errores'].append({'linea': item[0], 'error': str(item[1])})
+            continue
+        _, day, amount, name, memo = item
+        if not amount:
+            summary['omitidos'] += 1
+            continue
+        name = (name or memo or 'Movimiento')[:255]
+        key = (day, abs(amount), _normalize(name), amount > 0)
+        occurrence = seen[key] = seen.get(key, -1) + 1
+        model = IngresosExtra if amount > 0 else EgresosExtra
+        batches[model].append(model(
+            owner=owner, name=name, reason=memo or DEFAULT_REASON, quantity=abs(amount), date=day,
+            import_hash=import_hash(day, amount, name, occurrence),
+        ))
+        if len(batches[model]) >= BATCH_SIZE:
+            flush(model)
+
+    for model in batches:
+        if batches[model]:
+            flush(model)
+    return summary
+
+
+def guess_format(filename, fmt=None):
+    if fmt:
+        return fmt.lower()
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    return 'ofx' if extension in ('ofx', 'qfx') else 'csv'
@@ -0,0 +1,226 @@
+# reports/jobs.py
+"""
+Cola de trabajos en segundo plano sobre la base de datos (sin broker).
+
+Las vistas encolan un `ReportJob` y responden al instante con su id; uno o
+varios `python manage.py runworker` toman los pendientes por prioridad,
+ejecutan el handler de su `kind` y guardan el resultado (JSON) o el error.
+Un fallo se reintenta con espera exponencial hasta `max_attempts`.
+
+Mientras ejecuta, el worker renueva `heartbeat_at` cada HEARTBEAT segundos
+desde un hilo aparte; un trabajo `running` sin latidos recientes es de un
+worker caído y `requeue_stale` lo devuelve a la cola. Cada reclamo es
+`(worker, attempts)`: el worker original, si sigue vivo pese a todo, ya no
+pisa el resultado de un trabajo re-encolado.
+"""
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.module_loading import import_string
+
+from reports import cache as report_cache
+from reports import imports, rollups, tracking
+from reports.models import ImportChunk, ReportJob
+
+RETRY_DELAY = 5  # Segundos antes del primer reintento (luego x2, x4...)
+HEARTBEAT = 30  # Segundos entre latidos del worker mientras ejecuta un trabajo
+
+HANDLERS = {}
+
+
+class PermanentJobError(Exception):
+    """Error que no se arregla reintentando (datos inválidos): falla sin reintentos."""
+
+
+def handler(kind):
+    """Registra `fn(job) -> resultado JSON` para los trabajos de tipo `kind`."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue(owner, kind, params=None, priority=0, max_attempts=3, reuse=False) -> ReportJob:
+    """
+    Crea un trabajo pendiente. Con `reuse=True` devuelve el trabajo idéntico
+    (mismo usuario, tipo y parámetros) que siga pendiente o en ejecución,
+    para que reintentar la misma petición no llene la cola.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f'Tipo de trabajo desconocido: {kind}')
+    if reuse:
+        active = ReportJob.objects.filter(owner=owner, kind=kind, params=params or {},
+                                          status__in=[ReportJob.PENDING, ReportJob.RUNNING])
+        job = active.order_by('id').first()
+        if job is not None:
+            return job
+    return ReportJob.objects.create(owner=owner, kind=kind, params=params or {},
+                                    priority=priority, max_attempts=max_attempts)
+
+
+def claim(worker=None):
+    """
+    Toma el siguiente trabajo pendiente (mayor prioridad, más antiguo) y lo
+    marca en ejecución. Con Postgres usa SELECT ... FOR UPDATE SKIP LOCKED;
+    en otros motores, un UPDATE condicionado al estado: si otro worker lo
+    tomó primero el UPDATE no afecta filas y se prueba con el siguiente.
+    """
+    now = timezone.now()
+    running = dict(status=ReportJob.RUNNING, worker=worker or worker_name(), started_at=now, heartbeat_at=now,
+                   attempts=F('attempts') + 1)
+    pending = (ReportJob.objects.filter(status=ReportJob.PENDING, run_after__lte=now)
+               .order_by('-priority', 'run_after', 'id'))
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pk = pending.select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+            if pk is None:
+                return None
+            ReportJob.objects.filter(pk=pk).update(**running)
+        return ReportJob.objects.select_related('owner').get(pk=pk)
+
+    for pk in pending.values_list('pk', flat=True)[:10]:
+        if ReportJob.objects.filter(pk=pk, status=ReportJob.PENDING).update(**running):
+            return ReportJob.objects.select_related('owner').get(pk=pk)
+    return None
+
+
+def _claimed(job):
+    # La fila mientras siga siendo de este reclamo (no re-encolada ni tomada por otro worker)
+    return ReportJob.objects.filter(pk=job.pk, status=ReportJob.RUNNING, worker=job.worker, attempts=job.attempts)
+
+
+def set_progress(job, progress):
+    """Avance 0-100 visible en /api/reports/jobs/{id}/ mientras corre (también cuenta como latido)."""
+    _claimed(job).update(progress=max(0, min(100, int(progress))), heartbeat_at=timezone.now())
+
+
+def heartbeat(job) -> bool:
+    """Renueva el latido del trabajo. False si ya no es de este worker."""
+    return bool(_claimed(job).update(heartbeat_at=timezone.now()))
+
+
+class _Heartbeat(threading.Thread):
+    # Latidos cada `interval` segundos hasta `stop()`, con su propia conexión
+    def __init__(self, job, interval):
+        super().__init__(name=f'heartbeat-{job.pk}', daemon=True)
+        self.job, self.interval, self.stopped = job, interval, threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    heartbeat(self.job)
+                except DatabaseError:
+                    pass  # Base ocupada (SQLite con el propio trabajo escribiendo): se reintenta en el siguiente
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def execute(job, interval=HEARTBEAT) -> bool:
+    """Ejecuta un trabajo ya reclamado. Devuelve True si terminó bien."""
+    jobs = _claimed(job)
+    fn = HANDLERS.get(job.kind)
+    beat = _Heartbeat(job, interval)
+    beat.start()
+    try:
+        if fn is None:
+            raise LookupError(f'Tipo de trabajo desconocido: {job.kind}')
+        result = fn(job)
+    except Exception as exc:
+        error = traceback.format_exc()
+        now = timezone.now()
+        retry = fn is not None and not isinstance(exc, PermanentJobError)
+        if retry and job.attempts < job.max_attempts:
+            delay = timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+            jobs.update(status=ReportJob.PENDING, run_after=now + delay, error=error)
+        else:
+            jobs.update(status=ReportJob.FAILED, finished_at=now, error=error)
+        return False
+    finally:
+        beat.stop()
+    jobs.update(status=ReportJob.DONE, result=result, progress=100, error='', finished_at=timezone.now())
+    return True
+
+
+def requeue_stale(timeout) -> int:
+    """
+    Devuelve a la cola los trabajos `running` sin latido en los últimos
+    `timeout` segundos (worker caído); los que ya agotaron sus intentos
+    fallan. Un trabajo largo con su worker vivo no se toca.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=timeout)
+    stale = ReportJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=ReportJob.RUNNING,
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=ReportJob.FAILED, finished_at=now, error='Worker perdido (tiempo agotado)')
+    return failed + stale.update(status=ReportJob.PENDING, run_after=now)
+
+
+# ------------------------------------------------------------- handlers
+
+def _range(params):
+    return parse_date(params.get('start') or ''), parse_date(params.get('end') or '')
+
+
+def _report(endpoint, builder_path, extra=()):
+    # Calcula el reporte con la misma clave de caché que la vista síncrona,
+    # así que una vez terminado el trabajo el GET normal también acierta.
+    def run(job):
+        start, end = _range(job.params)
+        options = {name: job.params[name] for name in extra if name in job.params}
+        build = import_string(builder_path)
+        data, _ = report_cache.cached_report(
+            job.owner, endpoint(job.params), (start, end),
+            lambda: build(job.owner, start, end, **options))
+        return data
+    return run
+
+
+handler('summary')(_report(lambda p: 'summary', 'reports.api.views.summary_payload'))
+handler('cashflow_monthly')(_report(lambda p: 'cashflow-monthly', 'reports.api.views.cashflow_monthly_payload'))
+handler('cashflow')(_report(lambda p: f"cashflow-{p.get('granularity', 'month')}",
+                            'reports.api.views.cashflow_payload', extra=('granularity',)))
+
+
+@handler('rebuild_rollups')
+def rebuild_rollups(job):
+    set_progress(job, 10)
+    with transaction.atomic():
+        rows = rollups.rebuild([job.owner_id])
+        tracking.bump_version(job.owner_id)
+    return {'rows': rows}
+
+
+@handler('import_statement')
+def import_statement(job):
+    # El archivo se guardó en ImportChunk al encolar; se lee trozo a trozo
+    chunks = (ImportChunk.objects.filter(job=job).order_by('seq')
+              .values_list('data', flat=True).iterator(chunk_size=1))
+    try:
+        summary = imports.import_statement(
+            job.owner, chunks, job.params.get('format', 'csv'), job.params.get('date_format'),
+            total_bytes=job.params.get('size'), progress=lambda pct: set_progress(job, pct))
+    except imports.StatementError as exc:
+        ImportChunk.objects.filter(job=job).delete()
+        raise PermanentJobError(str(exc))
+    ImportChunk.objects.filter(job=job).delete()
+    return summary
@@ -0,0 +1,89 @@
+# reports/ledger.py
+"""
+Libro de movimientos (/api/ledger/): ingresos extra, egresos extra y
+movimientos de ahorros del usuario en un solo listado por fecha
+descendente, paginado por cursor.
+
+Cada fuente se lee desde el cursor con su índice (owner, date, id) y
+`LIMIT página + 1`; `heapq.merge` intercala las secuencias, que ya llegan
+ordenadas. Así la página N cuesta lo mismo que la primera: nunca se leen las
+filas de páginas anteriores ni se ordena nada en memoria más allá de una
+página por fuente.
+
+El orden total es `(date, fuente, id)` descendente, con la posición de la
+fuente en SOURCES como desempate entre fuentes del mismo día. El cursor
+guarda esa terna de la última fila entregada.
+"""
+import heapq
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from ingresos.models import IngresosExtra
+from egresos.models import EgresosExtra
+from ahorros.models import AhorroMovimiento
+from reports.api import fastlist
+from reports.api.pagination import keyset_before
+
+# (etiqueta, modelo). La posición es el desempate del orden: no reordenar
+SOURCES = (
+    ('ingresos_extra', IngresosExtra),
+    ('egresos_extra', EgresosExtra),
+    ('ahorro_movimientos', AhorroMovimiento),
+)
+MODELS = dict(SOURCES)
+
+
+def parse_position(values):
+    """`(fecha, fuente, id)` a partir de los valores de un cursor; ValueError si no es válido."""
+    day, rank, pk = values
+    day = parse_date(day) if isinstance(day, str) else None
+    if day is None or not isinstance(rank, int) or not 0 <= rank < len(SOURCES):
+        raise ValueError(values)
+    pk = int(pk)
+    if not 0 < pk < 2 ** 63:  # Fuera de BigAutoField: error de la base de datos, no del cursor
+        raise ValueError(values)
+    return day, rank, pk
+
+
+def _after(rank, position) -> Q:
+    """Filas de la fuente `rank` que van después de `position` en el orden descendente."""
+    day, cursor_rank, pk = position
+    if rank < cursor_rank:  # Mismo día: toda la fuente va después
+        return Q(date__lte=day)
+    if rank > cursor_rank:  # Mismo día: toda la fuente ya salió
+        return Q(date__lt=day)
+    return keyset_before('date', day, pk)
+
+
+def _source(owner, rank, label, model, encode, columns, position, limit):
+    queryset = model.objects.filter(owner=owner)
+    if position is not None:
+        queryset = queryset.filter(_after(rank, position))
+    rows = queryset.order_by('-date', '-id').values_list(*columns, named=True)[:limit]
+    for row in rows:
+        yield (row.date, rank, row.id), label, row, encode
+
+
+def page(owner, serializers, position=None, size=50, types=None):
+    """
+    `(items, siguiente)`: hasta `size` movimientos después de `position`
+    (None = desde el más reciente) y la posición para la página siguiente
+    (None si no hay más). `serializers`: etiqueta -> serializer del registro.
+    """
+    sources = []
+    for rank, (label, model) in enumerate(SOURCES):
+        if types and label not in types:
+            continue
+        # Tuplas + codificador precompilado: mismo `record` que el serializer
+        columns, encode = fastlist.compile_encoder(serializers[label]).bind({'owner': owner})
+        sources.append(_source(owner, rank, label, model, encode, columns, position, size + 1))
+
+    merged = list(islice(heapq.merge(*sources, key=lambda item: item[0], reverse=True), size + 1))
+    items = [
+        {'type': label, 'id': row.id, 'date': row.date.isoformat(), 'record': encode(row)}
+        for _, label, row, encode in merged[:size]
+    ]
+    following = merged[size - 1][0] if len(merged) > size else None
+    return items, following
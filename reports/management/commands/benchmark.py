@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from reports import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Run a performance benchmark against a throwaway test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenario", choices=sorted(benchmarks.SCENARIOS))
+        parser.add_argument("--rows", type=int, default=None, help="Synthetic rows to generate (scenario default if omitted)")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per measurement")
+
+    def handle(self, *args, **options):
+        # Nunca se toca la base configurada: se crea y destruye una base de pruebas
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            benchmarks.SCENARIOS[options["scenario"]](self.stdout, options["rows"], options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+
+from reports import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly report rollups from the transaction tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", action="append", default=[], help="Only rebuild this user (repeatable)")
+
+    def handle(self, *args, **options):
+        owner_ids = None
+        if options["email"]:
+            User = get_user_model()
+            owner_ids = list(User.objects.filter(email__in=options["email"]).values_list("id", flat=True))
+            if not owner_ids:
+                raise CommandError("No users found for the given emails")
+
+        created = rollups.rebuild(owner_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} rollup rows"))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from reports import jobs
+
+
+class Command(BaseCommand):
+    help = "Process background report jobs from the database queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs")
+        parser.add_argument("--stale-after", type=int, default=600,
+                            help="Requeue running jobs whose worker sent no heartbeat for this many seconds")
+
+    def handle(self, *args, **options):
+        worker = jobs.worker_name()
+        self.stdout.write(f"Worker {worker} started")
+        done = 0
+        last_sweep = 0.0
+        try:
+            while options["max_jobs"] is None or done < options["max_jobs"]:
+                close_old_connections()  # Igual que entre peticiones HTTP
+                if time.monotonic() - last_sweep > 60:
+                    requeued = jobs.requeue_stale(options["stale_after"])
+                    if requeued:
+                        self.stdout.write(f"Requeued {requeued} stale job(s)")
+                    last_sweep = time.monotonic()
+
+                job = jobs.claim(worker)
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["sleep"])
+                    continue
+
+                started = time.perf_counter()
+                ok = jobs.execute(job)
+                elapsed = (time.perf_counter() - started) * 1000
+                done += 1
+                self.stdout.write(f"{job.kind} #{job.pk} {'done' if ok else 'failed'} in {elapsed:.0f} ms")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Worker {worker} stopped after {done} job(s)")
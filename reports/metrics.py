@@ -0,0 +1,31 @@
+# reports/metrics.py
+from dataclasses import dataclass
+
+from ingresos.models import IngresosFijos, IngresosExtra
+from egresos.models import EgresosFijos, EgresosExtra
+from ahorros.models import Ahorros, AhorroMovimiento
+from prestamos.models import Prestamos
+
+
+@dataclass(frozen=True)
+class Metric:
+    # Tabla de origen y columna que se suma
+    model: type
+    field: str
+    # Columna de fecha; None = el registro no tiene fecha y se cuenta completo
+    date_field: str = None
+    # ¿Se mantiene en reports.MonthlyRollup? (categoría = nombre de la métrica)
+    rollup: bool = True
+
+
+# Métricas que pueden pedir los reportes (ver reports.engine.ReportQuery)
+METRICS = {
+    'ingresos_fijos': Metric(IngresosFijos, 'quantity'),
+    'ingresos_extra': Metric(IngresosExtra, 'quantity', 'date'),
+    'egresos_fijos': Metric(EgresosFijos, 'quantity'),
+    'egresos_extra': Metric(EgresosExtra, 'quantity', 'date'),
+    'ahorros_objetivo': Metric(Ahorros, 'quantity'),
+    'ahorros_acumulado': Metric(Ahorros, 'accrued'),
+    'prestamos': Metric(Prestamos, 'quantity'),
+    'ahorros_movimientos': Metric(AhorroMovimiento, 'amount', 'date', rollup=False),
+}
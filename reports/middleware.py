@@ -0,0 +1,131 @@
+# reports/middleware.py
+"""
+Compresión gzip/brotli de las respuestas de la API.
+
+WhiteNoise ya comprime los estáticos; esto cubre el JSON de la API, el
+esquema OpenAPI (/schema/) y el CSV de exportación:
+
+- Solo tipos de texto de datos (COMPRESSIBLE_TYPES). El HTML de la API
+  navegable, el admin y el XLSX (que ya es un zip) salen tal cual.
+- Respuestas normales: solo desde COMPRESSION_MIN_LENGTH bytes y solo si
+  el resultado es más corto.
+- Respuestas streaming (exportación): se comprimen bloque a bloque sin
+  juntar el cuerpo en memoria.
+- BREACH: las respuestas de autenticación (tokens JWT, CSRF) nunca se
+  comprimen (COMPRESSION_EXCLUDED_PATHS); gzip además lleva bytes
+  aleatorios en la cabecera como el GZipMiddleware de Django.
+- Brotli si el paquete `brotli` está instalado y el cliente lo acepta; si
+  no, gzip.
+"""
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # Dependencia opcional: sin ella solo gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/vnd.oai.openapi',
+    'application/vnd.oai.openapi+json',
+    'application/yaml',
+    'text/csv',
+    'text/plain',
+)
+# Respuestas con tokens (login, refresh, registro, sesión de la API navegable)
+EXCLUDED_PATHS = ('/api/auth/', '/api-auth/')
+
+
+def accepted_encodings(header):
+    """Codificaciones aceptadas de un Accept-Encoding (`*` incluye las no rechazadas con q=0)."""
+    qualities = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding] = q
+    accepted = {coding for coding, q in qualities.items() if q > 0}
+    if '*' in accepted:
+        accepted.update(coding for coding in ('br', 'gzip') if coding not in qualities)
+    return accepted
+
+
+def _brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Ver el docstring del módulo. Va en MIDDLEWARE justo después de WhiteNoise."""
+    max_random_bytes = 100  # Igual que django.middleware.gzip.GZipMiddleware
+
+    def choose_encoding(self, request):
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def is_compressible(self, request, response):
+        excluded = tuple(getattr(settings, 'COMPRESSION_EXCLUDED_PATHS', EXCLUDED_PATHS))
+        if response.has_header('Content-Encoding') or request.path.startswith(excluded):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return False
+        # Los streaming asíncronos no se usan en la API: salen sin comprimir
+        if response.streaming:
+            return not response.is_async
+        return len(response.content) >= getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+
+    def compress(self, content, encoding):
+        if encoding == 'br':
+            return brotli.compress(content, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4))
+        return compress_string(content, max_random_bytes=self.max_random_bytes)
+
+    def compress_stream(self, sequence, encoding):
+        if encoding == 'br':
+            return _brotli_sequence(sequence, getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4))
+        return compress_sequence(sequence, max_random_bytes=self.max_random_bytes)
+
+    def process_response(self, request, response):
+        if not self.is_compressible(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            compressed = self.compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # El ETag fuerte pasa a débil: la representación comprimida no es la misma (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('ingresos_fijos', 'Ingresos fijos'), ('ingresos_extra', 'Ingresos extra'), ('egresos_fijos', 'Egresos fijos'), ('egresos_extra', 'Egresos extra'), ('ahorros_objetivo', 'Ahorros (objetivo)'), ('ahorros_acumulado', 'Ahorros (acumulado)'), ('prestamos', 'Préstamos')], max_length=32)),
+                ('month', models.DateField(blank=True, null=True)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Monthly rollups',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('month__isnull', False)), fields=('owner', 'category', 'month'), name='uniq_rollup_owner_category_month'), models.UniqueConstraint(condition=models.Q(('month__isnull', True)), fields=('owner', 'category'), name='uniq_rollup_owner_category_undated')],
+            },
+        ),
+    ]
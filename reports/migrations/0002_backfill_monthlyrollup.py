@@ -0,0 +1,46 @@
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+# (app, modelo, categoría, campo de monto, ¿tiene fecha?) — igual que reports.rollups.ROLLUP_SOURCES
+SOURCES = [
+    ('ingresos', 'IngresosFijos', 'ingresos_fijos', 'quantity', False),
+    ('ingresos', 'IngresosExtra', 'ingresos_extra', 'quantity', True),
+    ('egresos', 'EgresosFijos', 'egresos_fijos', 'quantity', False),
+    ('egresos', 'EgresosExtra', 'egresos_extra', 'quantity', True),
+    ('ahorros', 'Ahorros', 'ahorros_objetivo', 'quantity', False),
+    ('ahorros', 'Ahorros', 'ahorros_acumulado', 'accrued', False),
+    ('prestamos', 'Prestamos', 'prestamos', 'quantity', False),
+]
+
+
+def backfill(apps, schema_editor):
+    MonthlyRollup = apps.get_model('reports', 'MonthlyRollup')
+    objs = []
+    for app_label, model_name, category, field, dated in SOURCES:
+        qs = apps.get_model(app_label, model_name).objects.all()
+        if dated:
+            qs = qs.annotate(month=TruncMonth('date')).values('owner_id', 'month')
+        else:
+            qs = qs.values('owner_id')
+        for row in qs.annotate(total=models.Sum(field), count=models.Count('id')).order_by():
+            objs.append(MonthlyRollup(
+                owner_id=row['owner_id'], category=category, month=row.get('month'),
+                total=row['total'] or 0, count=row['count'],
+            ))
+    MonthlyRollup.objects.bulk_create(objs, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        ('ingresos', '0003_alter_ingresosextra_owner_alter_ingresosfijos_owner'),
+        ('egresos', '0003_alter_egresosextra_owner_alter_egresosfijos_owner'),
+        ('ahorros', '0005_alter_ahorros_owner'),
+        ('prestamos', '0003_alter_prestamos_owner'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
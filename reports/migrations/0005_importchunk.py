@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_reportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_chunks', to='reports.reportjob')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job', 'seq'), name='uniq_importchunk_job_seq')],
+            },
+        ),
+    ]
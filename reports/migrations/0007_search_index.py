@@ -0,0 +1,104 @@
+from django.db import migrations
+
+
+# (app, modelo, tipo) — igual que reports.search.SOURCES (tipo = posición)
+SOURCES = [
+    ('ingresos', 'IngresosFijos', 0),
+    ('ingresos', 'IngresosExtra', 1),
+    ('egresos', 'EgresosFijos', 2),
+    ('egresos', 'EgresosExtra', 3),
+    ('ahorros', 'Ahorros', 4),
+    ('prestamos', 'Prestamos', 5),
+]
+KINDS = 8
+FTS_TABLE = 'reports_search_index'
+# Misma expresión que reports.search.pg_vector_sql()
+PG_VECTOR = "to_tsvector('spanish'::regconfig, coalesce(name, '') || ' ' || coalesce(reason, ''))"
+
+
+def _tables(apps):
+    for app_label, model_name, kind in SOURCES:
+        yield apps.get_model(app_label, model_name)._meta.db_table, kind
+
+
+def _sqlite_install(apps, cursor):
+    # El usuario es un término indexado (u<id>); bm25 pesa más el nombre que el motivo
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        f"owner, name, reason, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(0.0, 10.0, 1.0)')")
+    for table, kind in _tables(apps):
+        key = f'id * {KINDS} + {kind}'
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, owner, name, reason) "
+            f"SELECT {key}, 'u' || owner_id, name, reason FROM {table}"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, owner, name, reason) "
+            f"VALUES (new.{key}, 'u' || new.owner_id, new.name, new.reason); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER {table}_search_au AFTER UPDATE OF owner_id, name, reason ON {table} BEGIN "
+            f"UPDATE {FTS_TABLE} SET owner = 'u' || new.owner_id, name = new.name, reason = new.reason "
+            f"WHERE rowid = old.{key}; END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = old.{key}; END"
+        )
+
+
+def _sqlite_uninstall(apps, cursor):
+    for table, _ in _tables(apps):
+        for suffix in ('ai', 'au', 'ad'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {table}_search_{suffix}')
+    cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def _postgres_install(apps, cursor):
+    # Los índices de expresión se mantienen solos en cada INSERT/UPDATE
+    cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, _ in _tables(apps):
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {table}_search_fts ON {table} USING gin ({PG_VECTOR})')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {table}_search_trgm ON {table} USING gin (name gin_trgm_ops)')
+
+
+def _postgres_uninstall(apps, cursor):
+    for table, _ in _tables(apps):
+        cursor.execute(f'DROP INDEX IF EXISTS {table}_search_fts')
+        cursor.execute(f'DROP INDEX IF EXISTS {table}_search_trgm')
+
+
+def install(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            _sqlite_install(apps, cursor)
+        elif vendor == 'postgresql':
+            _postgres_install(apps, cursor)
+
+
+def uninstall(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            _sqlite_uninstall(apps, cursor)
+        elif vendor == 'postgresql':
+            _postgres_uninstall(apps, cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_tombstone'),
+        ('ingresos', '0007_ingresosextra_seq_ingresosextra_updated_at_and_more'),
+        ('egresos', '0007_egresosextra_seq_egresosextra_updated_at_and_more'),
+        ('ahorros', '0007_ahorromovimiento_seq_ahorromovimiento_updated_at_and_more'),
+        ('prestamos', '0004_prestamos_seq_prestamos_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
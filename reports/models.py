@@ -0,0 +1,131 @@
+from django.db import models
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+
+class MonthlyRollup(models.Model):
+    # Totales pre-agregados por usuario, mes y categoría.
+    # Se mantienen al día en cada escritura de los ViewSets (ver reports/rollups.py)
+    # y se reconstruyen con `python manage.py rebuild_rollups`.
+    CATEGORY_CHOICES = [
+        ('ingresos_fijos', 'Ingresos fijos'),
+        ('ingresos_extra', 'Ingresos extra'),
+        ('egresos_fijos', 'Egresos fijos'),
+        ('egresos_extra', 'Egresos extra'),
+        ('ahorros_objetivo', 'Ahorros (objetivo)'),
+        ('ahorros_acumulado', 'Ahorros (acumulado)'),
+        ('prestamos', 'Préstamos'),
+    ]
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_rollups')
+    category = models.CharField(max_length=32, choices=CATEGORY_CHOICES)
+    # Primer día del mes; NULL para categorías sin fecha (fijos, ahorros, préstamos)
+    month = models.DateField(null=True, blank=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)  # Registros que aportan al total
+
+    class Meta:
+        verbose_name_plural = "Monthly rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner', 'category', 'month'],
+                condition=models.Q(month__isnull=False),
+                name='uniq_rollup_owner_category_month',
+            ),
+            models.UniqueConstraint(
+                fields=['owner', 'category'],
+                condition=models.Q(month__isnull=True),
+                name='uniq_rollup_owner_category_undated',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id} {self.category} {self.month or '-'}: {self.total}"
+
+
+class DataVersion(models.Model):
+    # Contador por usuario que sube en cada escritura de sus datos financieros.
+    # Forma parte de las claves de caché de reportes: al subir, lo cacheado
+    # con la versión anterior deja de servirse.
+    owner = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='data_version')
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.owner_id} v{self.version}"
+
+
+class ReportJob(models.Model):
+    # Trabajo en segundo plano (reportes de rango amplio, recálculos...).
+    # La cola es esta misma tabla: `python manage.py runworker` toma los
+    # pendientes por prioridad y guarda el resultado (ver reports/jobs.py).
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En ejecución'),
+        (DONE, 'Terminado'),
+        (FAILED, 'Fallido'),
+    ]
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_jobs')
+    kind = models.CharField(max_length=50)  # Clave en reports.jobs.HANDLERS
+    params = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    priority = models.IntegerField(default=0)  # Mayor = antes
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    progress = models.PositiveSmallIntegerField(default=0)  # 0-100
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default='')
+    run_after = models.DateTimeField(default=timezone.now)  # Reintentos con espera
+    worker = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Último latido del worker que lo ejecuta: sin latidos recientes se da por caído
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Siguiente trabajo: pendientes por prioridad y antigüedad
+            models.Index(fields=['status', '-priority', 'run_after', 'id'], name='reportjob_queue'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ImportChunk(models.Model):
+    # Trozo (bytes) de un extracto bancario subido para importarse en segundo
+    # plano: el worker lo lee en orden sin cargar el archivo completo, y
+    # funciona aunque web y worker no compartan disco. Se borra al terminar.
+    job = models.ForeignKey(ReportJob, on_delete=models.CASCADE, related_name='import_chunks')
+    seq = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'seq'], name='uniq_importchunk_job_seq'),
+        ]
+
+
+class Tombstone(models.Model):
+    # Registro borrado, para que /api/sync/ avise a los clientes offline.
+    # `seq` es la versión de datos del usuario en la que se borró.
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tombstones')
+    model = models.CharField(max_length=50)  # Clave en reports.sync.MODELS
+    object_id = models.BigIntegerField()
+    seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'seq'], name='tombstone_owner_seq'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} (v{self.seq})"
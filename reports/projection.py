@@ -0,0 +1,183 @@
+# reports/projection.py
+"""
+Proyección de ingresos/egresos fijos a ocurrencias con fecha.
+
+Los registros Fijos solo tienen `period` (texto libre: 'Mensual', 'Anual'...)
+y opcionalmente `date_start`/`date_end`. Aquí se cargan todos los de un
+usuario como arreglos NumPy y se calcula, para cualquier ventana
+[start, end], cuántas veces ocurre cada uno (y en qué fechas) con
+aritmética de fechas vectorizada: el coste es O(registros) para los
+totales y O(ocurrencias) para las series, sin bucles Python por fecha.
+"""
+import unicodedata
+from dataclasses import dataclass
+
+import numpy as np
+
+# Periodo -> (unidad, paso). 'D' = días, 'M' = meses de calendario.
+PERIODS = {
+    'diario': ('D', 1),
+    'diaria': ('D', 1),
+    'semanal': ('D', 7),
+    'quincenal': ('D', 15),
+    'mensual': ('M', 1),
+    'bimestral': ('M', 2),
+    'trimestral': ('M', 3),
+    'cuatrimestral': ('M', 4),
+    'semestral': ('M', 6),
+    'anual': ('M', 12),
+}
+DEFAULT_PERIOD = PERIODS['mensual']  # Igual que el default del modelo
+
+# Ancla cuando no hay date_start: periodos en días caen en lunes,
+# periodos en meses el día 1.
+DEFAULT_DAY_ANCHOR = np.datetime64('1970-01-05', 'D')
+DEFAULT_MONTH_ANCHOR = np.datetime64('1970-01-01', 'D')
+
+_NEVER_BEFORE = np.datetime64('0001-01-01', 'D')
+_NEVER_AFTER = np.datetime64('9999-12-31', 'D')
+
+
+def parse_period(label):
+    """'Mensual', 'mensual ', 'MENSUAL' -> ('M', 1). Desconocido -> mensual."""
+    key = unicodedata.normalize('NFKD', label or '').encode('ascii', 'ignore').decode().strip().lower()
+    return PERIODS.get(key, DEFAULT_PERIOD)
+
+
+def _month_index(days):
+    return days.astype('datetime64[M]').astype('int64')
+
+
+def _month_day(month_idx, day):
+    # Fecha del día `day` del mes `month_idx`, recortado al último día del mes
+    first = month_idx.astype('datetime64[M]').astype('datetime64[D]')
+    length = ((month_idx + 1).astype('datetime64[M]').astype('datetime64[D]') - first).astype('int64')
+    return first + (np.minimum(day, length) - 1)
+
+
+@dataclass
+class RecurringItems:
+    # Un elemento por registro Fijo
+    quantity: np.ndarray   # float64
+    monthly: np.ndarray    # bool: paso en meses (True) o en días (False)
+    step: np.ndarray       # int64
+    anchor: np.ndarray     # datetime64[D]: primera ocurrencia (o ancla por defecto)
+    first: np.ndarray      # datetime64[D]: vigente desde
+    last: np.ndarray       # datetime64[D]: vigente hasta
+
+    @classmethod
+    def from_rows(cls, rows):
+        """`rows`: iterable de (quantity, period, date_start, date_end)."""
+        rows = list(rows)
+        specs = {}
+        units, steps, anchors, firsts, lasts, quantities = [], [], [], [], [], []
+        for quantity, period, date_start, date_end in rows:
+            if period not in specs:
+                specs[period] = parse_period(period)
+            unit, step = specs[period]
+            quantities.append(float(quantity))
+            units.append(unit == 'M')
+            steps.append(step)
+            anchors.append(date_start or (DEFAULT_MONTH_ANCHOR if unit == 'M' else DEFAULT_DAY_ANCHOR))
+            firsts.append(date_start or _NEVER_BEFORE)
+            lasts.append(date_end or _NEVER_AFTER)
+        return cls(
+            quantity=np.array(quantities, dtype='float64'),
+            monthly=np.array(units, dtype=bool),
+            step=np.array(steps, dtype='int64'),
+            anchor=np.array(anchors, dtype='datetime64[D]'),
+            first=np.array(firsts, dtype='datetime64[D]'),
+            last=np.array(lasts, dtype='datetime64[D]'),
+        )
+
+    @classmethod
+    def for_owner(cls, model, owner):
+        """Todos los registros Fijos (`model`) del usuario."""
+        return cls.from_rows(model.objects.filter(owner=owner).values_list('quantity', 'period', 'date_start', 'date_end'))
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def _occurrence(self, k):
+        # Fecha de la ocurrencia k-ésima de cada registro (k: arreglo alineado)
+        by_days = self.anchor + k * self.step
+        anchor_month = _month_index(self.anchor)
+        anchor_day = (self.anchor - self.anchor.astype('datetime64[M]').astype('datetime64[D]')).astype('int64') + 1
+        by_months = _month_day(anchor_month + k * self.step, anchor_day)
+        return np.where(self.monthly, by_months, by_days)
+
+    def occurrence(self, k):
+        """Fecha de la ocurrencia número `k` (0 = ancla) de cada registro; `k` alineado o escalar."""
+        return self._occurrence(np.asarray(k, dtype='int64'))
+
+    def bounds(self, start, end):
+        """Índices (k0, k1) de la primera y última ocurrencia en [start, end]."""
+        # start/end pueden ser fechas o arreglos con forma (b, 1): en ese caso
+        # todo se calcula por difusión (broadcasting) para b ventanas a la vez
+        lo = np.maximum(np.asarray(start, dtype='datetime64[D]'), self.first)
+        hi = np.minimum(np.asarray(end, dtype='datetime64[D]'), self.last)
+
+        # Periodos en días: ceil/floor directos sobre la distancia al ancla
+        day_k0 = -((self.anchor - lo).astype('int64') // self.step)
+        day_k1 = (hi - self.anchor).astype('int64') // self.step
+
+        # Periodos en meses: primero por índice de mes, luego se corrige el
+        # borde si el día de la ocurrencia cae fuera de la ventana
+        anchor_month = _month_index(self.anchor)
+        month_k0 = -((anchor_month - _month_index(lo)) // self.step)
+        month_k1 = (_month_index(hi) - anchor_month) // self.step
+
+        k0 = np.where(self.monthly, month_k0, day_k0)
+        k1 = np.where(self.monthly, month_k1, day_k1)
+        k0 = k0 + (self.monthly & (self._occurrence(k0) < lo))
+        k1 = k1 - (self.monthly & (self._occurrence(k1) > hi))
+        return k0, k1
+
+    def counts(self, start, end):
+        """Número de ocurrencias de cada registro en [start, end]."""
+        if not len(self):
+            return np.zeros(0, dtype='int64')
+        k0, k1 = self.bounds(start, end)
+        return np.maximum(k1 - k0 + 1, 0)
+
+    def total(self, start, end) -> float:
+        """Suma de todas las ocurrencias en [start, end]."""
+        return float((self.counts(start, end) * self.quantity).sum())
+
+    def occurrences(self, start, end):
+        """`(fechas, montos)` de todas las ocurrencias en [start, end]."""
+        if not len(self):
+            return np.array([], dtype='datetime64[D]'), np.zeros(0)
+        k0, k1 = self.bounds(start, end)
+        counts = np.maximum(k1 - k0 + 1, 0)
+        item = np.repeat(np.arange(len(self)), counts)
+        # k de cada ocurrencia: k0 del registro + posición dentro de su bloque
+        offsets = np.cumsum(counts) - counts
+        k = k0[item] + (np.arange(counts.sum()) - offsets[item])
+        subset = RecurringItems(*(getattr(self, f)[item] for f in self.__dataclass_fields__))
+        return subset._occurrence(k), self.quantity[item]
+
+    def bucket_totals(self, periods, end, start=None):
+        """
+        Suma por bucket: `periods` son los inicios (datetime64[D], ordenados),
+        el último bucket termina en `end` y el primero empieza en `start` si
+        es posterior a periods[0]. Elige el camino más barato: expandir las
+        ocurrencias, o contarlas por (bucket, registro) en bloques.
+        """
+        totals = np.zeros(len(periods))
+        if not len(self) or not len(periods):
+            return totals
+        starts = periods.copy()
+        if start is not None:
+            starts[0] = max(starts[0], np.datetime64(start, 'D'))
+        ends = np.append(periods[1:] - 1, np.datetime64(end, 'D'))
+        expanded = int(self.counts(starts[0], ends[-1]).sum())
+        if expanded <= len(periods) * len(self):
+            dates, amounts = self.occurrences(starts[0], ends[-1])
+            np.add.at(totals, np.searchsorted(periods, dates, side='right') - 1, amounts)
+            return totals
+        chunk = max(1, 1_000_000 // len(self))
+        for i in range(0, len(periods), chunk):
+            counts = self.counts(starts[i:i + chunk, None], ends[i:i + chunk, None])
+            totals[i:i + chunk] = counts @ self.quantity
+        return totals
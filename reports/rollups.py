@@ -0,0 +1,129 @@
+# reports/rollups.py
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import TruncMonth
+
+from reports.metrics import METRICS
+from reports.models import MonthlyRollup
+
+
+# Qué aporta cada modelo al rollup: {modelo: [(categoría, campo de monto, ¿tiene fecha?)]}
+ROLLUP_SOURCES = {}
+for _category, _metric in METRICS.items():
+    if _metric.rollup:
+        ROLLUP_SOURCES.setdefault(_metric.model, []).append((_category, _metric.field, _metric.date_field is not None))
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def next_month(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def month_end(d: date) -> date:
+    return next_month(d) - timedelta(days=1)
+
+
+def contributions(instance) -> list:
+    """
+    Lo que un registro aporta al rollup: [(categoría, mes, monto), ...].
+    Se llama antes y después de guardar para calcular el delta.
+    """
+    out = []
+    for category, field, dated in ROLLUP_SOURCES.get(type(instance), []):
+        month = month_start(instance.date) if dated else None
+        out.append((category, month, Decimal(getattr(instance, field) or 0)))
+    return out
+
+
+def apply_change(owner_id, before=(), after=()):
+    """
+    Aplica al rollup la diferencia entre dos listas de `contributions()`.
+    Creación: solo `after`; borrado: solo `before`; edición: ambas.
+    """
+    deltas = {}
+    for category, month, amount in before:
+        total, count = deltas.get((category, month), (Decimal(0), 0))
+        deltas[(category, month)] = (total - amount, count - 1)
+    for category, month, amount in after:
+        total, count = deltas.get((category, month), (Decimal(0), 0))
+        deltas[(category, month)] = (total + amount, count + 1)
+    apply_deltas(owner_id, deltas)
+
+
+def apply_deltas(owner_id, deltas: dict):
+    """
+    Suma `{(categoría, mes): (monto, conteo)}` a las filas del rollup con
+    UPDATE ... SET total = total + x; crea la fila si todavía no existe.
+    """
+    for (category, month), (amount, count) in deltas.items():
+        if not amount and not count:
+            continue
+        rows = MonthlyRollup.objects.filter(owner_id=owner_id, category=category, month=month)
+        if rows.update(total=F('total') + amount, count=F('count') + count):
+            continue
+        try:
+            with transaction.atomic():
+                MonthlyRollup.objects.create(owner_id=owner_id, category=category, month=month, total=amount, count=count)
+        except IntegrityError:
+            # Otra petición creó la fila entre el UPDATE y el INSERT
+            rows.update(total=F('total') + amount, count=F('count') + count)
+
+
+def rebuild(owner_ids=None) -> int:
+    """
+    Recalcula desde cero los rollups (de todos los usuarios o de `owner_ids`)
+    con una consulta agrupada por fuente. Devuelve el número de filas creadas.
+    """
+    objs = []
+    for model, specs in ROLLUP_SOURCES.items():
+        qs = model.objects.all()
+        if owner_ids is not None:
+            qs = qs.filter(owner_id__in=owner_ids)
+        for category, field, dated in specs:
+            if dated:
+                grouped = qs.annotate(month=TruncMonth('date')).values('owner_id', 'month')
+            else:
+                grouped = qs.values('owner_id')
+            grouped = grouped.annotate(total=models.Sum(field), count=models.Count('id')).order_by()
+            for row in grouped:
+                objs.append(MonthlyRollup(
+                    owner_id=row['owner_id'],
+                    category=category,
+                    month=row.get('month'),
+                    total=row['total'] or 0,
+                    count=row['count'],
+                ))
+
+    with transaction.atomic():
+        existing = MonthlyRollup.objects.all()
+        if owner_ids is not None:
+            existing = existing.filter(owner_id__in=owner_ids)
+        existing.delete()
+        MonthlyRollup.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+def split_range(start, end):
+    """
+    Divide [start, end] en meses completos (se leen del rollup) y fragmentos
+    de borde (se leen de las tablas originales, como mucho dos trozos).
+    Devuelve (primer_mes, último_mes, bordes); None = sin límite y
+    primer_mes > último_mes = no hay meses completos.
+    """
+    edges = []
+    lo = month_start(start) if start else None
+    hi = month_start(end) if end else None
+    if start and start != lo:
+        edges.append((start, min(end, month_end(start)) if end else month_end(start)))
+        lo = next_month(lo)
+    if end and end != month_end(end):
+        if lo is None or hi >= lo:
+            edges.append((max(start, hi) if start else hi, end))
+        hi = month_start(hi - timedelta(days=1))
+    return lo, hi, edges
@@ -0,0 +1,185 @@
+# reports/search.py
+"""
+Búsqueda de texto completo sobre `name` y `reason` de ingresos, egresos,
+ahorros y préstamos del usuario, con resultados ordenados por relevancia.
+
+El índice lo mantiene la propia base de datos (migración
+reports/0007_search_index), así que sigue al día con cualquier escritura
+(API, bulk, importaciones, admin):
+
+- SQLite: una tabla FTS5 `reports_search_index` con triggers en cada tabla
+  fuente. El rowid codifica (id, tipo) como `id * 8 + tipo` para que los
+  triggers actualicen o borren por clave. El usuario va como un término más
+  (`u<owner_id>`), de modo que el filtro por dueño también usa el índice.
+- PostgreSQL: índices GIN de expresión `to_tsvector('spanish', name || ' ' ||
+  reason)` y de trigramas sobre `name` (errores de tipeo); la consulta repite
+  la expresión exacta para que el planificador use el índice.
+- Otras bases: `icontains` sobre las columnas, sin índice; el puntaje solo
+  cuenta las palabras que aparecen en `name`.
+"""
+import re
+
+from functools import reduce
+from operator import and_
+
+from django.db import connection, connections
+from django.db.models import Q
+
+from ingresos.models import IngresosFijos, IngresosExtra
+from egresos.models import EgresosFijos, EgresosExtra
+from ahorros.models import Ahorros
+from prestamos.models import Prestamos
+
+# (etiqueta, modelo). La posición es el `tipo` del rowid de SQLite: no reordenar
+SOURCES = (
+    ('ingresos_fijos', IngresosFijos),
+    ('ingresos_extra', IngresosExtra),
+    ('egresos_fijos', EgresosFijos),
+    ('egresos_extra', EgresosExtra),
+    ('ahorros', Ahorros),
+    ('prestamos', Prestamos),
+)
+MODELS = dict(SOURCES)
+KINDS = 8  # rowid = id * KINDS + tipo
+
+FTS_TABLE = 'reports_search_index'
+PG_CONFIG = 'spanish'
+MAX_TERMS = 8
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def terms(query):
+    """Palabras buscables de `query` (sin operadores ni comillas del usuario)."""
+    return _WORD.findall(query or '')[:MAX_TERMS]
+
+
+def pg_vector_sql():
+    """Expresión del índice GIN de PostgreSQL (debe coincidir con la migración)."""
+    return f"to_tsvector('{PG_CONFIG}'::regconfig, coalesce(name, '') || ' ' || coalesce(reason, ''))"
+
+
+def _sqlite_triggers(table, kind):
+    key = f'id * {KINDS} + {kind}'
+    return {
+        f'{table}_search_ai': (
+            f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, owner, name, reason) "
+            f"VALUES (new.{key}, 'u' || new.owner_id, new.name, new.reason); END"),
+        f'{table}_search_au': (
+            f"CREATE TRIGGER {table}_search_au AFTER UPDATE OF owner_id, name, reason ON {table} BEGIN "
+            f"UPDATE {FTS_TABLE} SET owner = 'u' || new.owner_id, name = new.name, reason = new.reason "
+            f"WHERE rowid = old.{key}; END"),
+        f'{table}_search_ad': (
+            f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = old.{key}; END"),
+    }
+
+
+def ensure_index(using='default') -> bool:
+    """
+    SQLite: recrea los triggers que falten y recarga el índice. Una migración
+    que reconstruye una tabla fuente (SQLite copia y renombra la tabla) borra
+    sus triggers; se llama en post_migrate. Devuelve True si tuvo que reparar.
+    """
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing:  # Aún sin migrar
+            return False
+        triggers = {}
+        for kind, (_, model) in enumerate(SOURCES):
+            triggers.update(_sqlite_triggers(model._meta.db_table, kind))
+        missing = [sql for name, sql in triggers.items() if name not in existing]
+        if not missing:
+            return False
+        for sql in missing:
+            cursor.execute(sql)
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        for kind, (_, model) in enumerate(SOURCES):
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, owner, name, reason) "
+                f"SELECT id * {KINDS} + {kind}, 'u' || owner_id, name, reason FROM {model._meta.db_table}")
+    return True
+
+
+def _sqlite_hits(owner_id, words, labels, limit):
+    # Cada palabra como prefijo ("caf"* encuentra "café"), todas obligatorias
+    match = 'owner:u%d AND {name reason}: (%s)' % (
+        owner_id, ' AND '.join('"%s"*' % w.replace('"', '') for w in words))
+    kinds = [i for i, (label, _) in enumerate(SOURCES) if label in labels]
+    sql = (f'SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+           f'AND rowid %% {KINDS} IN ({", ".join(map(str, kinds))}) ORDER BY rank LIMIT %s')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, limit])
+        rows = cursor.fetchall()
+    # bm25: menor = más relevante; se invierte para que mayor sea mejor
+    return [(SOURCES[rowid % KINDS][0], rowid // KINDS, -rank) for rowid, rank in rows]
+
+
+def _postgres_hits(owner_id, words, labels, limit):
+    qn = connection.ops.quote_name
+    tsquery = ' & '.join(f'{w}:*' for w in words)
+    phrase = ' '.join(words)
+    parts, params = [], []
+    for label, model in SOURCES:
+        if label not in labels:
+            continue
+        vector = pg_vector_sql()
+        parts.append(
+            f"SELECT %s AS kind, id, ts_rank({vector}, to_tsquery('{PG_CONFIG}', %s)) + similarity(name, %s) AS score "
+            f"FROM {qn(model._meta.db_table)} WHERE owner_id = %s "
+            f"AND ({vector} @@ to_tsquery('{PG_CONFIG}', %s) OR name %% %s)"
+        )
+        params += [label, tsquery, phrase, owner_id, tsquery, phrase]
+    sql = f'{" UNION ALL ".join(parts)} ORDER BY score DESC LIMIT %s'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit])
+        return [(kind, pk, float(score)) for kind, pk, score in cursor.fetchall()]
+
+
+def _fallback_hits(owner_id, words, labels, limit):
+    hits = []
+    for label, model in SOURCES:
+        if label not in labels:
+            continue
+        match = reduce(and_, (Q(name__icontains=w) | Q(reason__icontains=w) for w in words))
+        rows = model.objects.filter(match, owner_id=owner_id).order_by('-id').values_list('id', 'name')[:limit]
+        for pk, name in rows:
+            hits.append((label, pk, float(sum(w.lower() in name.lower() for w in words))))
+    hits.sort(key=lambda hit: -hit[2])
+    return hits[:limit]
+
+
+def search(owner, query, types=None, limit=20):
+    """
+    `[(etiqueta, id, puntaje), ...]` de los registros del usuario que
+    contienen todas las palabras de `query`, de más a menos relevante.
+    `types` limita la búsqueda a algunas etiquetas de SOURCES.
+    """
+    words = terms(query)
+    labels = set(types or MODELS) & set(MODELS)
+    if not words or not labels:
+        return []
+    if connection.vendor == 'postgresql':
+        return _postgres_hits(owner.pk, words, labels, limit)
+    if connection.vendor == 'sqlite':
+        return _sqlite_hits(owner.pk, words, labels, limit)
+    return _fallback_hits(owner.pk, words, labels, limit)
+
+
+def records(hits, serializers):
+    """Serializa los resultados de `search` (una consulta por tipo) en su orden."""
+    ids = {}
+    for label, pk, _ in hits:
+        ids.setdefault(label, []).append(pk)
+    found = {label: MODELS[label].objects.select_related('owner').in_bulk(pks) for label, pks in ids.items()}
+    results = []
+    for label, pk, score in hits:
+        obj = found[label].get(pk)
+        if obj is not None:  # Borrado entre la búsqueda y la carga
+            results.append({'type': label, 'id': pk, 'score': score, 'record': serializers[label](obj).data})
+    return results
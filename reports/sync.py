@@ -0,0 +1,99 @@
+# reports/sync.py
+"""
+Sincronización incremental para clientes offline (/api/sync/).
+
+Cada escritura sube la versión de datos del usuario (`DataVersion`) y
+estampa esa versión en el `seq` de las filas tocadas; los borrados dejan un
+`Tombstone` con la misma versión. El token de sincronización es la versión:
+los cambios desde el token N son las filas con `seq > N` (índice
+(owner, seq) en cada tabla), así que el coste depende de lo que cambió y no
+del total de datos del usuario.
+"""
+from django.db.models import QuerySet
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from ingresos.models import IngresosFijos, IngresosExtra
+from egresos.models import EgresosFijos, EgresosExtra
+from ahorros.models import Ahorros, AhorroMovimiento
+from prestamos.models import Prestamos
+from reports.models import Tombstone
+
+# Nombre en la respuesta -> modelo
+MODELS = {
+    'ingresos_fijos': IngresosFijos,
+    'ingresos_extra': IngresosExtra,
+    'egresos_fijos': EgresosFijos,
+    'egresos_extra': EgresosExtra,
+    'ahorros': Ahorros,
+    'ahorro_movimientos': AhorroMovimiento,
+    'prestamos': Prestamos,
+}
+LABELS = {model: label for label, model in MODELS.items()}
+
+# Campo de última modificación (Ahorros ya tenía el suyo)
+UPDATED_FIELD = {model: 'updated_at' for model in MODELS.values()}
+UPDATED_FIELD[Ahorros] = 'date_updated'
+
+
+def stamp(owner_id, version, changed=(), deleted=()):
+    """
+    Marca `changed` (instancias o querysets) con `seq=version` y crea las
+    lápidas de `deleted` (pares `(modelo, pk)`). Un UPDATE por modelo.
+    """
+    now = timezone.now()
+    pks = {}
+    for item in changed:
+        if isinstance(item, QuerySet):
+            if item.model in LABELS:
+                item.update(seq=version, **{UPDATED_FIELD[item.model]: now})
+            continue
+        model = type(item)
+        if model in LABELS and item.pk is not None:
+            pks.setdefault(model, []).append(item.pk)
+            # La instancia en memoria queda igual que la fila (la respuesta la serializa)
+            item.seq = version
+            setattr(item, UPDATED_FIELD[model], now)
+    for model, ids in pks.items():
+        model.objects.filter(pk__in=ids).update(seq=version, **{UPDATED_FIELD[model]: now})
+
+    tombstones = [Tombstone(owner_id=owner_id, model=LABELS[model], object_id=pk, seq=version, deleted_at=now)
+                  for model, pk in deleted if model in LABELS]
+    if tombstones:
+        Tombstone.objects.bulk_create(tombstones, batch_size=1000)
+
+
+def deleted_rows(objs):
+    """
+    `(modelo, pk)` de todo lo que borraría `objs.delete()` (instancias o un
+    queryset), incluidas las cascadas (p. ej. los movimientos de un ahorro).
+    Llamar antes de borrar.
+    """
+    collector = Collector(using='default')
+    collector.collect(objs)
+    rows = [(model, obj.pk) for model, instances in collector.data.items() if model in LABELS for obj in instances]
+    # Las cascadas sin señales se borran con un DELETE directo (fast_deletes)
+    for queryset in collector.fast_deletes:
+        if getattr(queryset, 'model', None) in LABELS:
+            rows.extend((queryset.model, pk) for pk in queryset.values_list('pk', flat=True))
+    return rows
+
+
+def changes(owner, since=0, serializers=None):
+    """
+    `(cambios, borrados)` del usuario con versión mayor que `since`
+    (`since=0`: todo, sin borrados). `serializers`: etiqueta -> serializer.
+    """
+    result, deleted = {}, {label: [] for label in MODELS}
+    for label, model in MODELS.items():
+        queryset = model.objects.filter(owner=owner)
+        if since:
+            queryset = queryset.filter(seq__gt=since)
+        queryset = queryset.select_related('owner').order_by('seq', 'id')
+        result[label] = serializers[label](queryset, many=True).data if serializers else list(queryset.values())
+    if since:
+        for label, pk in (Tombstone.objects.filter(owner=owner, seq__gt=since)
+                          .order_by('seq', 'id').values_list('model', 'object_id')):
+            if label in deleted:
+                deleted[label].append(pk)
+    return result, deleted
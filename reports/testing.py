@@ -0,0 +1,112 @@
+# reports/testing.py
+"""Utilidades compartidas por los tests de las apps."""
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from reports import rollups
+from reports.models import MonthlyRollup
+
+
+class ExplainAssertionsMixin:
+    """
+    `assertUsesIndex(queryset, index, column)`: el plan (EXPLAIN) del
+    queryset recorre `index` con `column` dentro de la condición de
+    búsqueda, es decir, el filtro se resuelve con el índice y no leyendo
+    todas las filas del usuario (ni de la tabla).
+
+    El planificador decide con estadísticas: cargar datos con varios
+    usuarios y valores repetidos, llamar a `analyze()` y probar filtros
+    selectivos (los que de verdad conviene resolver con el índice).
+    """
+
+    @staticmethod
+    def analyze():
+        """Estadísticas del planificador (ANALYZE) tras cargar los datos de prueba."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def filtered(self, viewset, params, user=None):
+        """Queryset del listado de `viewset` con `params` ya aplicados (sin ejecutarlo)."""
+        request = Request(APIRequestFactory().get('/', params))
+        request.user = user or self.user
+        view = viewset(request=request, format_kwarg=None, action='list', kwargs={})
+        return view.filter_queryset(view.get_queryset())
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Con tablas de prueba casi vacías el planificador prefiere un Seq Scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                return queryset.explain()
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET enable_seqscan = on')
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index, column=None):
+        plan = self.explain(queryset)
+        if connection.vendor == 'sqlite':
+            # SEARCH tabla USING [COVERING] INDEX nombre (owner_id=? AND date>?)
+            match = re.search(rf'SEARCH \S+ USING (?:COVERING )?INDEX {index} \(([^)]*)\)', plan)
+            self.assertIsNotNone(match, f'{index} no se usa:\n{plan}')
+            if column:
+                self.assertIn(column, match.group(1), f'{index} no filtra por {column}:\n{plan}')
+        else:
+            self.assertIn(index, plan, f'{index} no se usa:\n{plan}')
+        self.assertNotRegex(plan, r'\bSCAN \S+\s*$|Seq Scan', f'Recorrido completo:\n{plan}')
+
+
+class QueryBudgetMixin:
+    """
+    `assertQueriesDoNotGrow(fetch, add_rows)`: `fetch()` hace las mismas
+    consultas antes y después de `add_rows(n)`. Detecta N+1 (una consulta
+    por fila serializada) en listados y detalles.
+    """
+
+    def count_queries(self, fn):
+        with CaptureQueriesContext(connection) as ctx:
+            fn()
+        return len(ctx.captured_queries)
+
+    def assertQueriesDoNotGrow(self, fetch, add_rows, more=10):
+        fetch()  # Calentamiento: primeras escrituras (rollups, versión) y cachés
+        before = self.count_queries(fetch)
+        add_rows(more)
+        with CaptureQueriesContext(connection) as ctx:
+            fetch()
+        after = len(ctx.captured_queries)
+        sql = '\n'.join(q['sql'] for q in ctx.captured_queries)
+        self.assertEqual(before, after, f'{before} consultas antes y {after} con {more} filas más:\n{sql}')
+
+    def get_ok(self, url, params=None):
+        """GET que además comprueba el 200 (y consume el cuerpo si es streaming)."""
+        def fetch():
+            response = self.client.get(url, params or {})
+            self.assertEqual(response.status_code, 200, url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            return response
+        return fetch
+
+
+class RollupAssertionsMixin:
+    """
+    `assertRollupsMatchRebuild(owner)`: los rollups que dejaron los deltas
+    de cada escritura son los mismos que recalcula `rollups.rebuild` desde
+    las tablas (las filas que quedaron en cero no cuentan).
+    """
+
+    @staticmethod
+    def rollup_rows(owner):
+        rows = MonthlyRollup.objects.filter(owner=owner).exclude(count=0, total=0)
+        return sorted((r.category, r.month, r.total, r.count) for r in rows)
+
+    def assertRollupsMatchRebuild(self, owner):
+        incremental = self.rollup_rows(owner)
+        rollups.rebuild([owner.pk])
+        self.assertEqual(incremental, self.rollup_rows(owner))
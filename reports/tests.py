@@ -0,0 +1,1041 @@
+import csv
+import gzip
+import io
+import json
+import time
+import unittest
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from users.models import User
+from ingresos.models import IngresosExtra, IngresosFijos
+from ingresos.api.serializers import IngresosExtraSerializer, IngresosFijosSerializer
+from ingresos.api.views import IngresosExtraApiViewSet
+from egresos.models import EgresosExtra, EgresosFijos
+from egresos.api.serializers import EgresosExtraSerializer, EgresosFijosSerializer
+from ahorros.models import Ahorros, AhorroMovimiento
+from ahorros.api.serializers import AhorroMovimientoSerializer
+from reports import imports, jobs, middleware, rollups, search, tracking
+from reports import balance as report_balance
+from reports import series as report_series
+from reports.api import fastlist, renderers
+from reports.api.pagination import encode_cursor
+from reports.engine import ReportQuery
+from reports.projection import RecurringItems, parse_period
+from reports.models import MonthlyRollup, ReportJob, Tombstone
+from reports.testing import QueryBudgetMixin, RollupAssertionsMixin
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Endpoints de reports que devuelven filas: número fijo de consultas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='consultas@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ahorro = Ahorros.objects.create(owner=self.user, name='cafe meta', reason='r', quantity=100, payment=10)
+        self.add_rows(2)
+
+    def add_rows(self, n):
+        for model in (IngresosExtra, EgresosExtra):
+            model.objects.bulk_create([
+                model(owner=self.user, name=f'cafe {i}', reason='r', quantity=1, date=date(2025, 1, 1 + i % 28))
+                for i in range(n)
+            ])
+        AhorroMovimiento.objects.bulk_create([AhorroMovimiento(owner=self.user, ahorro=self.ahorro, amount=1)] * n)
+
+    def test_sync(self):
+        self.assertQueriesDoNotGrow(self.get_ok('/api/sync/'), self.add_rows)
+
+    def test_search(self):
+        self.assertQueriesDoNotGrow(self.get_ok('/api/search/', {'q': 'cafe', 'limit': 100}), self.add_rows)
+
+    def test_export(self):
+        self.assertQueriesDoNotGrow(self.get_ok('/api/export/transactions.csv'), self.add_rows)
+
+    def test_jobs(self):
+        def add_jobs(n):
+            for _ in range(n):
+                jobs.enqueue(self.user, 'summary')
+
+        self.assertQueriesDoNotGrow(self.get_ok('/api/reports/jobs/'), add_jobs)
+
+
+class ImportStatementTests(RollupAssertionsMixin, TestCase):
+    """Importación de extractos: deduplicación, montos y rollups."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='extracto@example.com', password='x')
+
+    def run_import(self, text):
+        return imports.import_statement(self.user, [text.encode()], 'csv')
+
+    def test_reimportar_no_duplica_ni_descuadra_rollups(self):
+        first = self.run_import('fecha,monto,descripcion\n2025-01-05,100,Sueldo\n2025-01-06,-20,Cafe\n')
+        self.assertEqual((first['ingresos'], first['egresos'], first['duplicados']), (1, 1, 0))
+        again = self.run_import('fecha,monto,descripcion\n2025-01-05,100,Sueldo\n2025-02-01,-5,Pan\n')
+        self.assertEqual((again['ingresos'], again['egresos'], again['duplicados']), (0, 1, 1))
+        self.assertEqual(IngresosExtra.objects.filter(owner=self.user).count(), 1)
+        self.assertEqual(EgresosExtra.objects.filter(owner=self.user).count(), 2)
+        self.assertRollupsMatchRebuild(self.user)
+
+    def test_montos_que_no_caben_son_errores_de_linea(self):
+        summary = self.run_import(
+            'fecha,monto,descripcion\n'
+            '2025-01-05,100000000,Demasiado\n'
+            '2025-01-06,1.005,Tres decimales\n'
+            '2025-01-07,99999999.99,Maximo\n'
+        )
+        self.assertEqual(summary['total_errores'], 2)
+        self.assertEqual([e['linea'] for e in summary['errores']], [2, 3])
+        self.assertEqual(summary['ingresos'], 1)
+        self.assertRollupsMatchRebuild(self.user)
+
+    def test_cargo_y_abono_vacios(self):
+        summary = self.run_import(
+            'fecha;descripcion;cargo;abono\n'
+            '2025-01-05;Sueldo;;100,00\n'
+            '2025-01-06;Sin monto;;\n'
+            '2025-01-07;Cafe;3,50;\n'
+        )
+        self.assertEqual((summary['ingresos'], summary['egresos'], summary['omitidos']), (1, 1, 1))
+        self.assertEqual(summary['total_errores'], 0)
+
+    def test_parse_amount(self):
+        self.assertEqual(imports.parse_amount('1.234,50'), Decimal('1234.50'))
+        self.assertEqual(imports.parse_amount('(12.000)'), Decimal('-12'))
+        with self.assertRaises(ValueError):
+            imports.parse_amount('0.001')
+
+
+class SyncTests(TestCase):
+    """/api/sync/: cambios desde el token y lápidas de lo borrado."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='sync@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since=None):
+        response = self.client.get('/api/sync/', {'since': since} if since is not None else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_no_expone_columnas_internas(self):
+        self.client.post('/api/IngresosExtra/', {'name': 'Sueldo', 'reason': 'r', 'quantity': '10.00',
+                                                'date': '2025-01-05'}, format='json')
+        row = self.sync()['changes']['ingresos_extra'][0]
+        self.assertEqual(row['name'], 'Sueldo')
+        for field in ('seq', 'updated_at', 'import_hash'):
+            self.assertNotIn(field, row)
+
+    def test_cambios_y_lapidas_desde_el_token(self):
+        keep = self.client.post('/api/IngresosExtra/', {'name': 'a', 'reason': 'r', 'quantity': '1.00',
+                                                        'date': '2025-01-05'}, format='json').data['id']
+        gone = self.client.post('/api/IngresosExtra/', {'name': 'b', 'reason': 'r', 'quantity': '2.00',
+                                                        'date': '2025-01-06'}, format='json').data['id']
+        ahorro = self.client.post('/api/ahorros/', {'name': 'meta', 'reason': 'r', 'quantity': '100.00',
+                                                    'payment': '10.00'}, format='json').data['id']
+        self.client.post(f'/api/ahorros/{ahorro}/depositar/', {'amount': '5.00'}, format='json')
+        movimiento = AhorroMovimiento.objects.get(ahorro_id=ahorro).pk
+        first = self.sync()
+        self.assertEqual(len(first['changes']['ingresos_extra']), 2)
+
+        self.client.patch(f'/api/IngresosExtra/{keep}/', {'name': 'a2'}, format='json')
+        self.client.delete(f'/api/IngresosExtra/{gone}/')
+        self.client.delete(f'/api/ahorros/{ahorro}/')  # Borra también sus movimientos (cascada)
+        delta = self.sync(first['token'])
+        self.assertEqual([row['name'] for row in delta['changes']['ingresos_extra']], ['a2'])
+        self.assertEqual(delta['deleted']['ingresos_extra'], [gone])
+        self.assertEqual(delta['deleted']['ahorros'], [ahorro])
+        self.assertEqual(delta['deleted']['ahorro_movimientos'], [movimiento])
+
+        # Sin cambios desde el último token: nada; token del futuro: todo de nuevo
+        empty = self.sync(delta['token'])
+        self.assertFalse(any(empty['changes'].values()) or any(empty['deleted'].values()))
+        reset = self.sync(delta['token'] + 100)
+        self.assertTrue(reset['reset'])
+        self.assertEqual([row['id'] for row in reset['changes']['ingresos_extra']], [keep])
+
+
+class SearchTests(TestCase):
+    """Búsqueda: el respaldo sin índice (otras bases) encuentra lo mismo."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='busqueda@example.com', password='x')
+        other = User.objects.create_user(email='otro@example.com', password='x')
+        self.cafe = EgresosExtra.objects.create(owner=self.user, name='Café de la mañana', reason='desayuno',
+                                                quantity=3, date=date(2025, 1, 5))
+        self.pan = EgresosExtra.objects.create(owner=self.user, name='Pan', reason='café y pan', quantity=2,
+                                               date=date(2025, 1, 6))
+        IngresosExtra.objects.create(owner=other, name='Café', reason='r', quantity=1, date=date(2025, 1, 5))
+
+    def test_respaldo_icontains(self):
+        hits = search._fallback_hits(self.user.pk, ['café'], set(search.MODELS), 20)
+        # Primero el que lo tiene en el nombre; nunca registros de otro usuario
+        self.assertEqual([(label, pk) for label, pk, _ in hits],
+                         [('egresos_extra', self.cafe.pk), ('egresos_extra', self.pan.pk)])
+        self.assertEqual(search._fallback_hits(self.user.pk, ['café', 'pan'], {'egresos_extra'}, 20)[0][1],
+                         self.pan.pk)
+
+
+class ExportTests(TestCase):
+    """Exportación CSV: sin fórmulas ejecutables en los textos."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='exporta@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_csv_neutraliza_formulas(self):
+        EgresosExtra.objects.create(owner=self.user, name='=HYPERLINK("http://x")', reason='@SUM(A1)',
+                                    quantity=5, date=date(2025, 1, 5))
+        ahorro = Ahorros.objects.create(owner=self.user, name='+meta', reason='r', quantity=100, payment=10)
+        AhorroMovimiento.objects.create(owner=self.user, ahorro=ahorro, amount=-5, date=date(2025, 1, 6), note='\tretiro')
+        response = self.client.get('/api/export/transactions.csv')
+        body = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = {row[0]: row for row in csv.reader(io.StringIO(body))}
+        self.assertEqual(rows['egreso_extra'][3:5], ['\'=HYPERLINK("http://x")', "'@SUM(A1)"])
+        self.assertEqual(rows['ahorro_movimiento'][3], "'+meta")
+        self.assertEqual(rows['ahorro_movimiento'][5], '-5.00')  # Los montos no se tocan
+        self.assertEqual(rows['ahorro_movimiento'][7], "'\tretiro")
+
+
+class JobQueueTests(TestCase):
+    """Cola de trabajos: latidos y re-encolado de workers caídos."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='cola@example.com', password='x')
+        self.job = jobs.enqueue(self.user, 'rebuild_rollups')
+
+    def age(self, seconds, **fields):
+        # Retrocede el reloj del trabajo `seconds` segundos
+        past = timezone.now() - timedelta(seconds=seconds)
+        ReportJob.objects.filter(pk=self.job.pk).update(**{name: past for name in fields})
+
+    def test_worker_vivo_no_se_reencola(self):
+        claimed = jobs.claim('a')
+        self.age(3600, started_at=True)
+        self.assertTrue(jobs.heartbeat(claimed))
+        self.assertEqual(jobs.requeue_stale(600), 0)
+        self.assertEqual(ReportJob.objects.get(pk=self.job.pk).status, ReportJob.RUNNING)
+
+    def test_sin_latido_vuelve_a_la_cola(self):
+        claimed = jobs.claim('a')
+        self.age(3600, started_at=True, heartbeat_at=True)
+        self.assertEqual(jobs.requeue_stale(600), 1)
+        self.assertEqual(ReportJob.objects.get(pk=self.job.pk).status, ReportJob.PENDING)
+        # El worker original ya no puede latir ni cerrar el trabajo que tomó otro
+        self.assertFalse(jobs.heartbeat(claimed))
+        again = jobs.claim('b')
+        self.assertEqual(again.pk, self.job.pk)
+        jobs.execute(claimed)
+        self.assertEqual(ReportJob.objects.get(pk=self.job.pk).status, ReportJob.RUNNING)
+        self.assertTrue(jobs.execute(again))
+        self.assertEqual(ReportJob.objects.get(pk=self.job.pk).status, ReportJob.DONE)
+
+    def test_latidos_durante_la_ejecucion(self):
+        beats = []
+
+        @jobs.handler('test_lento')
+        def slow(job):
+            for _ in range(50):
+                if beats:
+                    break
+                time.sleep(0.02)
+            return {}
+
+        self.addCleanup(jobs.HANDLERS.pop, 'test_lento', None)
+        with mock.patch.object(jobs, 'heartbeat', side_effect=lambda job: beats.append(job.pk)):
+            self.job = jobs.enqueue(self.user, 'test_lento', priority=1)
+            self.assertTrue(jobs.execute(jobs.claim('a'), interval=0.01))
+        self.assertIn(self.job.pk, beats)
+
+
+class RollupTests(RollupAssertionsMixin, TestCase):
+    """Rollups mensuales: cada escritura de la API deja lo mismo que `rollups.rebuild`."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='rollups@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, url, data):
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def test_alta_edicion_y_borrado(self):
+        extra = self.post('/api/IngresosExtra/', {'name': 'Sueldo', 'reason': 'r', 'quantity': '100.00',
+                                                  'date': '2025-01-31'})
+        self.post('/api/EgresosExtra/', {'name': 'Cafe', 'reason': 'r', 'quantity': '3.50', 'date': '2025-01-05'})
+        fijo = self.post('/api/EgresosFijos/', {'name': 'Renta', 'reason': 'r', 'quantity': '500.00',
+                                                'period': 'Mensual'})
+        self.post('/api/prestamos/', {'name': 'Auto', 'reason': 'r', 'quantity': '1000.00', 'payment': '100.00'})
+        self.assertRollupsMatchRebuild(self.user)
+
+        # Cambio de mes y de monto: sale de enero y entra en febrero
+        response = self.client.patch(f'/api/IngresosExtra/{extra}/', {'date': '2025-02-01', 'quantity': '80.00'},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.patch(f'/api/EgresosFijos/{fijo}/', {'quantity': '450.00'}, format='json')
+        self.assertRollupsMatchRebuild(self.user)
+        months = dict(MonthlyRollup.objects.filter(owner=self.user, category='ingresos_extra')
+                      .values_list('month', 'total'))
+        self.assertEqual(months.get(date(2025, 1, 1), 0), 0)
+        self.assertEqual(months[date(2025, 2, 1)], Decimal('80.00'))
+
+        self.assertEqual(self.client.delete(f'/api/IngresosExtra/{extra}/').status_code, 204)
+        self.assertEqual(self.client.delete(f'/api/EgresosFijos/{fijo}/').status_code, 204)
+        self.assertRollupsMatchRebuild(self.user)
+
+    def test_resumen_desde_rollups(self):
+        for day, quantity in (('2025-01-10', '10.00'), ('2025-02-15', '20.00'), ('2025-03-20', '40.00')):
+            self.post('/api/IngresosExtra/', {'name': 'x', 'reason': 'r', 'quantity': quantity, 'date': day})
+        response = self.client.get('/api/reports/summary/')
+        self.assertEqual(response.data['ingresos']['extra'], 70.0)
+        # Rango que corta enero y marzo: meses completos del rollup + bordes de la tabla
+        response = self.client.get('/api/reports/summary/', {'start': '2025-01-11', 'end': '2025-03-20'})
+        self.assertEqual(response.data['ingresos']['extra'], 60.0)
+
+
+class ReportQueryTests(TestCase):
+    """Motor de agregación: mismos totales que sumar las tablas, en una sola consulta."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='motor@example.com', password='x')
+        other = User.objects.create_user(email='ajeno@example.com', password='x')
+        for owner in (self.user, other):
+            for model, step in ((IngresosExtra, 3), (EgresosExtra, 5)):
+                model.objects.bulk_create([
+                    model(owner=owner, name='m', reason='r', quantity=Decimal(i) + Decimal('0.25'),
+                          date=date(2024, 11, 1) + timedelta(days=i * step))
+                    for i in range(40)
+                ])
+        rollups.rebuild()
+
+    def expected(self, model, start, end):
+        rows = model.objects.filter(owner=self.user)
+        if start:
+            rows = rows.filter(date__gte=start)
+        if end:
+            rows = rows.filter(date__lte=end)
+        return sum((row.quantity for row in rows), Decimal(0))
+
+    def test_totales_por_rango(self):
+        query = ReportQuery(['ingresos_extra', 'egresos_extra'])
+        ranges = [(None, None), (date(2024, 11, 1), date(2025, 2, 28)), (date(2024, 11, 17), date(2025, 1, 3)),
+                  (date(2024, 12, 5), date(2024, 12, 20)), (None, date(2025, 1, 15)), (date(2025, 1, 15), None)]
+        for start, end in ranges:
+            with self.subTest(start=start, end=end), self.assertNumQueries(1):
+                totals = query.totals(self.user, start, end)
+            self.assertEqual(totals['ingresos_extra'], self.expected(IngresosExtra, start, end))
+            self.assertEqual(totals['egresos_extra'], self.expected(EgresosExtra, start, end))
+
+    def test_buckets_mensuales(self):
+        start, end = date(2024, 11, 20), date(2025, 1, 10)
+        months = ReportQuery(['ingresos_extra'], granularity='month').run(self.user, start, end)
+        self.assertEqual(sorted(months), [date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1)])
+        self.assertEqual(months[date(2024, 12, 1)]['ingresos_extra'],
+                         self.expected(IngresosExtra, date(2024, 12, 1), date(2024, 12, 31)))
+        self.assertEqual(sum(m['ingresos_extra'] for m in months.values()),
+                         self.expected(IngresosExtra, start, end))
+
+    def test_metrica_desconocida(self):
+        with self.assertRaises(ValueError):
+            ReportQuery(['no_existe'])
+
+
+class CashflowSeriesTests(TestCase):
+    """Serie de flujo de caja: un valor por periodo del rango, con ceros en los huecos."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='flujo@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_dense_rellena_huecos(self):
+        buckets = {date(2025, 1, 1): {'ingresos_extra': Decimal('10')},
+                   date(2025, 4, 1): {'ingresos_extra': Decimal('5'), 'egresos_extra': Decimal('2')}}
+        periods, columns = report_series.dense(buckets, ['ingresos_extra', 'egresos_extra'], 'month')
+        self.assertEqual(periods.astype(str).tolist(), ['2025-01-01', '2025-02-01', '2025-03-01', '2025-04-01'])
+        self.assertEqual(columns['ingresos_extra'].tolist(), [10, 0, 0, 5])
+        self.assertEqual(columns['egresos_extra'].tolist(), [0, 0, 0, 2])
+
+    def test_semanas_alineadas_al_lunes(self):
+        # 2025-01-01 fue miércoles: la primera semana empieza el lunes 2024-12-30
+        starts = report_series.bucket_starts('week', date(2025, 1, 1), date(2025, 1, 13))
+        self.assertEqual(starts.astype(str).tolist(), ['2024-12-30', '2025-01-06', '2025-01-13'])
+        self.assertEqual(str(report_series.bucket_end(starts[0], 'week')), '2025-01-05')
+        self.assertEqual(report_series.align([date(2025, 5, 17)], 'quarter').astype(str).tolist(), ['2025-04-01'])
+
+    def test_endpoint(self):
+        IngresosExtra.objects.create(owner=self.user, name='a', reason='r', quantity=10, date=date(2025, 1, 2))
+        EgresosExtra.objects.create(owner=self.user, name='b', reason='r', quantity=4, date=date(2025, 1, 15))
+        response = self.client.get('/api/reports/cashflow/', {'start': '2025-01-01', 'end': '2025-01-21',
+                                                               'granularity': 'week'})
+        self.assertEqual(response.status_code, 200)
+        series = response.data['series']
+        self.assertEqual(series['period'], ['2024-12-30', '2025-01-06', '2025-01-13', '2025-01-20'])
+        self.assertEqual(series['ingresos_extra'], [10.0, 0.0, 0.0, 0.0])
+        self.assertEqual(series['neto_extra'], [10.0, 0.0, -4.0, 0.0])
+
+    def test_demasiados_periodos(self):
+        response = self.client.get('/api/reports/cashflow/', {'start': '1900-01-01', 'end': '2025-01-01',
+                                                               'granularity': 'day'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('granularity', response.data)
+
+
+class ProjectionTests(TestCase):
+    """Proyección de Fijos: periodo, date_start y date_end."""
+
+    def dates(self, items, start, end):
+        return items.occurrences(start, end)[0].astype(str).tolist()
+
+    def test_fin_de_mes_se_recorta(self):
+        items = RecurringItems.from_rows([(10, 'Mensual', date(2025, 1, 31), None)])
+        self.assertEqual(self.dates(items, date(2025, 1, 1), date(2025, 4, 30)),
+                         ['2025-01-31', '2025-02-28', '2025-03-31', '2025-04-30'])
+
+    def test_vigencia_inclusiva(self):
+        items = RecurringItems.from_rows([(10, 'Mensual', date(2025, 1, 15), date(2025, 3, 15))])
+        self.assertEqual(self.dates(items, date(2024, 1, 1), date(2025, 12, 31)),
+                         ['2025-01-15', '2025-02-15', '2025-03-15'])
+        # Ventana antes de date_start o después de date_end: nada
+        self.assertEqual(items.counts(date(2024, 1, 1), date(2025, 1, 14)).tolist(), [0])
+        self.assertEqual(items.counts(date(2025, 3, 16), date(2025, 12, 31)).tolist(), [0])
+
+    def test_sin_fecha_de_inicio(self):
+        # Periodos en días caen en lunes, en meses el día 1
+        items = RecurringItems.from_rows([(5, 'Semanal', None, None), (7, 'Trimestral', None, None)])
+        quarterly = RecurringItems.from_rows([(7, 'Trimestral', None, None)])
+        self.assertEqual(self.dates(quarterly, date(2025, 1, 2), date(2025, 7, 1)), ['2025-04-01', '2025-07-01'])
+        self.assertEqual(items.counts(date(2025, 1, 6), date(2025, 1, 19)).tolist(), [2, 0])
+        self.assertEqual(items.total(date(2025, 1, 1), date(2025, 12, 31)), 5 * 52 + 7 * 4)
+
+    def test_periodos(self):
+        self.assertEqual(parse_period(' ANUAL '), ('M', 12))
+        self.assertEqual(parse_period('Quincenal'), ('D', 15))
+        self.assertEqual(parse_period('cada tanto'), ('M', 1))  # Desconocido: mensual, como el modelo
+
+    def test_buckets_igual_que_ocurrencias(self):
+        items = RecurringItems.from_rows([
+            (1, 'Diario', date(2025, 1, 3), None), (10, 'Quincenal', date(2024, 12, 20), date(2025, 5, 1)),
+            (100, 'Bimestral', date(2025, 2, 28), None),
+        ])
+        periods = report_series.bucket_starts('month', date(2025, 1, 1), date(2025, 6, 30))
+        dates, amounts = items.occurrences(date(2025, 1, 10), date(2025, 6, 30))
+        expected = [amounts[dates.astype('datetime64[M]') == p.astype('datetime64[M]')].sum() for p in periods]
+        totals = items.bucket_totals(periods, date(2025, 6, 30), date(2025, 1, 10))
+        self.assertEqual(totals.tolist(), expected)
+
+    def test_resumen_proyecta_fijos(self):
+        user = User.objects.create_user(email='fijos@example.com', password='x')
+        EgresosFijos.objects.create(owner=user, name='Renta', reason='r', quantity=500, period='Mensual',
+                                    date_start=date(2025, 1, 15), date_end=date(2025, 3, 15))
+        rollups.rebuild([user.pk])
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/api/reports/summary/').data['egresos']['fijos'], 500.0)
+        response = client.get('/api/reports/summary/', {'start': '2025-01-01', 'end': '2025-12-31'})
+        self.assertEqual(response.data['egresos']['fijos'], 1500.0)
+
+
+class BalanceTests(TestCase):
+    """Saldo acumulado: función de ventana, suma en Python y saldo inicial."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='saldo@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for day, quantity in ((date(2025, 1, 5), 100), (date(2025, 1, 5), 50), (date(2025, 2, 10), 30)):
+            IngresosExtra.objects.create(owner=self.user, name='i', reason='r', quantity=quantity, date=day)
+        for day, quantity in ((date(2025, 1, 20), 40), (date(2025, 2, 10), 10)):
+            EgresosExtra.objects.create(owner=self.user, name='e', reason='r', quantity=quantity, date=day)
+        rollups.rebuild([self.user.pk])
+
+    def test_ventana_igual_que_suma_acumulada(self):
+        for start in (None, date(2025, 1, 10)):
+            days, window, opening = report_balance.running_balance(self.user, start, window=True)
+            _, python, _ = report_balance.running_balance(self.user, start, window=False)
+            self.assertEqual(window.tolist(), python.tolist())
+        self.assertEqual(days.astype(str).tolist(), ['2025-01-20', '2025-02-10'])
+        self.assertEqual((opening, window.tolist()), (150.0, [110.0, 130.0]))
+
+    def test_endpoint(self):
+        response = self.client.get('/api/reports/balance/', {'start': '2025-01-10', 'max_points': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['opening_balance'], 150.0)
+        self.assertEqual(response.data['series'], {'date': ['2025-01-20', '2025-02-10'], 'balance': [110.0, 130.0]})
+        self.assertEqual(self.client.get('/api/reports/balance/', {'max_points': 1}).status_code, 400)
+
+    def test_reduccion_conserva_el_ultimo_de_cada_tramo(self):
+        days = np.arange(np.datetime64('2025-01-01'), np.datetime64('2025-01-11'))
+        kept, values = report_balance.downsample(days, np.arange(10.0), 3)
+        self.assertEqual(values.tolist(), [3.0, 6.0, 9.0])
+        self.assertEqual(str(kept[-1]), '2025-01-10')
+
+
+class AdminWriteTests(RollupAssertionsMixin, TestCase):
+    """Altas, ediciones y borrados desde el admin: mismos rollups, versión y sync que la API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='datos@example.com', password='x')
+        self.other = User.objects.create_user(email='otros@example.com', password='x')
+        self.admin = Client()
+        self.admin.force_login(User.objects.create_superuser(email='admin@example.com', password='x'))
+
+    def form(self, owner, **fields):
+        return {'owner': owner.pk, 'name': 'Sueldo', 'reason': 'r', 'quantity': '100.00', 'date': '2025-01-05',
+                **fields}
+
+    def test_alta_edicion_y_borrado(self):
+        url = '/admin/ingresos/ingresosextra/'
+        response = self.admin.post(f'{url}add/', self.form(self.user))
+        self.assertEqual(response.status_code, 302)
+        obj = IngresosExtra.objects.get(owner=self.user)
+        self.assertRollupsMatchRebuild(self.user)
+        version = tracking.get_version(self.user.pk)
+
+        self.admin.post(f'{url}{obj.pk}/change/', self.form(self.user, quantity='80.00', date='2025-02-01'))
+        self.assertRollupsMatchRebuild(self.user)
+        self.assertGreater(tracking.get_version(self.user.pk), version)
+        obj.refresh_from_db()
+        self.assertEqual((obj.quantity, obj.seq), (Decimal('80.00'), tracking.get_version(self.user.pk)))
+
+        self.admin.post(f'{url}{obj.pk}/delete/', {'post': 'yes'})
+        self.assertFalse(IngresosExtra.objects.exists())
+        self.assertRollupsMatchRebuild(self.user)
+        self.assertTrue(Tombstone.objects.filter(owner=self.user, object_id=obj.pk).exists())
+
+    def test_cambio_de_dueno(self):
+        self.admin.post('/admin/ingresos/ingresosextra/add/', self.form(self.user))
+        obj = IngresosExtra.objects.get()
+        self.admin.post(f'/admin/ingresos/ingresosextra/{obj.pk}/change/', self.form(self.other))
+        self.assertEqual(IngresosExtra.objects.get().owner, self.other)
+        self.assertRollupsMatchRebuild(self.user)
+        self.assertRollupsMatchRebuild(self.other)
+        self.assertTrue(Tombstone.objects.filter(owner=self.user, object_id=obj.pk).exists())
+
+    def test_eliminar_seleccionados(self):
+        for owner in (self.user, self.other):
+            for _ in range(2):
+                self.admin.post('/admin/egresos/egresosfijos/add/',
+                                {'owner': owner.pk, 'name': 'Renta', 'reason': 'r', 'quantity': '50.00',
+                                 'period': 'Mensual'})
+        ids = list(EgresosFijos.objects.values_list('pk', flat=True))
+        versions = [tracking.get_version(u.pk) for u in (self.user, self.other)]
+        response = self.admin.post('/admin/egresos/egresosfijos/',
+                                   {'action': 'delete_selected', '_selected_action': ids, 'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(EgresosFijos.objects.exists())
+        for user, version in zip((self.user, self.other), versions):
+            self.assertRollupsMatchRebuild(user)
+            self.assertEqual(tracking.get_version(user.pk), version + 1)
+        self.assertEqual(Tombstone.objects.filter(model='egresos_fijos').count(), 4)
+
+
+class ConditionalGetTests(TestCase):
+    """ETag por versión de datos: 304 sin cambios y 200 con datos nuevos tras cualquier escritura."""
+
+    URLS = ['/api/IngresosExtra/', '/api/IngresosFijos/', '/api/EgresosExtra/', '/api/EgresosFijos/',
+            '/api/reports/summary/', '/api/reports/cashflow/monthly/', '/api/reports/cashflow/',
+            '/api/reports/balance/']
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='etag@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.add('10.00')
+
+    def add(self, quantity):
+        response = self.client.post('/api/IngresosExtra/', {'name': 'x', 'reason': 'r', 'quantity': quantity,
+                                                            'date': '2025-01-05'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def etags(self):
+        out = {}
+        for url in self.URLS:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            out[url] = response['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=out[url]).status_code, 304, url)
+        return out
+
+    def assertAllChanged(self, etags):
+        for url, etag in etags.items():
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200, url)
+
+    def test_escritura_por_la_api(self):
+        etags = self.etags()
+        self.add('5.00')
+        self.assertAllChanged(etags)
+        self.assertEqual(self.client.get('/api/reports/summary/').data['ingresos']['extra'], 15.0)
+
+    def test_escritura_por_el_admin(self):
+        etags = self.etags()
+        admin = Client()
+        admin.force_login(User.objects.create_superuser(email='admin-etag@example.com', password='x'))
+        obj = IngresosExtra.objects.get(owner=self.user)
+        admin.post(f'/admin/ingresos/ingresosextra/{obj.pk}/change/',
+                   {'owner': self.user.pk, 'name': 'x', 'reason': 'r', 'quantity': '30.00', 'date': '2025-01-05'})
+        self.assertAllChanged(etags)
+        self.assertEqual(self.client.get('/api/reports/summary/').data['ingresos']['extra'], 30.0)
+        self.assertEqual(self.client.get('/api/reports/balance/').data['series']['balance'], [30.0])
+
+    def test_otro_usuario_no_invalida(self):
+        etags = self.etags()
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='otro-etag@example.com', password='x'))
+        other.post('/api/IngresosExtra/', {'name': 'y', 'reason': 'r', 'quantity': '1', 'date': '2025-01-05'},
+                   format='json')
+        for url, etag in etags.items():
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, url)
+
+
+class LedgerTests(QueryBudgetMixin, TestCase):
+    """/api/ledger/: intercalado de las tres fuentes, orden total (fecha, fuente, id) y cursor."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='libro@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ahorro = Ahorros.objects.create(owner=self.user, name='meta', reason='r', quantity=100, payment=10)
+        # Pocas fechas para forzar empates entre fuentes y dentro de cada fuente
+        for i in range(12):
+            day = date(2025, 1, 1 + i % 4)
+            IngresosExtra.objects.create(owner=self.user, name=f'i{i}', reason='r', quantity=1, date=day)
+            EgresosExtra.objects.create(owner=self.user, name=f'e{i}', reason='r', quantity=1, date=day)
+            AhorroMovimiento.objects.create(owner=self.user, ahorro=self.ahorro, amount=1, date=date(2025, 1, 4 - i % 3))
+        otro = User.objects.create_user(email='libro-otro@example.com', password='x')
+        IngresosExtra.objects.create(owner=otro, name='ajeno', reason='r', quantity=1, date=date(2025, 1, 2))
+
+    def expected(self):
+        rows = [(row.date, rank, row.pk, label)
+                for rank, (label, model) in enumerate((('ingresos_extra', IngresosExtra),
+                                                       ('egresos_extra', EgresosExtra),
+                                                       ('ahorro_movimientos', AhorroMovimiento)))
+                for row in model.objects.filter(owner=self.user)]
+        return [(label, pk, day.isoformat()) for day, rank, pk, label in sorted(rows, reverse=True)]
+
+    def walk(self, page_size, types=None):
+        params = {'page_size': page_size}
+        if types:
+            params['types'] = types
+        response = self.client.get('/api/ledger/', params)
+        pages = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([(item['type'], item['id'], item['date']) for item in response.data['results']])
+            if response.data['next'] is None:
+                return pages
+            response = self.client.get(response.data['next'])
+
+    def test_primera_pagina_intercala_las_fuentes(self):
+        results = self.client.get('/api/ledger/', {'page_size': 10}).data['results']
+        self.assertEqual([(r['type'], r['id'], r['date']) for r in results], self.expected()[:10])
+        self.assertEqual({r['type'] for r in results}, {'ingresos_extra', 'egresos_extra', 'ahorro_movimientos'})
+
+    def test_empate_del_mismo_dia(self):
+        day = [item for item in self.expected() if item[2] == '2025-01-04']
+        # Mismo día: primero la última fuente de SOURCES y dentro de cada fuente el id mayor
+        self.assertEqual([label for label, _, _ in day],
+                         sorted((label for label, _, _ in day),
+                                key=['ingresos_extra', 'egresos_extra', 'ahorro_movimientos'].index, reverse=True))
+        results = self.client.get('/api/ledger/', {'page_size': len(day)}).data['results']
+        self.assertEqual([(r['type'], r['id'], r['date']) for r in results], day)
+
+    def test_recorrer_todas_las_paginas(self):
+        for page_size in (1, 5, 7, 36, 500):
+            pages = self.walk(page_size)
+            flat = [item for items in pages for item in items]
+            self.assertEqual(flat, self.expected(), page_size)  # Sin duplicados ni huecos
+            self.assertTrue(all(len(items) == page_size for items in pages[:-1]))
+            self.assertEqual(len(pages), -(-len(flat) // page_size))
+
+    def test_filtro_por_tipo(self):
+        flat = [item for items in self.walk(5, 'egresos_extra,ahorro_movimientos') for item in items]
+        self.assertEqual(flat, [item for item in self.expected() if item[0] != 'ingresos_extra'])
+        self.assertEqual(self.client.get('/api/ledger/', {'types': 'ingresos_fijos'}).status_code, 400)
+
+    def test_cursor_invalido(self):
+        raw = [
+            '%%%', 'bm8tZXMtanNvbg', 'eyJhIjogMX0',  # No es base64 / no es JSON / no es una lista
+            encode_cursor(['2025-01-01', 0]),
+            encode_cursor(['2025-01-01', 9, 1]),
+            encode_cursor(['2025-01-01', '0', 1]),
+            encode_cursor(['2025-13-40', 0, 1]),
+            encode_cursor([None, 0, 1]),
+            encode_cursor(['2025-01-01', 0, 'abc']),
+            encode_cursor(['2025-01-01', 0, [1]]),
+            encode_cursor(['2025-01-01', 0, 10 ** 30]),  # No cabe en un entero de SQLite
+        ]
+        for cursor in raw:
+            response = self.client.get('/api/ledger/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertIn('cursor', response.data)
+
+    def test_consultas_no_crecen_con_la_pagina(self):
+        response = self.client.get('/api/ledger/', {'page_size': 2})
+        first = response.data['next']
+        while response.data['next']:
+            deep = response.data['next']
+            response = self.client.get(deep)
+        self.assertEqual(self.count_queries(lambda: self.client.get(first)),
+                         self.count_queries(lambda: self.client.get(deep)))
+
+
+@override_settings(COMPRESSION_MIN_LENGTH=200)
+class CompressionTests(TestCase):
+    """CompressionMiddleware: negociación, umbral, exclusiones, streaming y ETag débil."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='gzip@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(20):
+            IngresosExtra.objects.create(owner=self.user, name=f'sueldo {i}', reason='mes', quantity=i,
+                                         date=date(2025, 1, 1 + i))
+
+    def process(self, response, path='/api/x/', accept='gzip'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept)
+        return middleware.CompressionMiddleware(lambda request: response)(request)
+
+    def big(self):
+        return JsonResponse({'rows': ['fila'] * 200})
+
+    def test_accepted_encodings(self):
+        cases = {
+            'gzip, br': {'gzip', 'br'},
+            'gzip;q=0, br': {'br'},
+            'GZIP;q=0.5': {'gzip'},
+            '*': {'*', 'gzip', 'br'},
+            '*;q=0.1, br;q=0': {'*', 'gzip'},
+            'gzip;q=abc': set(),
+            'identity': {'identity'},
+            '': set(),
+        }
+        for header, expected in cases.items():
+            self.assertEqual(middleware.accepted_encodings(header), expected, header)
+
+    def test_bajo_el_umbral_no_se_comprime(self):
+        response = self.process(JsonResponse({'ok': True}))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, b'{"ok": true}')
+
+    def test_gzip_rechazado_con_q0(self):
+        response = self.process(self.big(), accept='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])  # La caché intermedia debe distinguirlo igual
+
+    @mock.patch.object(middleware, 'brotli', None)
+    def test_sin_brotli_se_usa_gzip(self):
+        self.assertEqual(self.process(self.big(), accept='br, gzip')['Content-Encoding'], 'gzip')
+        self.assertFalse(self.process(self.big(), accept='br').has_header('Content-Encoding'))
+
+    @unittest.skipIf(middleware.brotli is None, 'brotli no instalado')
+    def test_brotli_preferido(self):
+        response = self.process(self.big(), accept='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(middleware.brotli.decompress(response.content)), {'rows': ['fila'] * 200})
+
+    def test_rutas_de_autenticacion_excluidas(self):
+        for path in ('/api/auth/login/', '/api/auth/me/', '/api-auth/login/'):
+            self.assertFalse(self.process(self.big(), path=path).has_header('Content-Encoding'), path)
+        response = self.client.get('/api/auth/me/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_html_y_xlsx_sin_comprimir(self):
+        html = self.process(HttpResponse('<p>x</p>' * 200, content_type='text/html; charset=utf-8'))
+        self.assertFalse(html.has_header('Content-Encoding'))
+        browsable = self.client.get('/api/IngresosExtra/', HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(browsable.has_header('Content-Encoding'))
+        xlsx = self.client.get('/api/export/transactions.xlsx', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(xlsx.status_code, 200)
+        self.assertFalse(xlsx.has_header('Content-Encoding'))
+
+    def test_json_de_la_api(self):
+        plain = self.client.get('/api/IngresosExtra/')
+        response = self.client.get('/api/IngresosExtra/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_csv_streaming_por_bloques(self):
+        def rows():
+            for i in range(50):
+                yield f'{i};fila {i}\n'.encode()
+        response = self.process(StreamingHttpResponse(rows(), content_type='text/csv'))
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.has_header('Content-Length'))
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)  # Bloque a bloque, sin juntar el cuerpo
+        self.assertEqual(gzip.decompress(b''.join(chunks)), b''.join(rows()))
+
+        plain = self.client.get('/api/export/transactions.csv')
+        response = self.client.get('/api/export/transactions.csv', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(plain.streaming_content))
+
+    def test_etag_debil_y_304(self):
+        strong = self.client.get('/api/IngresosExtra/')['ETag']
+        self.assertTrue(strong.startswith('"'))
+        response = self.client.get('/api/IngresosExtra/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['ETag'], 'W/' + strong)
+        again = self.client.get('/api/IngresosExtra/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertFalse(again.has_header('Content-Encoding'))
+
+
+class FastListParityTests(TestCase):
+    """Listados rápidos (fastlist): mismo JSON que el ModelSerializer(many=True) de cada endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='paridad@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        amounts = [Decimal('7.5'), Decimal('0'), Decimal('-0.01'), Decimal('12345678.99'), Decimal('3')]
+        for i, amount in enumerate(amounts):
+            day = date(2025, 1, 1 + i)
+            IngresosExtra.objects.create(owner=self.user, name=f'extra {i}', reason='', quantity=amount, date=day)
+            EgresosExtra.objects.create(owner=self.user, name=f'extra {i}', reason='r', quantity=amount, date=day)
+            # Fechas opcionales vacías (null) en la mitad de las filas
+            dates = {'date_start': day, 'date_end': date(2025, 12, 31)} if i % 2 else {}
+            IngresosFijos.objects.create(owner=self.user, name=f'fijo {i}', reason='r', quantity=amount, **dates)
+            EgresosFijos.objects.create(owner=self.user, name=f'fijo {i}', reason='r', quantity=amount, **dates)
+        self.ahorro = Ahorros.objects.create(owner=self.user, name='meta', reason='r', quantity=100, payment=10)
+        stamps = [datetime(2025, 3, 1, 12, 0, 0, 123456, tzinfo=dt_timezone.utc),
+                  datetime(2025, 3, 1, 12, 0, 0, tzinfo=dt_timezone.utc),
+                  datetime(2025, 3, 1, 23, 59, 59, 1, tzinfo=dt_timezone.utc)]
+        for i, (amount, stamp) in enumerate(zip(amounts, stamps)):
+            movimiento = AhorroMovimiento.objects.create(owner=self.user, ahorro=self.ahorro, amount=amount,
+                                                         date=date(2025, 2, 1 + i), note='' if i else 'nota')
+            AhorroMovimiento.objects.filter(pk=movimiento.pk).update(created_at=stamp)  # auto_now_add lo pisa
+
+    def assertParity(self, url, serializer_class, queryset, params=None):
+        expected = json.loads(JSONRenderer().render(serializer_class(queryset, many=True).data))
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, url)
+        body = json.loads(response.content)
+        self.assertEqual(body['results'] if params else body, expected, url)
+        return expected
+
+    def endpoints(self):
+        return [
+            ('/api/IngresosFijos/', IngresosFijosSerializer, self.user.ingresos_fijos.order_by('-id')),
+            ('/api/IngresosExtra/', IngresosExtraSerializer, self.user.ingresos_extra.order_by('-date', '-id')),
+            ('/api/EgresosFijos/', EgresosFijosSerializer, self.user.egresos_fijos.order_by('-id')),
+            ('/api/EgresosExtra/', EgresosExtraSerializer, self.user.egresos_extra.order_by('-date', '-id')),
+            (f'/api/ahorros/{self.ahorro.pk}/movimientos/', AhorroMovimientoSerializer,
+             self.ahorro.movimientos.order_by('-date', '-id')),
+        ]
+
+    def test_listados_y_paginas(self):
+        for url, serializer_class, queryset in self.endpoints():
+            self.assertIsNotNone(fastlist.compile_encoder(serializer_class), url)
+            self.assertParity(url, serializer_class, queryset)
+            if 'Fijos' not in url:  # Cursor opt-in solo en los listados por fecha
+                self.assertParity(url, serializer_class, queryset, {'page_size': 100})
+
+    def test_decimales_fechas_y_nulos(self):
+        body = self.assertParity('/api/IngresosFijos/', IngresosFijosSerializer, self.user.ingresos_fijos.order_by('-id'))
+        self.assertEqual([row['quantity'] for row in body], ['3.00', '12345678.99', '-0.01', '0.00', '7.50'])
+        self.assertEqual([row['date_end'] for row in body], [None, '2025-12-31', None, '2025-12-31', None])
+        self.assertEqual({row['owner'] for row in body}, {'paridad@example.com'})
+        body = self.assertParity(f'/api/ahorros/{self.ahorro.pk}/movimientos/', AhorroMovimientoSerializer,
+                                 self.ahorro.movimientos.order_by('-date', '-id'))
+        self.assertEqual([row['created_at'] for row in body],
+                         ['2025-03-01T23:59:59.000001Z', '2025-03-01T12:00:00Z', '2025-03-01T12:00:00.123456Z'])
+
+    def test_otra_zona_horaria(self):
+        with timezone.override('America/Bogota'):
+            body = self.assertParity(f'/api/ahorros/{self.ahorro.pk}/movimientos/', AhorroMovimientoSerializer,
+                                     self.ahorro.movimientos.order_by('-date', '-id'))
+        self.assertEqual(body[0]['created_at'], '2025-03-01T18:59:59.000001-05:00')
+
+    def test_campos_que_no_son_columnas_usan_el_serializer(self):
+        class ConEtiqueta(IngresosExtraSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta(IngresosExtraSerializer.Meta):
+                fields = IngresosExtraSerializer.Meta.fields + ['label']
+
+            def get_label(self, obj):
+                return f'{obj.name}: {obj.quantity}'
+
+        self.assertIsNone(fastlist.compile_encoder(ConEtiqueta))
+        with mock.patch.object(IngresosExtraApiViewSet, 'serializer_class', ConEtiqueta):
+            body = self.assertParity('/api/IngresosExtra/', ConEtiqueta, self.user.ingresos_extra.order_by('-date', '-id'))
+        self.assertEqual(body[-1]['label'], 'extra 0: 7.50')
+
+
+@unittest.skipIf(renderers.orjson is None, 'orjson no instalado')
+class FastJSONTests(TestCase):
+    """FastJSONRenderer/FastJSONParser: mismos bytes y mismos errores que los de DRF."""
+
+    def assertSameRender(self, data, media_type=None, context=None):
+        expected = JSONRenderer().render(data, media_type, context)
+        self.assertEqual(renderers.FastJSONRenderer().render(data, media_type, context), expected)
+        return expected
+
+    def test_tipos_de_drf(self):
+        cases = [
+            {'a': Decimal('1.50'), 'b': Decimal('-0.00'), 'c': Decimal('1E+3')},
+            [datetime(2025, 1, 1, 12, 0, 0, 123456, tzinfo=dt_timezone.utc),
+             datetime(2025, 1, 1, 12, tzinfo=dt_timezone.utc),
+             datetime(2025, 1, 1, 7, tzinfo=dt_timezone(timedelta(hours=-5)))],
+            [datetime(2025, 1, 1, 12, 0, 0, 123456), datetime(2025, 1, 1), date(2025, 1, 2)],
+            [timedelta(days=1, seconds=3.5), timedelta(0)],
+            {'detail': gettext_lazy('This field is required.')},
+            {1: 'a', None: 'b'},
+            'a\u2028b\u2029c ñ €',
+            [2 ** 64, -2 ** 63 - 1, 2 ** 63 - 1],
+            {'serie': np.array([1.0, 2.5]), 'n': np.int64(3)},
+        ]
+        for data in cases:
+            self.assertSameRender(data)
+        self.assertEqual(self.assertSameRender('\u2028\u2029'), b'"\\u2028\\u2029"')
+        self.assertEqual(self.assertSameRender({'id': 2 ** 64}), b'{"id":18446744073709551616}')
+
+    def test_diferencias_conocidas(self):
+        # Floats con exponente: otra notación, mismo número
+        data = [0.1, 1e20, 1.5e-7]
+        fast = renderers.FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        # NaN/Infinity: null en lugar del ValueError de DRF
+        self.assertEqual(renderers.FastJSONRenderer().render([float('nan')]), b'[null]')
+
+    def test_sangria_y_api_navegable_delegan_en_drf(self):
+        data = {'a': [1, Decimal('2.5')]}
+        with mock.patch.object(renderers, 'orjson', wraps=renderers.orjson) as fast:
+            indented = self.assertSameRender(data, 'application/json; indent=4')
+            self.assertSameRender(data, None, {'indent': 2})
+            fast.dumps.assert_not_called()
+            self.assertSameRender(data)
+            fast.dumps.assert_called_once()
+        self.assertIn(b'\n    ', indented)
+
+        user = User.objects.create_user(email='navegable@example.com', password='x')
+        IngresosExtra.objects.create(owner=user, name='x', reason='r', quantity=1, date=date(2025, 1, 1))
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/IngresosExtra/', HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('&quot;quantity&quot;: &quot;1.00&quot;', response.content.decode())
+
+    def test_parser(self):
+        def parse(parser, raw, encoding='utf-8'):
+            return parser.parse(io.BytesIO(raw), 'application/json', {'encoding': encoding})
+
+        for raw in (b'{"a": [1, 2.5, "\xc3\xb1"], "b": null}', b'18446744073709551616', b'"\\u2028"'):
+            self.assertEqual(parse(renderers.FastJSONParser(), raw), parse(JSONParser(), raw))
+        for raw in (b'{"a": NaN}', b'[Infinity]', b'{', b''):
+            for parser in (JSONParser(), renderers.FastJSONParser()):
+                with self.assertRaises(ParseError, msg=raw):
+                    parse(parser, raw)
+        # Cuerpos que no son UTF-8: parser de DRF
+        self.assertEqual(parse(renderers.FastJSONParser(), '{"a": "ñ"}'.encode('latin-1'), 'latin-1'), {'a': 'ñ'})
+
+
+class ReportCacheTests(TestCase):
+    """Caché de reportes: HIT hasta la siguiente escritura del usuario, MISS justo después."""
+
+    URLS = ('/api/reports/summary/', '/api/reports/cashflow/monthly/', '/api/reports/balance/')
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='cache@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ahorro = self.post('/api/ahorros/', {'name': 'meta', 'reason': 'r', 'quantity': '100.00',
+                                                  'payment': '10.00', 'period': 'monthly'}).data['id']
+        self.ingreso = self.post('/api/IngresosExtra/', {'name': 'x', 'reason': 'r', 'quantity': '10.00',
+                                                         'date': '2025-01-05'}).data['id']
+
+    def post(self, url, data):
+        response = self.client.post(url, data, format='json')
+        self.assertIn(response.status_code, (200, 201), response.data)
+        return response
+
+    def cache_header(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response['X-Report-Cache']
+
+    def assertInvalidates(self, write):
+        for url in self.URLS:
+            self.cache_header(url)
+            self.assertEqual(self.cache_header(url), 'HIT', url)
+        response = write()
+        self.assertLess(response.status_code, 300, getattr(response, 'data', None))
+        for url in self.URLS:
+            self.assertEqual(self.cache_header(url), 'MISS', url)
+
+    def test_alta_edicion_y_borrado(self):
+        url = f'/api/IngresosExtra/{self.ingreso}/'
+        self.assertInvalidates(lambda: self.client.post('/api/IngresosExtra/', {
+            'name': 'y', 'reason': 'r', 'quantity': '5.00', 'date': '2025-01-06'}, format='json'))
+        self.assertEqual(self.client.get('/api/reports/summary/').data['ingresos']['extra'], 15.0)
+        self.assertInvalidates(lambda: self.client.patch(url, {'quantity': '20.00'}, format='json'))
+        self.assertEqual(self.client.get('/api/reports/summary/').data['ingresos']['extra'], 25.0)
+        self.assertInvalidates(lambda: self.client.delete(url))
+        self.assertEqual(self.client.get('/api/reports/summary/').data['ingresos']['extra'], 5.0)
+
+    def test_depositar_y_retirar(self):
+        self.assertInvalidates(lambda: self.client.post(f'/api/ahorros/{self.ahorro}/depositar/',
+                                                        {'amount': '4.50'}, format='json'))
+        self.assertInvalidates(lambda: self.client.post(f'/api/ahorros/{self.ahorro}/retirar/',
+                                                        {'amount': '1.00'}, format='json'))
+
+    def test_depositos_en_lote(self):
+        self.assertInvalidates(lambda: self.client.post('/api/ahorros/depositos/', [
+            {'ahorro_id': self.ahorro, 'amount': '2.00'}, {'ahorro_id': self.ahorro, 'amount': '3.00'},
+        ], format='json'))
+
+    def test_bulk(self):
+        self.assertInvalidates(lambda: self.client.post('/api/EgresosExtra/bulk/', [
+            {'name': 'a', 'reason': 'r', 'quantity': '1.00', 'date': '2025-01-07'},
+            {'name': 'b', 'reason': 'r', 'quantity': '2.00', 'date': '2025-01-08'},
+        ], format='json'))
+        ids = list(EgresosExtra.objects.filter(owner=self.user).values_list('id', flat=True))
+        self.assertInvalidates(lambda: self.client.patch('/api/EgresosExtra/bulk/', [
+            {'id': ids[0], 'quantity': '9.00'}], format='json'))
+        self.assertInvalidates(lambda: self.client.delete('/api/EgresosExtra/bulk/', ids, format='json'))
+
+    def test_escritura_fallida_no_invalida(self):
+        for url in self.URLS:
+            self.cache_header(url)
+        response = self.client.post('/api/EgresosExtra/bulk/', [{'name': 'a'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        for url in self.URLS:
+            self.assertEqual(self.cache_header(url), 'HIT', url)
+
+    def test_estadisticas_solo_admin(self):
+        url = '/api/reports/cache/stats/'
+        self.assertEqual(APIClient().get(url).status_code, 401)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.cache_header('/api/reports/summary/')
+        self.cache_header('/api/reports/summary/')
+        admin = APIClient()
+        admin.force_authenticate(User.objects.create_superuser(email='cache-admin@example.com', password='x'))
+        response = admin.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
@@ -0,0 +1,50 @@
+# reports/tracking.py
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from reports import rollups, sync
+from reports.models import DataVersion
+
+
+def get_version(owner_id) -> int:
+    """Versión actual de los datos del usuario (0 si nunca escribió)."""
+    return DataVersion.objects.filter(owner_id=owner_id).values_list('version', flat=True).first() or 0
+
+
+def get_marker(owner_id):
+    """`(versión, updated_at)` de los datos del usuario; `(0, None)` si nunca escribió."""
+    return DataVersion.objects.filter(owner_id=owner_id).values_list('version', 'updated_at').first() or (0, None)
+
+
+def bump_version(owner_id) -> int:
+    """Sube en uno la versión de datos del usuario y devuelve la nueva."""
+    now = timezone.now()
+    versions = DataVersion.objects.filter(owner_id=owner_id)
+    if not versions.update(version=F('version') + 1, updated_at=now):
+        try:
+            with transaction.atomic():
+                DataVersion.objects.create(owner_id=owner_id, version=1, updated_at=now)
+                return 1
+        except IntegrityError:
+            # Creado en paralelo por otra petición
+            versions.update(version=F('version') + 1, updated_at=now)
+    # La fila queda bloqueada por el UPDATE hasta el fin de la transacción
+    return versions.values_list('version', flat=True).get()
+
+
+def record_write(owner_id, before=(), after=(), changed=(), deleted=()):
+    """
+    Punto único para registrar una escritura de datos del usuario: aplica el
+    delta a los rollups (ver `rollups.apply_change`), invalida sus reportes
+    cacheados y deja la escritura visible para /api/sync/: `changed` son las
+    instancias (o querysets) creadas o modificadas y `deleted` los pares
+    `(modelo, pk)` borrados (ver `sync.deleted_rows`).
+    Llamar dentro de la misma transacción que la escritura. Lo usan la API
+    y el admin (`reports.admin.TrackedAdminMixin`); una escritura por ORM
+    fuera de ellos debe llamarlo también (o correr `rebuild_rollups`).
+    """
+    rollups.apply_change(owner_id, before=before, after=after)
+    version = bump_version(owner_id)
+    sync.stamp(owner_id, version, changed=changed, deleted=deleted)
+    return version
@@ -23,6 +23,8 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db import transaction
 from .utils import approve_signup_and_send_code
 from django.core.files.storage import default_storage
+from reports.api.conditional import ConditionalGetMixin  # ETag / Last-Modified en GET
+from reports.tracking import bump_version
 
 # -----------------------------------------------------------
 # VISTA DE REGISTRO DE USUARIO
@@ -71,7 +73,7 @@ class RegisterView(APIView):
 # -----------------------------------------------------------
 # VISTA DE PERFIL DE USUARIO
 # -----------------------------------------------------------
-class userView(APIView):
+class userView(ConditionalGetMixin, APIView):
     """
     Vista para obtener y actualizar informaciÃƒÂ³n del usuario autenticado.
     """
@@ -116,6 +118,7 @@ class userView(APIView):
         serializer = UserUpdateSerializer(user, data=request.data, partial=True)  # Permite actualizaciÃƒÂ³n parcial
         if serializer.is_valid(raise_exception=True):  # Valida datos enviados
             serializer.save()  # Guarda cambios en la base de datos
+            bump_version(user.id)  # Invalida el ETag de /api/auth/me/
             return Response(UserUpdateSerializer(user, context={'request': request}).data)  # Devuelve datos actualizados con URL absoluta
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1,3 +1,27 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from users.models import User
+
+
+class PerfilConditionalGetTests(TestCase):
+    """GET /api/auth/me/: 304 mientras no cambie el perfil, 200 con los datos nuevos tras un PUT."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='perfil@example.com', password='x', first_name='Ana')
+        self.client = APIClient()
+        # JWT real: cada petición vuelve a cargar el usuario, como en producción.
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_put_cambia_el_etag(self):
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/auth/me/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.assertEqual(self.client.put('/api/auth/me/', {'first_name': 'Beatriz'}).status_code, 200)
+        response = self.client.get('/api/auth/me/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['first_name'], 'Beatriz')
+        self.assertEqual(self.client.get('/api/auth/me/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
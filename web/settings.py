@@ -63,6 +63,7 @@ INSTALLED_APPS = [
     'egresos', 
     'ahorros', 
     'prestamos',
+    'reports',
 ]
 
 # ======================================================
@@ -72,6 +73,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',           # Seguridad general
     'whitenoise.middleware.WhiteNoiseMiddleware',             # Para servir archivos estáticos en producción
+    'reports.middleware.CompressionMiddleware',               # gzip/brotli del JSON de la API y exportaciones
     'django.contrib.sessions.middleware.SessionMiddleware',    # Manejo de sesiones
     'corsheaders.middleware.CorsMiddleware',                  # CORS: debe ir antes de CommonMiddleware
     'django.middleware.common.CommonMiddleware',              # Funciones comunes (redirects, etc)
@@ -116,6 +118,63 @@ DATABASES = {
     )
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Base de tests en archivo: la de memoria (caché compartida) no espera los bloqueos entre hilos
+    # y las pruebas de concurrencia (ahorros.tests) escriben desde varios a la vez
+    DATABASES['default']['TEST'] = {'NAME': str(BASE_DIR / 'test_db.sqlite3')}
+
+# ======================================================
+# CACHÉ
+# ======================================================
+
+# Por defecto caché en memoria del proceso (locmem). Con DJANGO_CACHE_DIR se usa
+# caché en disco (compartida entre workers de gunicorn) y con REDIS_URL, Redis.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif os.environ.get('DJANGO_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['DJANGO_CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'finansas-default',
+        }
+    }
+
+# Caché de /api/reports/: las claves llevan la versión de datos del usuario,
+# así que el timeout solo limita cuánto vive una entrada ya invalidada.
+REPORTS_CACHE_ALIAS = 'default'
+REPORTS_CACHE_TIMEOUT = int(os.environ.get('REPORTS_CACHE_TIMEOUT', 300))
+
+# Resumen y flujo mensual con rangos de más de N días se calculan en segundo
+# plano (202 + /api/reports/jobs/{id}/); requiere `python manage.py runworker`.
+# Vacío/0 = siempre síncrono (salvo ?async=true).
+REPORTS_ASYNC_THRESHOLD_DAYS = int(os.environ.get('REPORTS_ASYNC_THRESHOLD_DAYS') or 0) or None
+
+# Extractos bancarios de más de N bytes se importan en segundo plano (requiere
+# runworker). Vacío/0 = siempre en la petición (salvo ?async=true).
+STATEMENT_IMPORT_ASYNC_BYTES = int(os.environ.get('STATEMENT_IMPORT_ASYNC_BYTES') or 0) or None
+
+# Máximo de elementos por petición en los endpoints /bulk/ de ingresos y egresos
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 10000))
+
+# Compresión de respuestas de la API (reports/middleware.py): tamaño mínimo en
+# bytes, calidad de brotli (0-11; 4 es rápido para contenido dinámico) y rutas
+# que nunca se comprimen (BREACH: respuestas con tokens)
+COMPRESSION_MIN_LENGTH = int(os.environ.get('COMPRESSION_MIN_LENGTH', 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+COMPRESSION_EXCLUDED_PATHS = ('/api/auth/', '/api-auth/', '/admin/')
+
 # ======================================================
 # VALIDACIÓN DE CONTRASEÑAS
 # ======================================================
@@ -147,6 +206,16 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",  # Requiere login por defecto
     ],
+    # JSON con orjson (mismo formato que el de DRF; sin orjson usa stdlib). Ver reports/api/renderers.py
+    'DEFAULT_RENDERER_CLASSES': (
+        'reports.api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'reports.api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
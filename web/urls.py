@@ -17,7 +17,10 @@ from ingresos.api.router import router_IngresosFijos, router_IngresosExtra
 from egresos.api.router import router_EgresosFijos, router_EgresosExtra
 from ahorros.api.router import router_ahorros
 from prestamos.api.router import router_prestamos
-from reports.api.views import SummaryView, CashflowMonthlyView
+from reports.api.views import (
+    SummaryView, CashflowMonthlyView, CashflowView, BalanceView, ExportTransactionsView, ReportCacheStatsView,
+    ReportJobsView, ReportJobDetailView, StatementImportView, SyncView, SearchView, LedgerView,
+)
 
 # Esquema OpenAPI con drf-spectacular
 
@@ -39,6 +42,16 @@ urlpatterns = [
     path('api/', include(router_prestamos.urls)),
     path('api/reports/summary/', SummaryView.as_view(), name='reports-summary'),
     path('api/reports/cashflow/monthly/', CashflowMonthlyView.as_view(), name='reports-cashflow-monthly'),
+    path('api/reports/cashflow/', CashflowView.as_view(), name='reports-cashflow'),
+    path('api/reports/balance/', BalanceView.as_view(), name='reports-balance'),
+    path('api/reports/jobs/', ReportJobsView.as_view(), name='reports-jobs'),
+    path('api/reports/jobs/<int:pk>/', ReportJobDetailView.as_view(), name='reports-job-detail'),
+    path('api/reports/cache/stats/', ReportCacheStatsView.as_view(), name='reports-cache-stats'),
+    path('api/import/statement/', StatementImportView.as_view(), name='import-statement'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/search/', SearchView.as_view(), name='search'),
+    path('api/ledger/', LedgerView.as_view(), name='ledger'),
+    re_path(r'^api/export/transactions\.(?P<fmt>csv|xlsx)$', ExportTransactionsView.as_view(), name='export-transactions'),
 
     # Login/Logout para la vista de Swagger (drf-yasg)
     path('api-auth/', include('rest_framework.urls')),